@@ -1,5 +1,5 @@
 from rest_framework import permissions
-from user.models import CreatorProfile
+from user.access_codes import resolve_access_code
 from rest_framework.exceptions import AuthenticationFailed
 
 class HasValidAccessCode(permissions.BasePermission):
@@ -16,9 +16,8 @@ class HasValidAccessCode(permissions.BasePermission):
         if not access_code:
             raise AuthenticationFailed('Access code missing')
         
-        try:
-            profile = CreatorProfile.objects.get(access_code=access_code)
-            request.user = profile.user
-            return True
-        except CreatorProfile.DoesNotExist:
+        profile = resolve_access_code(access_code)
+        if profile is None:
             raise AuthenticationFailed('Invalid access code')
+        request.user = profile.user
+        return True
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from user.serializers import TimedListSerializer
 from .models import CreditCard
 
 class CreditCardSerializer(serializers.ModelSerializer):
@@ -22,6 +23,7 @@ class CreditCardSerializer(serializers.ModelSerializer):
             'created_at',
         ]
         read_only_fields = ['id', 'created_at']
+        list_serializer_class = TimedListSerializer
         
     def validate_digit(self, value):
         """
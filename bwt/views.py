@@ -22,6 +22,7 @@ from .permissions import HasValidAccessCode
 
 class CreditCardListCreateView(generics.ListCreateAPIView):
     serializer_class = CreditCardSerializer
+    replica_safe_methods = ('GET',)
 
     def get_permissions(self):
         if self.request.method == 'GET':
@@ -45,11 +45,14 @@ INSTALLED_APPS = [
     "rest_framework_simplejwt",
     'drf_yasg',
     'rest_framework_simplejwt.token_blacklist',
+    'channels',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    'user.middleware.RequestTimingMiddleware',
+    'user.middleware.ReplicaRoutingMiddleware',
 
     'django.contrib.sessions.middleware.SessionMiddleware',
     "corsheaders.middleware.CorsMiddleware",
@@ -63,7 +66,7 @@ MIDDLEWARE = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.tokens.StatelessJWTAuthentication",
      
     ),
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
@@ -72,13 +75,27 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ),
 
+    # JSON stays the default; clients opt into msgpack with Accept/Content-Type
+    'DEFAULT_RENDERER_CLASSES': (
+        'user.renderers.FastJSONRenderer',
+        'user.renderers.MsgPackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'rest_framework.parsers.JSONParser',
+        'user.renderers.MsgPackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,  # Adjust this number as needed
 }
 
 AUTHENTICATION_BACKENDS = [
+    # handles email/password and access codes; subclasses ModelBackend, so
+    # listing ModelBackend as well would only repeat failed lookups
     'user.authentification.EmailBackend',
-    'django.contrib.auth.backends.ModelBackend',
 ]
 
 
@@ -95,9 +112,130 @@ SIMPLE_JWT = {
     "SIGNING_KEY": SECRET_KEY,
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,  # Ensure this is set to True
-    "AUTH_HEADER_TYPES": ("Bearer",)
+    "AUTH_HEADER_TYPES": ("Bearer",),
+    "TOKEN_OBTAIN_SERIALIZER": "user.tokens.UserTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "user.tokens.UserTokenRefreshSerializer",
 }
 
+# How long user.tokens trusts a cached User.token_version (seconds); this
+# bounds how long a revoked token keeps working in other worker processes
+# when the default cache is not shared.
+TOKEN_VERSION_CACHE_TIMEOUT = 300
+
+# Signed fan tokens (user.fan_tokens): lifetime, and how long a creator's
+# token generation is cached (revocations elsewhere wait at most this long
+# without a shared cache)
+FAN_TOKEN_MAX_AGE = int(os.getenv("FAN_TOKEN_MAX_AGE", 2 * 60 * 60))
+FAN_TOKEN_GENERATION_CACHE_TIMEOUT = 300
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Access-code lookups (user.access_codes): in-process LRU/TTL tier sizes
+# and lifetimes in seconds; the shared tier is used when REDIS_URL is set
+ACCESS_CODE_CACHE = {
+    "MAXSIZE": 10000,
+    "TTL": 60,
+    "NEGATIVE_TTL": 10,
+    "SHARED_TTL": 300,
+}
+
+# Fan feed (user.feed): keyset page size and first-page cache lifetime
+FEED_PAGE_SIZE = int(os.getenv("FEED_PAGE_SIZE", "20"))
+FEED_MAX_PAGE_SIZE = 100
+FEED_CACHE_TIMEOUT = 300
+
+# Background task pool (user.tasks); TASKS_EAGER runs tasks inline
+TASK_WORKERS = int(os.getenv("TASK_WORKERS", "2"))
+TASKS_EAGER = os.getenv("TASKS_EAGER", "False") == "True"
+
+# Chunked video uploads (user.uploads). Parts wait in UPLOAD_PARTS_ROOT,
+# outside MEDIA_ROOT; clean_uploads drops sessions still incomplete after
+# UPLOAD_SESSION_MAX_AGE seconds.
+UPLOAD_PART_SIZE = 8 * 1024 * 1024
+UPLOAD_MAX_SIZE = 5 * 1024 * 1024 * 1024
+UPLOAD_PARTS_ROOT = os.getenv("UPLOAD_PARTS_ROOT", BASE_DIR / 'upload_parts')
+UPLOAD_SESSION_MAX_AGE = int(os.getenv("UPLOAD_SESSION_MAX_AGE", 7 * 24 * 60 * 60))
+
+# Responsive image variants (user.images): widths in px, formats and quality
+IMAGE_VARIANT_WIDTHS = [320, 640, 1280]
+IMAGE_VARIANT_FORMATS = ['webp', 'jpeg']
+IMAGE_VARIANT_QUALITY = 80
+
+# Optional ffprobe binary for videos user.video can't parse itself (non-MP4)
+FFPROBE_BINARY = os.environ.get('FFPROBE_BINARY') or None
+VIDEO_PROBE_TIMEOUT = 30
+
+# Like/comment counters are buffered (user.counters) and written at most this often, in seconds
+POST_COUNTER_FLUSH_INTERVAL = int(os.environ.get('POST_COUNTER_FLUSH_INTERVAL', 10))
+
+# WebSockets (user.consumers): Redis channel layer when REDIS_URL is set,
+# otherwise in-memory (single process only, fine for dev and tests)
+ASGI_APPLICATION = 'server.asgi.application'
+if REDIS_URL:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {'hosts': [REDIS_URL]},
+        }
+    }
+else:
+    CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+# Pre-generated access-code suffixes (user.provisioning): refilled in the
+# background once fewer than LOW_WATER are left; SUFFIX_BYTES=4 -> 8 hex chars
+ACCESS_CODE_POOL = {
+    'SIZE': int(os.environ.get('ACCESS_CODE_POOL_SIZE', 5000)),
+    'LOW_WATER': 1000,
+    'SUFFIX_BYTES': 4,
+}
+
+# Rows per bulk_create batch, and per request, for creator provisioning
+PROVISION_BATCH_SIZE = 500
+PROVISION_MAX_PER_REQUEST = 5000
+
+# Request timing (user.middleware): fraction of requests that get a log
+# line (and, for admins, a Server-Timing header); off unless set. Admins
+# sending PROFILE_HEADER get a cProfile dump in PROFILE_DIR (default:
+# <tmp>/request-profiles)
+REQUEST_TIMING = {
+    'SAMPLE_RATE': float(os.environ.get('REQUEST_TIMING_SAMPLE_RATE', 0)),
+    'PROFILE_HEADER': 'X-Profile',
+    'PROFILE_DIR': os.environ.get('REQUEST_PROFILE_DIR') or None,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        # one logfmt line per sampled request
+        'user.middleware': {
+            'handlers': ['console'],
+            'level': os.environ.get('REQUEST_TIMING_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+# Rows fetched per round trip by NDJSON admin exports (user.exports)
+EXPORT_CHUNK_SIZE = 2000
+
 ROOT_URLCONF = 'server.urls'
 
 TEMPLATES = [
@@ -130,15 +268,32 @@ AUTH_USER_MODEL = 'user.User'  # Replace 'user.User' with your actual app + mode
 #         ssl_require=True  # recommended for production
 #     )
 # }
+# DB_POOL=True swaps persistent connections for a psycopg 3 connection
+# pool shared by the worker's threads (needs `pip install "psycopg[pool]"`)
+DB_POOL = os.getenv("DB_POOL", "False") == "True"
+DB_POOL_OPTIONS = {
+    "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+    "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+    "timeout": int(os.getenv("DB_POOL_TIMEOUT", "10")),
+}
+
+
+def database_config(url):
+    config = dj_database_url.parse(url, conn_max_age=0 if DB_POOL else 600, ssl_require=True)
+    if DB_POOL:
+        config["OPTIONS"]["pool"] = DB_POOL_OPTIONS
+    return config
+
+
 if os.getenv("DATABASE_URL"):
     # Production / Supabase
     DATABASES = {
-        "default": dj_database_url.config(
-            default=os.environ.get("DATABASE_URL"),
-            conn_max_age=600,
-            ssl_require=True
-        )
+        "default": database_config(os.environ["DATABASE_URL"]),
     }
+    # Optional read replica; user.db_router sends replica-safe views' reads there
+    if os.getenv("DATABASE_REPLICA_URL"):
+        DATABASES["replica"] = database_config(os.environ["DATABASE_REPLICA_URL"])
+        DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
 else:
     # Local development fallback (SQLite)
     DATABASES = {
@@ -148,6 +303,8 @@ else:
         }
     }
 
+DATABASE_ROUTERS = ["user.db_router.PrimaryReplicaRouter"]
+
 
 
 
@@ -157,10 +314,14 @@ CORS_ALLOW_CREDENTIALS = True
 
 CORS_ALLOW_HEADERS = [
     'x-access-code',  # Add your custom header
+    'x-fan-token',
     'content-type',
     'authorization',
 ]
 
+# let the frontend read the fan token handed out by fan access
+CORS_EXPOSE_HEADERS = ['x-fan-token']
+
 CORS_ALLOW_METHODS = [
     'DELETE',
     'GET',
@@ -174,6 +335,10 @@ CORS_ALLOW_METHODS = [
 
 
 GOOGLE_CLIENT_ID = "847878289589-qvg5hqrijf9nl0apn8htit8flfne12u5.apps.googleusercontent.com"
+# Signing certs for Google ID tokens, cached by user.google_verifier per Cache-Control
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+GOOGLE_CERTS_TIMEOUT = 5
+GOOGLE_CLOCK_SKEW = 10
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -213,6 +378,23 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# user.media.serve_media: browser cache lifetime, and an optional nginx
+# internal location (e.g. "/protected-media/") to hand file bodies to
+MEDIA_CACHE_MAX_AGE = 60 * 60
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv("MEDIA_ACCEL_REDIRECT_PREFIX")
+
+# Profile pictures and post images/videos are stored once per distinct
+# content under media/blobs/ (user.storage). Blob URLs never change content,
+# so they are cached for a year; gc_media removes blobs that have had no
+# references for MEDIA_BLOB_GC_GRACE seconds.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    "blobs": {"BACKEND": "user.storage.ContentAddressedStorage"},
+    "uploads": {"BACKEND": "user.storage.UploadPartStorage"},
+}
+MEDIA_BLOB_MAX_AGE = 365 * 24 * 60 * 60
+MEDIA_BLOB_GC_GRACE = int(os.getenv("MEDIA_BLOB_GC_GRACE", 24 * 60 * 60))
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,161 @@
+import threading
+
+from cachetools import TTLCache
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.db import DEFAULT_DB_ALIAS
+from django.dispatch import receiver
+
+from .models import CreatorProfile
+
+
+SHARED_KEY = "access_code:{code}"
+SHARED_ID_KEY = "access_code:profile:{profile_id}"
+INVALID = "__invalid__"  # negative-cache marker in the shared tier
+
+
+class AccessCodeResolver:
+    """
+    Resolves fan access codes, or profile ids from fan tokens, to
+    ``CreatorProfile`` rows (with ``user``).
+
+    The in-process TTL cache only maps codes to profile ids (and remembers
+    unknown codes, for a shorter time, so brute-force guessing doesn't turn
+    into one query per guess). The profile itself comes from an optional
+    shared cache (Redis) or the database on every lookup, so an edit shows
+    up in every process as soon as signals clear the shared tier. A mapped
+    id whose row no longer carries the code is dropped and looked up again.
+
+    Database reads go to the primary even inside ``replica_reads()``, since
+    a lagging replica would refill the shared tier with the row just
+    invalidated.
+    """
+
+    def __init__(self, maxsize, ttl, negative_ttl, shared=None, shared_ttl=None):
+        self._found = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._invalid = TTLCache(maxsize=maxsize, ttl=negative_ttl)
+        self._lock = threading.Lock()
+        self.shared = shared
+        self.shared_ttl = shared_ttl
+        self.negative_ttl = negative_ttl
+
+    @classmethod
+    def from_settings(cls):
+        options = settings.ACCESS_CODE_CACHE
+        return cls(
+            maxsize=options['MAXSIZE'],
+            ttl=options['TTL'],
+            negative_ttl=options['NEGATIVE_TTL'],
+            # a shared tier only pays off when the cache really is shared
+            shared=caches['default'] if settings.REDIS_URL else None,
+            shared_ttl=options['SHARED_TTL'],
+        )
+
+    def resolve(self, access_code):
+        """Return the matching profile, or ``None``."""
+        code = (access_code or '').strip()
+        if not code:
+            return None
+
+        with self._lock:
+            profile_id = self._found.get(code)
+            if profile_id is None and code in self._invalid:
+                return None
+        if profile_id is not None:
+            profile = self.resolve_id(profile_id)
+            if profile is not None and profile.access_code == code:
+                return profile
+            # the code moved on in another process; look it up again
+            with self._lock:
+                self._found.pop(code, None)
+
+        if self.shared is not None:
+            cached = self.shared.get(SHARED_KEY.format(code=code))
+            if cached == INVALID:
+                self._remember(code, None)
+                return None
+            if cached is not None:
+                self._remember(code, cached)
+                return cached
+
+        profile = self._query().filter(access_code=code).first()
+        self._remember(code, profile)
+        if self.shared is not None:
+            if profile is None:
+                self.shared.set(SHARED_KEY.format(code=code), INVALID, self.negative_ttl)
+            else:
+                self.shared.set_many({
+                    SHARED_KEY.format(code=code): profile,
+                    SHARED_ID_KEY.format(profile_id=profile.pk): profile,
+                }, self.shared_ttl)
+        return profile
+
+    def resolve_id(self, profile_id):
+        """``resolve`` by profile id; ids come from signed fan tokens, so misses aren't cached."""
+        key = SHARED_ID_KEY.format(profile_id=profile_id)
+        if self.shared is not None:
+            profile = self.shared.get(key)
+            if profile is not None:
+                return profile
+        profile = self._query().filter(pk=profile_id).first()
+        if profile is not None and self.shared is not None:
+            self.shared.set(key, profile, self.shared_ttl)
+        return profile
+
+    def invalidate(self, *access_codes, profile_ids=()):
+        codes = {code.strip() for code in access_codes if code}
+        ids = set(profile_ids)
+        with self._lock:
+            for code in codes:
+                profile_id = self._found.pop(code, None)
+                if profile_id is not None:
+                    ids.add(profile_id)
+                self._invalid.pop(code, None)
+        if self.shared is not None and (codes or ids):
+            self.shared.delete_many(
+                [SHARED_KEY.format(code=code) for code in codes]
+                + [SHARED_ID_KEY.format(profile_id=profile_id) for profile_id in ids]
+            )
+
+    def _query(self):
+        return CreatorProfile.objects.using(DEFAULT_DB_ALIAS).select_related('user')
+
+    def _remember(self, code, profile):
+        with self._lock:
+            if profile is None:
+                self._invalid[code] = True
+            else:
+                self._found[code] = profile.pk
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_resolver():
+    global _resolver
+    if _resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                _resolver = AccessCodeResolver.from_settings()
+    return _resolver
+
+
+@receiver(setting_changed)
+def _reset_resolver(setting, **kwargs):
+    global _resolver
+    if setting in ('ACCESS_CODE_CACHE', 'REDIS_URL'):
+        _resolver = None
+
+
+def resolve_access_code(access_code):
+    return get_resolver().resolve(access_code)
+
+
+def resolve_profile_id(profile_id):
+    return get_resolver().resolve_id(profile_id)
+
+
+def invalidate_access_code(*access_codes, profile_ids=()):
+    get_resolver().invalidate(*access_codes, profile_ids=profile_ids)
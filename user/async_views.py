@@ -0,0 +1,139 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import exceptions
+
+from . import fan_tokens, images, stats
+from .db_router import replica_safe
+from .feed import aget_feed_page, content_validators, not_modified, set_validators
+from .models import CreatorPost, CreatorProfile, User
+from .serializers import CreatorPostSerializer, FanAccessSerializer
+from .tokens import StatelessJWTAuthentication
+
+# Async twins of the read-heavy views in user.views, for deployments served
+# from server.asgi. DRF views are sync-only, so these are plain Django async
+# views that reuse the same serializers, cache and auth; responses match the
+# sync versions field for field.
+
+
+def _error(detail, status):
+    if isinstance(detail, dict):
+        return JsonResponse(detail, status=status)
+    return JsonResponse({'detail': detail}, status=status)
+
+
+async def _authenticate(request):
+    """Return ``(user, None)`` or ``(None, error_response)`` using the JWT auth class."""
+    authenticator = StatelessJWTAuthentication()
+    try:
+        result = await sync_to_async(authenticator.authenticate)(request)
+    except exceptions.APIException as exc:
+        return None, _error(exc.detail, exc.status_code)
+    if result is None:
+        return None, _error("Authentication credentials were not provided.", 401)
+    return result[0], None
+
+
+def _request_data(request):
+    if request.content_type == 'application/json':
+        try:
+            return json.loads(request.body or b'{}')
+        except ValueError:
+            return None
+    return request.POST
+
+
+# ---------------------------
+# FAN ACCESS (public)
+# ---------------------------
+@csrf_exempt
+@require_POST
+@replica_safe('POST')
+async def fan_access(request):
+    data = _request_data(request)
+    if data is None:
+        return _error("JSON parse error.", 400)
+    serializer = FanAccessSerializer(data=data, context={'fan_token': fan_tokens.from_request(request)})
+    try:
+        if not await sync_to_async(serializer.is_valid)():
+            return JsonResponse(serializer.errors, status=400)
+    except exceptions.APIException as exc:
+        return _error(exc.detail, exc.status_code)
+
+    profile = serializer.validated_data['creator_profile']
+    page = await aget_feed_page(
+        request,
+        profile.user,
+        cursor=serializer.validated_data.get('cursor'),
+        page_size=serializer.validated_data.get('page_size'),
+    )
+    response = JsonResponse({
+        "creator_name": profile.user.full_name,
+        "creator_email": profile.user.email,
+        "bio": profile.bio or '',
+        "access_code": profile.access_code,
+        "profile_pic": request.build_absolute_uri(profile.profile_picture.url) if profile.profile_picture else None,
+        "profile_pic_srcset": images.srcset(
+            profile.profile_picture, profile.picture_variants, request.build_absolute_uri
+        ),
+        "posts": page['posts'],
+        "next_cursor": page['next_cursor']
+    })
+    return await sync_to_async(fan_tokens.attach)(response, serializer.validated_data)
+
+
+# ---------------------------
+# CREATOR CONTENT (JWT protected)
+# ---------------------------
+@require_GET
+@replica_safe('GET')
+async def creator_content(request, creator_id):
+    user, error = await _authenticate(request)
+    if error:
+        return error
+
+    try:
+        creator_profile = await CreatorProfile.objects.select_related('user').aget(id=creator_id)
+    except CreatorProfile.DoesNotExist:
+        return _error("No CreatorProfile matches the given query.", 404)
+    # always JSON here, so this shares the sync view's JSON tag
+    validators = content_validators(
+        request, creator_profile.pk, creator_profile.content_version, creator_profile.content_updated_at, 'json'
+    )
+    response = not_modified(request, *validators)
+    if response is not None:
+        return response
+
+    creator_user = creator_profile.user
+    posts = [post async for post in CreatorPost.objects.feed_for(creator_user).as_feed_rows()]
+    serializer = CreatorPostSerializer(posts, many=True, context={'request': request})
+    return set_validators(JsonResponse({
+        'creator': {
+            'id': creator_user.id,
+            'full_name': creator_user.full_name,
+            'email': creator_user.email,
+            'profile_picture': request.build_absolute_uri(creator_profile.profile_picture.url)
+                if creator_profile.profile_picture else None,
+            'profile_picture_srcset': images.srcset(
+                creator_profile.profile_picture, creator_profile.picture_variants, request.build_absolute_uri
+            ),
+            'bio': creator_profile.bio or ''
+        },
+        'posts': serializer.data
+    }), *validators)
+
+
+# ---------------------------
+# ADMIN STATS
+# ---------------------------
+@require_GET
+async def admin_stats(request):
+    user, error = await _authenticate(request)
+    if error:
+        return error
+    if str(user.role).upper() != User.ROLE.ADMIN:
+        return _error("You do not have permission to perform this action.", 403)
+    return JsonResponse(await stats.asnapshot())
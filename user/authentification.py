@@ -1,16 +1,34 @@
+from asgiref.sync import sync_to_async
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
 
+from .access_codes import resolve_access_code
+
 User = get_user_model()
 
 class EmailBackend(ModelBackend):
-    def authenticate(self, request, email=None, password=None, **kwargs):
-        try:
-            user = User.objects.get(email=email)
-            if user.check_password(password):
-                return user
-        except User.DoesNotExist:
+    """
+    The project's only authentication backend.
+
+    Handles email/password (``username`` too, for the admin login form)
+    with one lookup on the unique email index, and fan access codes via
+    the cached resolver. Inherited from ModelBackend: unknown emails still
+    run the password hasher so timing doesn't reveal which accounts exist,
+    inactive users are refused, and ``check_password`` re-hashes the stored
+    password on login when the hasher settings have changed.
+    """
+
+    def authenticate(self, request, email=None, password=None, access_code=None, **kwargs):
+        if access_code:
+            profile = resolve_access_code(access_code)
+            if profile is not None and self.user_can_authenticate(profile.user):
+                return profile.user
             return None
 
+        if email is None:
+            email = kwargs.get('username')
+        return super().authenticate(request, username=email, password=password)
 
-  
\ No newline at end of file
+    async def aauthenticate(self, request, **kwargs):
+        # ModelBackend's async version knows nothing about access codes
+        return await sync_to_async(self.authenticate)(request, **kwargs)
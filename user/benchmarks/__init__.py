@@ -0,0 +1,49 @@
+"""
+Benchmarks run by ``manage.py benchmark <suite>``.
+
+Each suite module registers a function with ``@suite``. The command calls
+it inside a scratch test database; the function seeds what it needs and
+returns a list of result rows (see ``summarize``).
+"""
+import importlib
+import statistics
+
+
+SUITE_MODULES = [
+    'user.benchmarks.async_views',
+    'user.benchmarks.endpoints',
+    'user.benchmarks.login',
+    'user.benchmarks.post_serializer',
+    'user.benchmarks.renderers',
+    'user.benchmarks.search',
+]
+
+SUITES = {}
+
+
+def suite(name):
+    def register(func):
+        SUITES[name] = func
+        return func
+    return register
+
+
+def get_suites():
+    for module in SUITE_MODULES:
+        importlib.import_module(module)
+    return SUITES
+
+
+def summarize(name, timings, wall=None):
+    """One result row from per-operation timings in seconds."""
+    timings = sorted(timings)
+    count = len(timings)
+    wall = wall if wall is not None else sum(timings)
+    return {
+        'name': name,
+        'count': count,
+        'mean_ms': round(statistics.fmean(timings) * 1000, 3),
+        'p50_ms': round(timings[count // 2] * 1000, 3),
+        'p95_ms': round(timings[min(count - 1, int(count * 0.95))] * 1000, 3),
+        'per_sec': round(count / wall, 1) if wall else None,
+    }
@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+from django.core.cache import cache
+from django.test import AsyncClient
+from django.urls import reverse
+
+from . import summarize, suite
+from .fixtures import bearer, make_admin, make_creator
+
+
+async def _hammer(client, method, url, concurrency, requests, **kwargs):
+    """Fire ``requests`` requests, at most ``concurrency`` in flight; return (timings, wall)."""
+    semaphore = asyncio.Semaphore(concurrency)
+    timings = []
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            response = await getattr(client, method)(url, **kwargs)
+            timings.append(time.perf_counter() - started)
+            assert response.status_code == 200, (url, response.status_code)
+
+    started = time.perf_counter()
+    # let every request finish before failing, or asyncio.run() waits on stuck workers
+    results = await asyncio.gather(*(one() for _ in range(requests)), return_exceptions=True)
+    wall = time.perf_counter() - started
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return timings, wall
+
+
+@suite('async_views')
+def async_views(concurrency=20, requests=200, **options):
+    """
+    Sync vs async versions of the fan feed, creator content and admin stats
+    views, driven concurrently through Django's ASGI handler.
+
+    Sync views run through sync_to_async in the request path, which is what
+    they cost when served from server.asgi.
+    """
+    profile = make_creator()
+    admin = make_admin()
+    auth = {'headers': {'Authorization': bearer(admin)}}
+    fan = {'email': 'fan@example.com', 'access_code': profile.access_code}
+
+    endpoints = [
+        ('fan_access', 'post', reverse('fan_access'), reverse('async_fan_access'),
+         {'data': fan, 'content_type': 'application/json'}),
+        ('creator_content', 'get', reverse('creator_content', args=[profile.pk]),
+         reverse('async_creator_content', args=[profile.pk]), auth),
+        ('admin_stats', 'get', reverse('admin_stats'), reverse('async_admin_stats'), auth),
+    ]
+
+    async def run():
+        client = AsyncClient()
+        rows = []
+        for name, method, sync_url, async_url, kwargs in endpoints:
+            for flavour, url in (('sync', sync_url), ('async', async_url)):
+                cache.clear()
+                await _hammer(client, method, url, concurrency, concurrency, **kwargs)  # warm up
+                timings, wall = await _hammer(client, method, url, concurrency, requests, **kwargs)
+                rows.append(summarize(f'{name} [{flavour}] c={concurrency}', timings, wall))
+        return rows
+
+    return asyncio.run(run())
@@ -0,0 +1,223 @@
+import contextlib
+import io
+import tempfile
+import time
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+import bwt.urls
+import user.urls
+from bwt.models import CreditCard
+from user import fan_tokens, uploads
+from user.models import CreatorPost, UploadSession
+from . import summarize, suite
+from .fixtures import bearer, make_admin, make_creator
+from .seed import seed
+
+
+# Iterations for cases that hash a password; PBKDF2 would dominate the run
+HASHING_REQUESTS = 5
+
+CARD = {
+    'card_holder_name': 'Bench Creator', 'digit': '4242424242424242', 'brand': 'Visa', 'cvv': '123',
+    'exp_month': 12, 'exp_year': 2099, 'billing_address_line1': '1 Bench Street', 'billing_city': 'Lagos',
+    'billing_state': 'Lagos', 'billing_postal_code': '100001', 'billing_country': 'NG',
+}
+
+
+class Case:
+    """
+    One request to time. ``call(clients, i, **prepared)`` makes request
+    number ``i``; ``prepare(i)`` runs first, untimed, for cases that use
+    up their target (completing an upload, deleting a card).
+    """
+
+    def __init__(self, name, route, call, status=200, prepare=None, max_requests=None):
+        self.name = name
+        self.route = route
+        self.call = call
+        self.status = (status,) if isinstance(status, int) else status
+        self.prepare = prepare
+        self.max_requests = max_requests
+
+
+def routes():
+    """URL names the cases have to cover: everything in user.urls and bwt.urls."""
+    return {pattern.name for pattern in user.urls.urlpatterns + bwt.urls.urlpatterns}
+
+
+def endpoint_cases():
+    """
+    Build the fixtures the cases need and return ``(clients, cases)``.
+
+    Expects to run in a scratch database; seeding is left to the caller.
+    """
+    profile = make_creator()
+    creator = profile.user
+    admin = make_admin()
+    clients = {'anon': APIClient(), 'creator': APIClient(), 'admin': APIClient()}
+    clients['creator'].credentials(HTTP_AUTHORIZATION=bearer(creator))
+    clients['admin'].credentials(HTTP_AUTHORIZATION=bearer(admin))
+
+    post = CreatorPost.objects.filter(creator=creator).latest('id')
+    fan = {'email': 'fan@example.com', 'access_code': profile.access_code}
+    upload = UploadSession.objects.create(creator=creator, filename='clip.mp4', total_size=4, part_size=4, title='Clip')
+    card = CreditCard.objects.create(user=creator, **CARD)
+
+    def fresh_upload(i):
+        session = UploadSession.objects.create(
+            creator=creator, filename='clip.mp4', total_size=4, part_size=4, title=f'Clip {i}'
+        )
+        uploads.store_part(session, 1, io.BytesIO(b'0000'))
+        return {'upload_id': session.pk}
+
+    def fresh_card(i):
+        return {'pk': CreditCard.objects.create(user=creator, **CARD).pk}
+
+    def fresh_token(i):
+        # issued per request so the revoke case can't invalidate the others
+        return {'token': fan_tokens.issue(profile.pk, fan['email'])}
+
+    def etag(client, path, params=None):
+        return lambda i: {'etag': clients[client].get(path, params)['ETag']}
+
+    def signup(i, prefix):
+        return {'email': f'{prefix}-{i}@example.com', 'password': 'bench-password', 'full_name': f'Signup {i}'}
+
+    url = reverse
+    cases = [
+        # authentication
+        Case('login', 'login', lambda c, i: c['anon'].post(
+            url('login'), {'email': creator.email, 'password': 'bench-password'}, format='json'),
+            max_requests=HASHING_REQUESTS),
+        Case('google_login (bad token)', 'google_login', lambda c, i: c['anon'].post(
+            url('google_login'), {'token': 'not-a-jwt'}, format='json'), status=400),
+        Case('creator_signup', 'creator_signup', lambda c, i: c['anon'].post(
+            url('creator_signup'), signup(i, 'signup-creator'), format='multipart'),
+            status=201, max_requests=HASHING_REQUESTS),
+        Case('admin_signup', 'admin_signup', lambda c, i: c['anon'].post(
+            url('admin_signup'), signup(i, 'signup-admin'), format='json'),
+            status=201, max_requests=HASHING_REQUESTS),
+
+        # fans
+        Case('fan_access', 'fan_access', lambda c, i: c['anon'].post(url('fan_access'), fan, format='json')),
+        Case('fan_access GET', 'fan_access', lambda c, i: c['anon'].get(url('fan_access'), fan)),
+        Case('fan_access GET (304)', 'fan_access', lambda c, i, etag: c['anon'].get(
+            url('fan_access'), fan, HTTP_IF_NONE_MATCH=etag), status=304, prepare=etag('anon', url('fan_access'), fan)),
+        Case('fan_access GET (token)', 'fan_access', lambda c, i, token: c['anon'].get(
+            url('fan_access'), HTTP_X_FAN_TOKEN=token), prepare=fresh_token),
+        Case('fan_tokens_revoke', 'fan_tokens_revoke', lambda c, i: c['creator'].post(
+            url('fan_tokens_revoke', args=[profile.pk])), status=204),
+        Case('async fan_access', 'async_fan_access', lambda c, i: c['anon'].post(
+            url('async_fan_access'), fan, format='json')),
+        Case('post_like POST', 'post_like', lambda c, i: c['anon'].post(
+            url('post_like', args=[post.pk]), {**fan, 'email': f'fan-{i}@example.com'}, format='json'),
+            status=(200, 201)),
+        Case('post_like DELETE', 'post_like', lambda c, i: c['anon'].delete(
+            url('post_like', args=[post.pk]), {**fan, 'email': f'fan-{i}@example.com'}, format='json')),
+        Case('post_comments POST', 'post_comments', lambda c, i: c['anon'].post(
+            url('post_comments', args=[post.pk]), {**fan, 'body': f'Comment {i}'}, format='json'), status=201),
+        Case('post_comments GET', 'post_comments', lambda c, i: c['anon'].get(
+            url('post_comments', args=[post.pk]), fan)),
+        Case('post_comments GET (token)', 'post_comments', lambda c, i, token: c['anon'].get(
+            url('post_comments', args=[post.pk]), HTTP_X_FAN_TOKEN=token), prepare=fresh_token),
+
+        # search
+        Case('post_search', 'post_search', lambda c, i: c['creator'].get(
+            url('post_search'), {'q': 'live session'})),
+
+        # creators
+        Case('creator_content GET', 'creator_content', lambda c, i: c['creator'].get(
+            url('creator_content', args=[profile.pk]))),
+        Case('creator_content GET (304)', 'creator_content', lambda c, i, etag: c['creator'].get(
+            url('creator_content', args=[profile.pk]), HTTP_IF_NONE_MATCH=etag),
+            status=304, prepare=etag('creator', url('creator_content', args=[profile.pk]))),
+        Case('async creator_content', 'async_creator_content', lambda c, i: c['creator'].get(
+            url('async_creator_content', args=[profile.pk]))),
+        Case('creator_content POST', 'creator_content', lambda c, i: c['creator'].post(
+            url('creator_content', args=[profile.pk]), {'title': f'Post {i}'}, format='multipart'), status=201),
+        Case('video_upload_init', 'video_upload_init', lambda c, i: c['creator'].post(
+            url('video_upload_init', args=[profile.pk]), {'filename': 'clip.mp4', 'total_size': 4, 'title': 'Clip'},
+            format='json'), status=201),
+        Case('video_upload_part', 'video_upload_part', lambda c, i: c['creator'].generic(
+            'PUT', url('video_upload_part', args=[upload.pk, 1]), b'0123', content_type='application/octet-stream')),
+        Case('video_upload_detail', 'video_upload_detail', lambda c, i: c['creator'].get(
+            url('video_upload_detail', args=[upload.pk]))),
+        Case('video_upload_complete', 'video_upload_complete', lambda c, i, upload_id: c['creator'].post(
+            url('video_upload_complete', args=[upload_id])), status=(201, 202), prepare=fresh_upload),
+
+        # credit cards
+        Case('card-list-create POST', 'card-list-create', lambda c, i: c['creator'].post(
+            url('card-list-create'), CARD, format='json'), status=201),
+        Case('card-list-create GET', 'card-list-create', lambda c, i: c['admin'].get(url('card-list-create'))),
+        Case('card-detail GET', 'card-detail', lambda c, i: c['creator'].get(url('card-detail', args=[card.pk]))),
+        Case('card-detail PATCH', 'card-detail', lambda c, i: c['creator'].patch(
+            url('card-detail', args=[card.pk]), {'is_default': bool(i % 2)}, format='json')),
+        Case('card-detail DELETE', 'card-detail', lambda c, i, pk: c['creator'].delete(
+            url('card-detail', args=[pk])), status=204, prepare=fresh_card),
+
+        # admin
+        Case('admin_users', 'admin_users', lambda c, i: c['admin'].get(url('admin_users'))),
+        Case('admin_creators GET', 'admin_creators', lambda c, i: c['admin'].get(url('admin_creators'))),
+        Case('admin_creators POST', 'admin_creators', lambda c, i: c['admin'].post(
+            url('admin_creators'), signup(i, 'admin-creator'), format='multipart'),
+            status=201, max_requests=HASHING_REQUESTS),
+        Case('admin_creators_bulk (10)', 'admin_creators_bulk', lambda c, i: c['admin'].post(
+            url('admin_creators_bulk'),
+            {'creators': [{'email': f'bulk-{i}-{n}@example.com', 'full_name': f'Bulk {n}'} for n in range(10)]},
+            format='json'), status=201),
+        Case('admin_creators_search', 'admin_creators_search', lambda c, i: c['admin'].get(
+            url('admin_creators_search'), {'q': 'seed creator 1'})),
+        Case('admin_creator_detail GET', 'admin_creator_detail', lambda c, i: c['admin'].get(
+            url('admin_creator_detail', args=[creator.pk]))),
+        Case('admin_creator_detail PATCH', 'admin_creator_detail', lambda c, i: c['admin'].patch(
+            url('admin_creator_detail', args=[creator.pk]), {'bio': f'Bio {i}'}, format='json')),
+        Case('admin_creator_detail DELETE', 'admin_creator_detail', lambda c, i: c['admin'].delete(
+            url('admin_creator_detail', args=[creator.pk]))),
+        Case('admin_stats', 'admin_stats', lambda c, i: c['admin'].get(url('admin_stats'))),
+        Case('async admin_stats', 'async_admin_stats', lambda c, i: c['admin'].get(url('async_admin_stats'))),
+        Case('admin_cards', 'admin_cards', lambda c, i: c['admin'].get(url('admin_cards'))),
+        Case('admin-credit-card-list', 'admin-credit-card-list', lambda c, i: c['admin'].get(
+            url('admin-credit-card-list'))),
+    ]
+    return clients, cases
+
+
+def measure(case, clients, requests):
+    """Time ``requests`` calls of ``case``; the row includes the most queries any one call made."""
+    timings, queries = [], 0
+    for i in range(min(requests, case.max_requests or requests)):
+        prepared = case.prepare(i) if case.prepare else {}
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = case.call(clients, i, **prepared)
+            timings.append(time.perf_counter() - started)
+        if response.status_code not in case.status:
+            raise AssertionError(f"{case.name}: HTTP {response.status_code} {response.content[:200]!r}")
+        queries = max(queries, len(captured))
+    row = summarize(case.name, timings)
+    row['queries'] = queries
+    return row
+
+
+@suite('endpoints')
+def endpoints(requests=50, creators=100, posts=50, users=1000, **options):
+    """
+    p50/p95 latency and query count for every route in user.urls and
+    bwt.urls, through the test client against a seeded database.
+
+    Compare runs with ``--baseline user/benchmarks/baselines/endpoints.json``.
+    """
+    with tempfile.TemporaryDirectory() as media_root, tempfile.TemporaryDirectory() as parts_root, \
+            override_settings(MEDIA_ROOT=media_root, UPLOAD_PARTS_ROOT=parts_root, TASKS_EAGER=True), \
+            contextlib.redirect_stdout(io.StringIO()):  # CreditCardListCreateView prints per request
+        seed(creators=creators, posts=posts, users=users)
+        clients, cases = endpoint_cases()
+        missing = routes() - {case.route for case in cases}
+        if missing:
+            raise AssertionError(f"No benchmark case for: {', '.join(sorted(missing))}")
+        return [measure(case, clients, requests) for case in cases]
@@ -0,0 +1,20 @@
+from user.models import CreatorPost, CreatorProfile, User
+from user.tokens import UserRefreshToken
+
+
+def make_creator(email='bench-creator@example.com', access_code='BENCH001', posts=50):
+    user = User.objects.create_user(email=email, password='bench-password', full_name='Bench Creator', role=User.ROLE.CREATOR)
+    profile = CreatorProfile.objects.create(user=user, access_code=access_code)
+    CreatorPost.objects.bulk_create(
+        CreatorPost(creator=user, title=f'Post {n}', description='x' * 200, image=f'creator_images/{n}.jpg')
+        for n in range(posts)
+    )
+    return profile
+
+
+def make_admin(email='bench-admin@example.com'):
+    return User.objects.create_user(email=email, password='bench-password', full_name='Bench Admin', role=User.ROLE.ADMIN)
+
+
+def bearer(user):
+    return f'Bearer {UserRefreshToken.for_user(user).access_token}'
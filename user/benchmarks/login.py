@@ -0,0 +1,58 @@
+import time
+
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import summarize, suite
+from .fixtures import make_creator
+
+# What AUTHENTICATION_BACKENDS used to be: every failure ran both backends
+TWO_BACKEND_CHAIN = [
+    'user.authentification.EmailBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+
+@suite('login')
+def login(requests=20, **options):
+    """
+    LoginView throughput for good, bad-password and unknown-email logins,
+    with the single backend against the old two-backend chain. Each attempt
+    is dominated by password hashing, hence the small default count.
+    """
+    profile = make_creator(posts=0)
+    attempts = [
+        ('valid', {'email': profile.user.email, 'password': 'bench-password'}, 200),
+        ('wrong password', {'email': profile.user.email, 'password': 'nope'}, 400),
+        ('unknown email', {'email': 'nobody@example.com', 'password': 'nope'}, 400),
+    ]
+    chains = [
+        ('single backend', None),
+        ('two backends', TWO_BACKEND_CHAIN),
+    ]
+
+    client = Client()
+    url = reverse('login')
+    rows = []
+    for chain_name, backends in chains:
+        overrides = override_settings(AUTHENTICATION_BACKENDS=backends) if backends else None
+        if overrides:
+            overrides.enable()
+        try:
+            for attempt_name, body, expected in attempts:
+                timings = []
+                with CaptureQueriesContext(connection) as queries:
+                    for _ in range(requests):
+                        started = time.perf_counter()
+                        response = client.post(url, body, content_type='application/json')
+                        timings.append(time.perf_counter() - started)
+                        assert response.status_code == expected, (attempt_name, response.status_code)
+                row = summarize(f'{attempt_name} [{chain_name}]', timings)
+                row['queries'] = round(len(queries) / requests, 1)
+                rows.append(row)
+        finally:
+            if overrides:
+                overrides.disable()
+    return rows
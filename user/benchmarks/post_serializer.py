@@ -0,0 +1,40 @@
+import time
+
+from django.test import RequestFactory
+from rest_framework import serializers
+
+from user.models import CreatorPost
+from user.serializers import CreatorPostSerializer
+from . import summarize, suite
+from .fixtures import make_creator
+
+
+@suite('post_serializer')
+def post_serializer(requests=200, **options):
+    """
+    Serializing a 100-post feed page: the stock per-field ListSerializer
+    against CreatorPostListSerializer, from model instances and from
+    ``values()`` rows.
+    """
+    profile = make_creator(posts=100)
+    context = {'request': RequestFactory().get('/')}
+    posts = list(CreatorPost.objects.feed_for(profile.user))
+    rows = list(CreatorPost.objects.feed_for(profile.user).as_feed_rows())
+
+    candidates = [
+        ('per-field ListSerializer', lambda: serializers.ListSerializer(
+            posts, child=CreatorPostSerializer(), context=context).data),
+        ('CreatorPostListSerializer (instances)', lambda: CreatorPostSerializer(
+            posts, many=True, context=context).data),
+        ('CreatorPostListSerializer (values rows)', lambda: CreatorPostSerializer(
+            rows, many=True, context=context).data),
+    ]
+    results = []
+    for name, render in candidates:
+        timings = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            render()
+            timings.append(time.perf_counter() - started)
+        results.append(summarize(name, timings))
+    return results
@@ -0,0 +1,53 @@
+import gzip
+import time
+
+from django.test import Client
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+
+from user.renderers import FastJSONRenderer, MsgPackRenderer
+from . import summarize, suite
+from .fixtures import make_creator
+
+
+@suite('renderers')
+def renderers(requests=500, **options):
+    """
+    Render time and payload size of a full FanAccessView response
+    (100 posts) with each renderer, plus the end-to-end request per
+    Accept header.
+    """
+    profile = make_creator(posts=100)
+    body = {'email': 'fan@example.com', 'access_code': profile.access_code, 'page_size': 100}
+    client = Client()
+    data = client.post(reverse('fan_access'), body, content_type='application/json').json()
+
+    candidates = [
+        ('JSONRenderer', JSONRenderer()),
+        ('FastJSONRenderer', FastJSONRenderer()),
+        ('MsgPackRenderer', MsgPackRenderer()),
+    ]
+    rows = []
+    for name, renderer in candidates:
+        payload = renderer.render(data)
+        timings = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            renderer.render(data)
+            timings.append(time.perf_counter() - started)
+        row = summarize(f'render {name}', timings)
+        row['bytes'] = len(payload)
+        row['gzip_bytes'] = len(gzip.compress(payload))
+        rows.append(row)
+
+    for accept in ('application/json', 'application/msgpack'):
+        timings = []
+        for _ in range(max(requests // 10, 1)):
+            started = time.perf_counter()
+            response = client.post(reverse('fan_access'), body, content_type='application/json', HTTP_ACCEPT=accept)
+            timings.append(time.perf_counter() - started)
+            assert response.status_code == 200 and response['Content-Type'].startswith(accept)
+        row = summarize(f'request Accept: {accept}', timings)
+        row['bytes'] = len(response.content)
+        rows.append(row)
+    return rows
@@ -0,0 +1,62 @@
+import time
+
+from django.db.models import Q
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from user.models import CreatorPost
+from user.search import search_posts
+from . import summarize, suite
+from .fixtures import bearer, make_admin
+from .seed import seed
+
+
+# a common word, a rare one, two words together, and a prefix
+QUERIES = ('acoustic', 'workout', 'vocal tour', 'rehear')
+
+
+def _icontains(query):
+    condition = Q()
+    for word in query.split():
+        condition &= Q(title__icontains=word) | Q(description__icontains=word)
+    return CreatorPost.objects.filter(condition).order_by('-pk')
+
+
+def _page(queryset):
+    # what a paginated response costs: the count plus the first 20 rows
+    return queryset.count(), list(queryset[:20])
+
+
+@suite('search')
+def search(requests=50, creators=200, posts=100, **options):
+    """
+    First page of post search over a seeded corpus (creators x posts), with
+    the full-text index against an ``icontains`` scan of the same terms,
+    plus the ``post_search`` endpoint end to end.
+    """
+    seed(creators=creators, posts=posts, users=0, cards=0, likes=0, comments=0)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=bearer(make_admin()))
+
+    rows = []
+    for query in QUERIES:
+        for name, build in (('full-text', search_posts), ('icontains', _icontains)):
+            timings = []
+            for _ in range(requests):
+                started = time.perf_counter()
+                matches, _ = _page(build(query))
+                timings.append(time.perf_counter() - started)
+            row = summarize(f'{name} {query!r}', timings)
+            row['matches'] = matches
+            rows.append(row)
+
+        timings = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = client.get(reverse('post_search'), {'q': query})
+            timings.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.content[:200]
+        row = summarize(f'GET post_search {query!r}', timings)
+        row['matches'] = response.data['count']
+        rows.append(row)
+    return rows
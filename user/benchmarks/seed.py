@@ -0,0 +1,131 @@
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from bwt.models import CreditCard
+from user import stats
+from user.models import CreatorPost, PostComment, PostLike, User
+from user.provisioning import provision_creators
+
+
+SEED_DOMAIN = 'bench.example.com'
+
+# Post titles and descriptions are drawn from here, so search has a corpus
+# with common and rare terms rather than thousands of identical rows
+WORDS = (
+    'acoustic', 'afrobeat', 'album', 'backstage', 'ballad', 'bass', 'behind', 'birthday', 'chorus', 'concert',
+    'cover', 'dance', 'demo', 'drums', 'festival', 'freestyle', 'guitar', 'highlife', 'interview', 'jazz',
+    'karaoke', 'lagos', 'live', 'lyrics', 'mixtape', 'morning', 'piano', 'podcast', 'premiere', 'rehearsal',
+    'remix', 'session', 'single', 'soul', 'studio', 'teaser', 'tour', 'tutorial', 'unplugged', 'vlog',
+    'vocal', 'workout',
+)
+# Zipf-like: the first words are far more common than the last, as in real text
+WORD_WEIGHTS = [1 / (rank + 1) for rank in range(len(WORDS))]
+
+
+def creator_email(n):
+    return f'seed-creator-{n}@{SEED_DOMAIN}'
+
+
+def seed(creators=100, posts=50, users=500, cards=2, likes=5, comments=3, batch_size=2000):
+    """
+    Bulk-load a realistic data set: ``creators`` creators (with profiles and
+    access codes) with ``posts`` posts each, each post carrying ``likes``
+    likes and ``comments`` comments, ``cards`` credit cards per creator and
+    ``users`` plain customer accounts.
+
+    Every row goes in through bulk_create, so dashboard counters are bumped
+    here. Seeded accounts share the SEED_DOMAIN e-mail domain; running it
+    again only adds creators and users that don't exist yet. Returns the
+    number of rows created per model.
+    """
+    now = timezone.now()
+    created, _ = provision_creators(
+        ({'email': creator_email(n), 'full_name': f'Seed Creator {n}', 'bio': 'Seeded for benchmarks.'}
+         for n in range(creators)),
+        batch_size=min(batch_size, 500),
+    )
+    creator_ids = [row['id'] for row in created]
+    words = random.Random(len(creator_ids) * posts)
+
+    with transaction.atomic():
+        post_rows = CreatorPost.objects.bulk_create(
+            (
+                CreatorPost(
+                    creator_id=creator_id,
+                    title=' '.join(words.choices(WORDS, WORD_WEIGHTS, k=4)).capitalize(),
+                    description=' '.join(words.choices(WORDS, WORD_WEIGHTS, k=40)),
+                    image=f'creator_images/seed/{creator_id}-{n}.jpg',
+                    likes_count=likes,
+                    comments_count=comments,
+                )
+                for creator_id in creator_ids
+                for n in range(posts)
+            ),
+            batch_size=batch_size,
+        )
+        PostLike.objects.bulk_create(
+            (PostLike(post=post, fan_email=f'fan-{n}@{SEED_DOMAIN}') for post in post_rows for n in range(likes)),
+            batch_size=batch_size,
+        )
+        PostComment.objects.bulk_create(
+            (
+                PostComment(post=post, fan_email=f'fan-{n}@{SEED_DOMAIN}', body=f'Seeded comment {n}.')
+                for post in post_rows for n in range(comments)
+            ),
+            batch_size=batch_size,
+        )
+        card_rows = CreditCard.objects.bulk_create(
+            (
+                CreditCard(
+                    user_id=creator_id,
+                    card_holder_name='Seed Creator',
+                    digit='4242424242424242',
+                    brand='Visa',
+                    exp_month=12,
+                    exp_year=now.year + 3,
+                    cvv='123',
+                    is_default=n == 0,
+                    billing_address_line1='1 Seed Street',
+                    billing_city='Lagos',
+                    billing_state='Lagos',
+                    billing_postal_code='100001',
+                    billing_country='NG',
+                )
+                for creator_id in creator_ids
+                for n in range(cards)
+            ),
+            batch_size=batch_size,
+        )
+        unusable = make_password(None)
+        before = User.objects.count()
+        User.objects.bulk_create(
+            (
+                User(
+                    email=f'seed-user-{n}@{SEED_DOMAIN}',
+                    full_name=f'Seed User {n}',
+                    password=unusable,
+                    role=User.ROLE.CUSTOMER,
+                    date_joined=now,
+                )
+                for n in range(users)
+            ),
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        user_count = User.objects.count() - before
+
+        stats.bump(stats.TOTAL_POSTS, len(post_rows))
+        stats.bump(stats.TOTAL_CREDIT_CARDS, len(card_rows))
+        stats.bump(stats.monthly_key(stats.MONTHLY_CREDIT_CARDS, now), len(card_rows))
+
+    return {
+        'creators': len(creator_ids),
+        'posts': len(post_rows),
+        'likes': len(post_rows) * likes,
+        'comments': len(post_rows) * comments,
+        'credit_cards': len(card_rows),
+        'users': user_count,
+    }
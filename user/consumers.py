@@ -0,0 +1,118 @@
+import io
+import logging
+from urllib.parse import parse_qs
+
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from channels.layers import get_channel_layer
+from django.core.exceptions import DisallowedHost
+from django.core.handlers.asgi import ASGIRequest
+
+from . import fan_tokens
+from .access_codes import resolve_access_code, resolve_profile_id
+from .media import MediaURLBuilder
+from .models import CreatorPost
+
+logger = logging.getLogger(__name__)
+
+
+def feed_group(creator_id):
+    return f"creator_feed.{creator_id}"
+
+
+# ---------------------------
+# CONSUMER
+# ---------------------------
+def _resolve_fan(access_code, fan_token):
+    if not fan_token:
+        return resolve_access_code(access_code)
+    try:
+        return resolve_profile_id(fan_tokens.read(fan_token)['profile_id'])
+    except fan_tokens.InvalidFanToken:
+        return None
+
+
+def _url_builders(scope):
+    """MediaURLBuilders for the socket's host, as the REST feed would build them for the same request."""
+    scheme = 'https' if scope.get('scheme') in ('wss', 'https') else 'http'
+    request = ASGIRequest({**scope, 'type': 'http', 'method': 'GET', 'scheme': scheme}, io.BytesIO())
+    return (
+        MediaURLBuilder(request, CreatorPost._meta.get_field('image').storage),
+        MediaURLBuilder(request, CreatorPost._meta.get_field('video').storage),
+    )
+
+
+class CreatorFeedConsumer(AsyncJsonWebsocketConsumer):
+    """
+    ``ws/creator/feed/?access_code=...`` (or ``?fan_token=...``): pushes
+    new posts to fans.
+
+    The access code or fan token is checked once, at connect; after that
+    the socket only receives ``post.created`` events for that creator.
+    """
+
+    async def connect(self):
+        query = parse_qs(self.scope.get('query_string', b'').decode())
+        profile = await database_sync_to_async(_resolve_fan)(
+            (query.get('access_code') or [''])[0], (query.get('fan_token') or [''])[0],
+        )
+        if profile is None or not profile.user.is_active:
+            await self.close(code=4403)
+            return
+        try:
+            self.image_urls, self.video_urls = _url_builders(self.scope)
+        except DisallowedHost:
+            await self.close(code=4400)
+            return
+
+        self.group_name = feed_group(profile.user_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        pass  # fans only listen
+
+    async def post_created(self, event):
+        post = dict(event['post'])
+        image, video = post.pop('image_name'), post.pop('video_name')
+        image_url = self.image_urls.file_url(image) if image else None
+        post.update({
+            'image': image_url,
+            'video': self.video_urls.file_url(video) if video else None,
+            'image_url': image_url,
+            'video_url': self.video_urls.served_url(video) if video else None,
+        })
+        await self.send_json({'type': 'post.created', 'post': post})
+
+
+# ---------------------------
+# BROADCAST
+# ---------------------------
+def post_payload(post):
+    """
+    Compact post body for the socket; clients fetch the rest from the feed.
+    Media goes out as file names, which each socket turns into the same
+    absolute URLs the REST feed gives its host (see post_created).
+    """
+    return {
+        'id': post.pk,
+        'title': post.title,
+        'created_at': post.created_at.isoformat(),
+        'image_name': post.image.name or None,
+        'video_name': post.video.name or None,
+    }
+
+
+def broadcast_new_post(creator_id, payload):
+    try:
+        async_to_sync(get_channel_layer().group_send)(
+            feed_group(creator_id), {'type': 'post.created', 'post': payload}
+        )
+    except Exception:
+        # push is best effort; fans still see the post on their next fetch
+        logger.exception("Could not broadcast post %s", payload['id'])
@@ -0,0 +1,169 @@
+import threading
+import uuid
+from collections import defaultdict
+
+import redis
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.dispatch import receiver
+
+from . import tasks
+from .models import CreatorPost, PostComment, PostLike
+
+
+LIKES = 'likes_count'
+COMMENTS = 'comments_count'
+
+
+# ---------------------------
+# BUFFERS
+# ---------------------------
+class LocalCounterBuffer:
+    """Pending ``(post_id, field) -> delta`` kept in this process."""
+
+    def __init__(self):
+        self._pending = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def add(self, post_id, field, delta):
+        with self._lock:
+            self._pending[post_id, field] += delta
+
+    def drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(int)
+        return dict(pending)
+
+
+class RedisCounterBuffer:
+    """
+    Pending deltas in one Redis hash shared by every process.
+
+    ``drain`` renames the hash before reading it, so increments that land
+    while a flush is running go into a fresh hash instead of being lost.
+    """
+
+    KEY = "post_counters:pending"
+
+    def __init__(self, client):
+        self.client = client
+
+    def add(self, post_id, field, delta):
+        self.client.hincrby(self.KEY, f"{post_id}:{field}", delta)
+
+    def drain(self):
+        draining = f"{self.KEY}:draining:{uuid.uuid4().hex}"
+        try:
+            self.client.rename(self.KEY, draining)
+        except redis.ResponseError:
+            return {}  # nothing pending
+        pending = self.client.hgetall(draining)
+        self.client.delete(draining)
+
+        deltas = {}
+        for member, delta in pending.items():
+            post_id, field = member.decode().split(':', 1)
+            deltas[int(post_id), field] = int(delta)
+        return deltas
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                if settings.REDIS_URL:
+                    from .redis_client import get_redis
+                    _buffer = RedisCounterBuffer(get_redis())
+                else:
+                    _buffer = LocalCounterBuffer()
+    return _buffer
+
+
+@receiver(setting_changed)
+def _reset_buffer(setting, **kwargs):
+    global _buffer
+    if setting == 'REDIS_URL':
+        _buffer = None
+
+
+# ---------------------------
+# RECORD / FLUSH
+# ---------------------------
+_flush_lock = threading.Lock()
+_flush_scheduled = False
+
+
+def record(post_id, field, delta):
+    """
+    Buffer a change to ``CreatorPost.<field>``.
+
+    The first change after a flush schedules the next one
+    POST_COUNTER_FLUSH_INTERVAL seconds later, so a burst of likes turns
+    into one UPDATE per post instead of one per like.
+    """
+    global _flush_scheduled
+    get_buffer().add(post_id, field, delta)
+    with _flush_lock:
+        if _flush_scheduled:
+            return
+        _flush_scheduled = True
+    tasks.run_later(settings.POST_COUNTER_FLUSH_INTERVAL, _scheduled_flush)
+
+
+def _scheduled_flush():
+    global _flush_scheduled
+    with _flush_lock:
+        _flush_scheduled = False
+    flush()
+
+
+def flush():
+    """Apply buffered deltas to the counter columns; returns posts touched."""
+    from .feed import touch_creator_content
+
+    buffer = get_buffer()
+    pending = buffer.drain()
+    by_post = defaultdict(dict)
+    for (post_id, field), delta in pending.items():
+        if delta:
+            by_post[post_id][field] = delta
+    if not by_post:
+        return 0
+
+    try:
+        with transaction.atomic():
+            for post_id in sorted(by_post):
+                CreatorPost.objects.filter(pk=post_id).update(**{
+                    field: Greatest(F(field) + delta, Value(0))
+                    for field, delta in by_post[post_id].items()
+                })
+            creator_ids = CreatorPost.objects.filter(pk__in=by_post).values_list('creator_id', flat=True)
+            touch_creator_content(*set(creator_ids))
+    except Exception:
+        # put the deltas back for the next flush
+        for (post_id, field), delta in pending.items():
+            buffer.add(post_id, field, delta)
+        raise
+    return len(by_post)
+
+
+def recount():
+    """Rebuild both counters from the like/comment tables (repairs drift)."""
+    get_buffer().drain()
+
+    def count_of(model):
+        rows = (
+            model.objects.filter(post=OuterRef('pk'))
+            .order_by().values('post').annotate(total=Count('pk')).values('total')
+        )
+        return Coalesce(Subquery(rows), 0)
+
+    return CreatorPost.objects.update(likes_count=count_of(PostLike), comments_count=count_of(PostComment))
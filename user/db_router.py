@@ -0,0 +1,72 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+REPLICA_DB_ALIAS = 'replica'
+
+# Set for the length of a request whose view is replica safe (see
+# user.middleware.ReplicaRoutingMiddleware); _pinned is set by its first write.
+_replica_reads = ContextVar('replica_reads', default=False)
+_pinned = ContextVar('pinned_to_primary', default=False)
+
+
+def begin_request():
+    """Start a request on the primary; returns a token for ``end_request``."""
+    return _replica_reads.set(False), _pinned.set(False)
+
+
+def end_request(token):
+    reads, pinned = token
+    _pinned.reset(pinned)
+    _replica_reads.reset(reads)
+
+
+def allow_replica_reads():
+    """Let the rest of the current request read from the replica (until it writes)."""
+    _replica_reads.set(True)
+
+
+@contextmanager
+def replica_reads():
+    """Send reads in the block to the replica until something is written."""
+    token = begin_request()
+    allow_replica_reads()
+    try:
+        yield
+    finally:
+        end_request(token)
+
+
+def replica_safe(*methods):
+    """Mark a function view as read-only for ``methods``; class views set ``replica_safe_methods``."""
+    def decorate(view):
+        view.replica_safe_methods = methods
+        return view
+    return decorate
+
+
+class PrimaryReplicaRouter:
+    """
+    Reads inside ``replica_reads()`` go to the ``replica`` database, if one
+    is configured; everything else, and every read after the first write,
+    goes to ``default`` so a request always sees its own writes.
+
+    Anything that fills a shared cache reads with ``.using('default')``
+    instead, so replica lag can't outlive an invalidation in the cache.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and not _pinned.get() and REPLICA_DB_ALIAS in connections:
+            return REPLICA_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        if _replica_reads.get():
+            _pinned.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replica holds the same rows as default
+        return True
@@ -0,0 +1,19 @@
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+
+def ndjson_response(queryset, to_row, filename):
+    """
+    Stream ``queryset`` as newline-delimited JSON, one ``to_row(obj)`` per line.
+
+    Rows are pulled with ``iterator()`` so a full export never holds more
+    than EXPORT_CHUNK_SIZE rows in memory.
+    """
+    rows = queryset.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    lines = (json.dumps(to_row(row), cls=DjangoJSONEncoder) + "\n" for row in rows)
+    response = StreamingHttpResponse(lines, content_type="application/x-ndjson")
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
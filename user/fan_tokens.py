@@ -0,0 +1,90 @@
+from functools import partial
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F
+
+from .models import CreatorProfile
+
+
+HEADER = 'X-Fan-Token'
+SALT = 'user.fan_tokens'
+GENERATION_KEY = "fan_token_generation:{profile_id}"
+
+
+class InvalidFanToken(Exception):
+    pass
+
+
+# ---------------------------
+# GENERATIONS
+# ---------------------------
+def get_generation(profile_id):
+    """Current ``CreatorProfile.fan_token_generation``, cached; ``None`` if the profile is gone."""
+    key = GENERATION_KEY.format(profile_id=profile_id)
+    generation = cache.get(key)
+    if generation is None:
+        # primary only: a lagging replica would cache a revoked generation
+        generation = (
+            CreatorProfile.objects.using(DEFAULT_DB_ALIAS).filter(pk=profile_id)
+            .values_list('fan_token_generation', flat=True).first()
+        )
+        if generation is not None:
+            cache.set(key, generation, settings.FAN_TOKEN_GENERATION_CACHE_TIMEOUT)
+    return generation
+
+
+def forget_generation(profile_id):
+    cache.delete(GENERATION_KEY.format(profile_id=profile_id))
+
+
+def revoke(profile_id):
+    """Invalidate every fan token issued for ``profile_id`` so far."""
+    CreatorProfile.objects.filter(pk=profile_id).update(fan_token_generation=F('fan_token_generation') + 1)
+    transaction.on_commit(partial(forget_generation, profile_id))
+
+
+# ---------------------------
+# TOKENS
+# ---------------------------
+def issue(profile_id, email):
+    """
+    A signed token standing in for the fan's email and access code.
+
+    It holds the profile id, the fan's email and the profile's current
+    generation, signed with SECRET_KEY and timestamped; ``read`` rejects
+    it after FAN_TOKEN_MAX_AGE seconds.
+    """
+    payload = {'p': profile_id, 'e': email, 'g': get_generation(profile_id)}
+    return signing.dumps(payload, salt=SALT, compress=True)
+
+
+def read(token):
+    """
+    Verify ``token`` and return ``{'profile_id': ..., 'email': ...}``.
+
+    The signature and expiry are checked with no I/O; the revocation check
+    is a cache read. Raises ``InvalidFanToken`` otherwise.
+    """
+    try:
+        payload = signing.loads(token, salt=SALT, max_age=settings.FAN_TOKEN_MAX_AGE)
+    except signing.SignatureExpired:
+        raise InvalidFanToken("Fan token has expired.")
+    except signing.BadSignature:
+        raise InvalidFanToken("Invalid fan token.")
+    if payload['g'] != get_generation(payload['p']):
+        raise InvalidFanToken("Fan token has been revoked.")
+    return {'profile_id': payload['p'], 'email': payload['e']}
+
+
+def from_request(request):
+    return request.headers.get(HEADER) or None
+
+
+def attach(response, validated_data):
+    """Give a fan who identified with an access code a token for the next requests."""
+    if not validated_data.get('fan_token'):
+        response[HEADER] = issue(validated_data['creator_profile'].pk, validated_data['email'])
+    return response
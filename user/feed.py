@@ -0,0 +1,175 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .models import CreatorPost, CreatorProfile
+from .pagination import encode_cursor
+from .serializers import CreatorPostSerializer
+
+
+FEED_VERSION_KEY = "creator_feed:version:{creator_id}"
+FEED_PAGE_KEY = "creator_feed:{creator_id}:{version}:{page_size}:{base_url}"
+
+
+# ---------------------------
+# FIRST PAGE CACHE
+# ---------------------------
+def _feed_version(creator_id):
+    key = FEED_VERSION_KEY.format(creator_id=creator_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        # add() so two workers racing on a cold key agree on one version
+        cache.add(key, version, None)
+        version = cache.get(key, version)
+    return version
+
+
+def invalidate_creator_feed(creator_id):
+    """
+    Drop every cached first page for ``creator_id``.
+
+    Pages are keyed on a per-creator version, so swapping the version
+    orphans all of them at once (they age out via FEED_CACHE_TIMEOUT).
+    Runs after commit so a concurrent reader can't re-cache old rows.
+    """
+    key = FEED_VERSION_KEY.format(creator_id=creator_id)
+    transaction.on_commit(lambda: cache.set(key, uuid.uuid4().hex, None))
+
+
+def touch_creator_content(*creator_ids):
+    """
+    Record that content for ``creator_ids`` (user ids) changed: bump each
+    profile's content_version/content_updated_at, which clients revalidate
+    against, and drop the cached first pages.
+    """
+    CreatorProfile.objects.filter(user_id__in=creator_ids).update(
+        content_version=F('content_version') + 1, content_updated_at=timezone.now()
+    )
+    for creator_id in creator_ids:
+        invalidate_creator_feed(creator_id)
+
+
+# ---------------------------
+# CONDITIONAL REQUESTS
+# ---------------------------
+def content_validators(request, profile_id, version, updated_at, format=None):
+    """
+    ``(etag, last_modified)`` for a creator content response in ``format``,
+    by default the one DRF negotiated.
+    """
+    format = format or request.accepted_renderer.format
+    etag = quote_etag(f"{profile_id}-{version}-{format}")
+    return etag, int(updated_at.timestamp())
+
+
+def not_modified(request, etag, last_modified):
+    """A 304 if the client's copy is current, else None; runs before any serialization."""
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # per fan/user, and always revalidated: the stamp makes that a cheap 304
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+# ---------------------------
+# FEED PAGES
+# ---------------------------
+def _page_query(creator, cursor, page_size, using=None):
+    posts = CreatorPost.objects.feed_for(creator)
+    if using is not None:
+        posts = posts.using(using)
+    if cursor is not None:
+        created_at, pk = cursor
+        posts = posts.after(created_at, pk)
+    # one extra row tells us whether there is a next page
+    return posts.as_feed_rows()[:page_size + 1]
+
+
+def _finish_page(request, posts, page_size):
+    if len(posts) > page_size:
+        last = posts[page_size - 1]
+        next_cursor = encode_cursor(last['created_at'], last['id'])
+    else:
+        next_cursor = None
+    posts = posts[:page_size]
+    data = CreatorPostSerializer(posts, many=True, context={'request': request}).data
+    return {"posts": list(data), "next_cursor": next_cursor}
+
+
+def _first_page_key(request, creator, version, page_size):
+    return FEED_PAGE_KEY.format(
+        creator_id=creator.pk,
+        version=version,
+        page_size=page_size,
+        base_url=request.build_absolute_uri('/'),
+    )
+
+
+def _build_page(request, creator, cursor, page_size, using=None):
+    return _finish_page(request, list(_page_query(creator, cursor, page_size, using)), page_size)
+
+
+def get_feed_page(request, creator, cursor=None, page_size=None):
+    """
+    Return ``{"posts": [...], "next_cursor": ...}`` for ``creator``, newest first.
+
+    Pages are keyset paginated on (created_at, id) so deep pages cost the
+    same as the first one. The first page is what almost every fan asks
+    for, so it is cached per creator (and per host, since post URLs are
+    absolute) until a post is saved or deleted. The cached page is always
+    read from the primary: a lagging replica could otherwise put a page
+    back into the cache right after the invalidation meant to drop it.
+    """
+    page_size = page_size or settings.FEED_PAGE_SIZE
+    if cursor is not None:
+        return _build_page(request, creator, cursor, page_size)
+
+    key = _first_page_key(request, creator, _feed_version(creator.pk), page_size)
+    page = cache.get(key)
+    if page is None:
+        page = _build_page(request, creator, None, page_size, using=DEFAULT_DB_ALIAS)
+        cache.set(key, page, settings.FEED_CACHE_TIMEOUT)
+    return page
+
+
+async def _afeed_version(creator_id):
+    key = FEED_VERSION_KEY.format(creator_id=creator_id)
+    version = await cache.aget(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        await cache.aadd(key, version, None)
+        version = await cache.aget(key, version)
+    return version
+
+
+async def _abuild_page(request, creator, cursor, page_size, using=None):
+    posts = [post async for post in _page_query(creator, cursor, page_size, using)]
+    return _finish_page(request, posts, page_size)
+
+
+async def aget_feed_page(request, creator, cursor=None, page_size=None):
+    """``get_feed_page`` for async views: same cache, async ORM and cache calls."""
+    page_size = page_size or settings.FEED_PAGE_SIZE
+    if cursor is not None:
+        return await _abuild_page(request, creator, cursor, page_size)
+
+    key = _first_page_key(request, creator, await _afeed_version(creator.pk), page_size)
+    page = await cache.aget(key)
+    if page is None:
+        page = await _abuild_page(request, creator, None, page_size, using=DEFAULT_DB_ALIAS)
+        await cache.aset(key, page, settings.FEED_CACHE_TIMEOUT)
+    return page
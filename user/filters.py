@@ -0,0 +1,29 @@
+import django_filters
+
+from . import search
+from .models import CreatorPost, User
+
+
+class PostSearchFilter(django_filters.FilterSet):
+    """``?q=`` full-text search (ranked, see user.search), optionally within one ``?creator=`` profile id."""
+    q = django_filters.CharFilter(method='search', required=True)
+    creator = django_filters.NumberFilter(field_name='creator__creator_profile')
+
+    class Meta:
+        model = CreatorPost
+        fields = ['q', 'creator']
+
+    def search(self, queryset, name, value):
+        return search.search_posts(value, queryset)
+
+
+class CreatorSearchFilter(django_filters.FilterSet):
+    q = django_filters.CharFilter(method='search', required=True)
+    is_active = django_filters.BooleanFilter()
+
+    class Meta:
+        model = User
+        fields = ['q', 'is_active']
+
+    def search(self, queryset, name, value):
+        return search.search_creators(value, queryset)
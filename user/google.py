@@ -1,11 +1,9 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
 from .models import User
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
-from django.conf import settings
+from .tokens import UserRefreshToken
+from .google_verifier import verify_google_id_token
 
 
 class GoogleAuthView(APIView):
@@ -17,11 +15,7 @@ class GoogleAuthView(APIView):
             return Response({"error": "ID token is required"}, status=400)
 
         try:
-            idinfo = id_token.verify_oauth2_token(
-                id_token_from_frontend,
-                google_requests.Request(),
-                settings.GOOGLE_CLIENT_ID
-            )
+            idinfo = verify_google_id_token(id_token_from_frontend)
 
             email = idinfo.get("email")
             full_name = idinfo.get("name", "")
@@ -40,9 +34,9 @@ class GoogleAuthView(APIView):
 
             if created:
                 user.set_unusable_password()
-                user.save()
+                user.save(update_fields=['password'])
 
-            refresh = RefreshToken.for_user(user)
+            refresh = UserRefreshToken.for_user(user)
 
             return Response({
                 "refresh": str(refresh),
@@ -0,0 +1,138 @@
+import re
+import threading
+import time
+
+import requests
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from google.auth import exceptions as google_exceptions
+from google.auth import jwt
+from requests.adapters import HTTPAdapter
+
+
+GOOGLE_ISSUERS = ('accounts.google.com', 'https://accounts.google.com')
+MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+class GoogleTokenError(ValueError):
+    """Token rejected, or Google's certificates couldn't be fetched."""
+
+
+class GoogleTokenVerifier:
+    """
+    Verifies Google ID tokens locally against a cached copy of Google's certs.
+
+    ``google.oauth2.id_token.verify_oauth2_token`` downloads the certs on
+    every call. Here they are fetched over a pooled session and kept until
+    the ``Cache-Control: max-age`` Google sends (minus ``Age``) runs out.
+    A token signed with a key we haven't seen triggers an early refetch,
+    at most once per ``min_refetch_interval`` so junk tokens can't turn
+    into a stream of requests to Google. If a refresh fails, the last good
+    certs are kept for another ``retry_after`` seconds before trying again.
+    """
+
+    def __init__(self, certs_url, audience, timeout=5, default_max_age=300, min_refetch_interval=60,
+                 retry_after=30):
+        self.certs_url = certs_url
+        self.audience = audience
+        self.timeout = timeout
+        self.default_max_age = default_max_age
+        self.min_refetch_interval = min_refetch_interval
+        self.retry_after = retry_after
+
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=10))
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=10))
+
+        self._certs = {}
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            certs_url=settings.GOOGLE_CERTS_URL,
+            audience=settings.GOOGLE_CLIENT_ID,
+            timeout=settings.GOOGLE_CERTS_TIMEOUT,
+        )
+
+    def certs(self, key_id=None):
+        """Current ``{kid: PEM certificate}``, refreshed when stale or missing ``key_id``."""
+        with self._lock:
+            now = time.monotonic()
+            fresh = now < self._expires_at
+            if fresh and (key_id is None or key_id in self._certs):
+                return self._certs
+            if fresh and now - self._fetched_at < self.min_refetch_interval:
+                return self._certs  # unknown kid, but we just asked Google
+            self._fetch(now)
+            return self._certs
+
+    def _fetch(self, now):
+        try:
+            response = self.session.get(self.certs_url, timeout=self.timeout)
+            response.raise_for_status()
+            certs = response.json()
+        except (requests.RequestException, ValueError) as exc:
+            if self._certs:
+                # keep serving the last good set, without asking again on every request
+                self._fetched_at = now
+                self._expires_at = now + self.retry_after
+                return
+            raise GoogleTokenError(f"Could not fetch Google certificates: {exc}")
+
+        match = MAX_AGE_RE.search(response.headers.get('Cache-Control', ''))
+        max_age = int(match.group(1)) if match else self.default_max_age
+        try:
+            max_age -= int(response.headers.get('Age', 0))
+        except ValueError:
+            pass
+
+        self._certs = certs
+        self._fetched_at = now
+        self._expires_at = now + max(max_age, 0)
+
+    def verify(self, token):
+        """Return the token's claims, or raise ``GoogleTokenError``."""
+        try:
+            header = jwt.decode_header(token)
+            claims = jwt.decode(
+                token,
+                certs=self.certs(header.get('kid')),
+                audience=self.audience,
+                clock_skew_in_seconds=settings.GOOGLE_CLOCK_SKEW,
+            )
+        except GoogleTokenError:
+            raise
+        except (ValueError, google_exceptions.GoogleAuthError) as exc:
+            raise GoogleTokenError(str(exc))
+
+        if claims.get('iss') not in GOOGLE_ISSUERS:
+            raise GoogleTokenError("Wrong issuer.")
+        return claims
+
+
+_verifier = None
+_verifier_lock = threading.Lock()
+
+
+def get_google_verifier():
+    global _verifier
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                _verifier = GoogleTokenVerifier.from_settings()
+    return _verifier
+
+
+@receiver(setting_changed)
+def _reset_verifier(setting, **kwargs):
+    global _verifier
+    if setting in ('GOOGLE_CERTS_URL', 'GOOGLE_CLIENT_ID', 'GOOGLE_CERTS_TIMEOUT'):
+        _verifier = None
+
+
+def verify_google_id_token(token):
+    return get_google_verifier().verify(token)
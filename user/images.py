@@ -0,0 +1,132 @@
+import io
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from .models import CreatorPost, CreatorProfile
+
+
+# variant key -> (Pillow format, file extension)
+FORMATS = {
+    'webp': ('WEBP', 'webp'),
+    'jpeg': ('JPEG', 'jpg'),
+}
+
+
+def variants_are_current(field_file, record):
+    return bool(field_file) and (record or {}).get('source') == field_file.name
+
+
+def variant_widths(original_width):
+    """Configured widths below the original, plus the original if it isn't huge."""
+    widths = [w for w in settings.IMAGE_VARIANT_WIDTHS if w < original_width]
+    if original_width <= max(settings.IMAGE_VARIANT_WIDTHS):
+        widths.append(original_width)
+    return widths
+
+
+def build_variants(field_file):
+    """
+    Render ``field_file`` at every variant width in every variant format.
+
+    Returns the record stored on the model::
+
+        {"source": "creator_images/a.jpg",
+         "webp": {"320": "derivatives/creator_images/a_320w.webp", ...},
+         "jpeg": {...}}
+    """
+    storage = field_file.storage
+    stem = os.path.splitext(field_file.name)[0]
+    with field_file.open('rb'):
+        original = ImageOps.exif_transpose(Image.open(field_file))
+        original.load()
+
+    record = {'source': field_file.name}
+    for key in settings.IMAGE_VARIANT_FORMATS:
+        pil_format, extension = FORMATS[key]
+        record[key] = {}
+        for width in variant_widths(original.width):
+            image = original.copy()
+            image.thumbnail((width, original.height))
+            if pil_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+            buffer = io.BytesIO()
+            image.save(buffer, pil_format, quality=settings.IMAGE_VARIANT_QUALITY)
+            name = f"derivatives/{stem}_{width}w.{extension}"
+            record[key][str(width)] = storage.save(name, ContentFile(buffer.getvalue()))
+    return record
+
+
+def variant_names(record):
+    return [name for key in FORMATS for name in (record or {}).get(key, {}).values()]
+
+
+def discard_variants(record, storage):
+    for name in variant_names(record):
+        storage.delete(name)
+
+
+def srcset(field_file, record, build_url):
+    """
+    ``{"webp": "<url> 320w, <url> 640w", "jpeg": ...}`` for an image field,
+    or ``None`` until its variants have been generated.
+    """
+    if not field_file:
+        return None
+    storage = field_file.storage
+    return srcset_for_name(field_file.name, record, lambda name: build_url(storage.url(name)))
+
+
+def srcset_for_name(source, record, url_for):
+    """``srcset`` from a stored file name, for code working off ``values()`` rows."""
+    if not source or (record or {}).get('source') != source:
+        return None
+    return {
+        key: ", ".join(
+            f"{url_for(name)} {width}w"
+            for width, name in sorted(record[key].items(), key=lambda item: int(item[0]))
+        )
+        for key in FORMATS
+        if record.get(key)
+    }
+
+
+def _refresh(model, pk, field_name, record_name):
+    instance = model.objects.filter(pk=pk).only('pk', field_name, record_name).first()
+    if instance is None:
+        return None
+    field_file = getattr(instance, field_name)
+    old_record = getattr(instance, record_name)
+    if not field_file or variants_are_current(field_file, old_record):
+        return None
+
+    record = build_variants(field_file)
+    # only store the record if the image wasn't replaced in the meantime
+    if model.objects.filter(pk=pk, **{field_name: field_file.name}).update(**{record_name: record}):
+        discard_variants(old_record, field_file.storage)
+    else:
+        discard_variants(record, field_file.storage)
+    return instance
+
+
+def generate_post_variants(post_id):
+    """Task: (re)build CreatorPost.image_variants."""
+    from .feed import touch_creator_content
+
+    post = _refresh(CreatorPost, post_id, 'image', 'image_variants')
+    if post is not None:
+        touch_creator_content(post.creator_id)
+
+
+def generate_profile_variants(profile_id):
+    """Task: (re)build CreatorProfile.picture_variants."""
+    from .access_codes import invalidate_access_code
+    from .feed import touch_creator_content
+
+    profile = _refresh(CreatorProfile, profile_id, 'profile_picture', 'picture_variants')
+    if profile is not None:
+        touch_creator_content(profile.user_id)
+        # resolved profiles are cached with their picture_variants
+        invalidate_access_code(profile.access_code, profile_ids=[profile.pk])
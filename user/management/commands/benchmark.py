@@ -0,0 +1,94 @@
+import json
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from user.benchmarks import get_suites
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a benchmark suite against a throwaway test database. "
+        "Never touches the configured database's data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('suite', help="Suite to run (see user.benchmarks).")
+        parser.add_argument('--requests', type=int, help="Operations per measurement (suite default if omitted).")
+        parser.add_argument('--concurrency', type=int, help="In-flight requests for concurrent suites.")
+        parser.add_argument('--json', dest='json_path', help="Also write the result rows to this file.")
+        parser.add_argument(
+            '--baseline',
+            help="Fail if any row uses more queries than this earlier --json output "
+                 "(and, with --tolerance, if it is slower).",
+        )
+        parser.add_argument(
+            '--tolerance', type=float,
+            help="Also fail on a p50/p95 slowdown against --baseline of more than this fraction. "
+                 "Off by default: latencies only compare between runs on the same machine.",
+        )
+
+    def handle(self, *args, **options):
+        suites = get_suites()
+        if options['suite'] not in suites:
+            raise CommandError(f"Unknown suite {options['suite']!r}; choose from {', '.join(sorted(suites))}.")
+
+        # 4xx responses are part of some suites; don't log each one
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+        # nor each placeholder upload user.video can't parse
+        logging.getLogger('user.video').setLevel(logging.ERROR)
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            overrides = {
+                name: options[name] for name in ('requests', 'concurrency') if options[name] is not None
+            }
+            rows = suites[options['suite']](**overrides)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.print_rows(rows)
+        if options['json_path']:
+            with open(options['json_path'], 'w') as handle:
+                json.dump(rows, handle, indent=2)
+        if options['baseline']:
+            with open(options['baseline']) as handle:
+                baseline = json.load(handle)
+            regressions = compare(rows, baseline, options['tolerance'])
+            if regressions:
+                raise CommandError("Regressions against baseline:\n  " + "\n  ".join(regressions))
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['baseline']}."))
+
+    def print_rows(self, rows):
+        columns = list(dict.fromkeys(key for row in rows for key in row))
+        widths = {c: max(len(c), *(len(str(row.get(c, ''))) for row in rows)) for c in columns}
+        self.stdout.write('  '.join(c.ljust(widths[c]) for c in columns))
+        for row in rows:
+            self.stdout.write('  '.join(str(row.get(c, '')).ljust(widths[c]) for c in columns))
+
+
+def compare(rows, baseline, tolerance=None):
+    """
+    Describe each way ``rows`` is worse than ``baseline`` (rows matched by
+    name). Latencies are only checked when ``tolerance`` is given.
+    """
+    baseline = {row['name']: row for row in baseline}
+    regressions = []
+    for row in rows:
+        before = baseline.get(row['name'])
+        if before is None:
+            continue
+        if row.get('queries', 0) > before.get('queries', row.get('queries', 0)):
+            regressions.append(f"{row['name']}: {row['queries']} queries (baseline {before['queries']})")
+        if tolerance is None:
+            continue
+        for column in ('p50_ms', 'p95_ms'):
+            if column in before and row[column] > before[column] * (1 + tolerance):
+                regressions.append(f"{row['name']}: {column} {row[column]} (baseline {before[column]})")
+    missing = sorted(set(baseline) - {row['name'] for row in rows})
+    regressions.extend(f"{name}: missing from this run" for name in missing)
+    return regressions
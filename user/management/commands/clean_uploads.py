@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from user import uploads
+
+
+class Command(BaseCommand):
+    help = "Delete chunked uploads that were never completed, and their stored parts."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-age', type=int, default=None,
+            help=f"Seconds an upload may stay incomplete (default {settings.UPLOAD_SESSION_MAX_AGE}).",
+        )
+        parser.add_argument('--dry-run', action='store_true', help="Report what would be deleted.")
+
+    def handle(self, *args, **options):
+        sessions, orphans = uploads.expire_sessions(max_age=options['max_age'], dry_run=options['dry_run'])
+        verb = "Would remove" if options['dry_run'] else "Removed"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {sessions} abandoned uploads and {orphans} orphaned part directories."
+        ))
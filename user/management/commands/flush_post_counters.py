@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from user import counters
+
+
+class Command(BaseCommand):
+    help = "Write buffered like/comment counts to CreatorPost (run from cron when REDIS_URL is set)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--recount', action='store_true',
+            help="Recount every post from the like/comment tables instead.",
+        )
+
+    def handle(self, *args, **options):
+        if options['recount']:
+            updated = counters.recount()
+            self.stdout.write(self.style.SUCCESS(f"Recounted likes and comments on {updated} posts."))
+            return
+        flushed = counters.flush()
+        self.stdout.write(self.style.SUCCESS(f"Flushed counters for {flushed} posts."))
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from user import storage
+
+
+class Command(BaseCommand):
+    help = "Delete content-addressed media blobs that nothing has referenced for the grace period."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--recount', action='store_true',
+            help="Rebuild reference counts from the file fields first (repairs drift).",
+        )
+        parser.add_argument(
+            '--grace', type=int, default=None,
+            help=f"Seconds a blob must have been unreferenced (default {settings.MEDIA_BLOB_GC_GRACE}).",
+        )
+        parser.add_argument('--dry-run', action='store_true', help="Report what would be deleted.")
+
+    def handle(self, *args, **options):
+        if options['recount']:
+            changed = storage.recount()
+            self.stdout.write(f"Recounted references; {changed} blobs changed.")
+        removed, freed = storage.collect_garbage(grace=options['grace'], dry_run=options['dry_run'])
+        verb = "Would remove" if options['dry_run'] else "Removed"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {removed} blobs ({freed} bytes)."))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from user import images
+from user.models import CreatorPost, CreatorProfile
+
+
+class Command(BaseCommand):
+    help = "Build missing or stale responsive variants for profile pictures and post images."
+
+    def handle(self, *args, **options):
+        profiles = CreatorProfile.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+        for profile_id in profiles.values_list('pk', flat=True).iterator():
+            images.generate_profile_variants(profile_id)
+
+        posts = CreatorPost.objects.exclude(image='').exclude(image__isnull=True)
+        for post_id in posts.values_list('pk', flat=True).iterator():
+            images.generate_post_variants(post_id)
+
+        self.stdout.write(self.style.SUCCESS("Image variants are up to date."))
@@ -0,0 +1,39 @@
+import csv
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from user.provisioning import provision_creators, refill_pool
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-create creators from a CSV file with email,full_name[,password,bio] "
+        "columns, or just top up the access-code pool with --refill-pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', nargs='?', help="CSV file with a header row.")
+        parser.add_argument('--batch-size', type=int, help="Rows per bulk_create batch.")
+        parser.add_argument('--refill-pool', action='store_true', help="Fill the access-code pool and exit.")
+        parser.add_argument('--output', help="Write created creators (with access codes) to this JSON file.")
+
+    def handle(self, *args, **options):
+        if options['refill_pool']:
+            added = refill_pool()
+            self.stdout.write(self.style.SUCCESS(f"Added {added} access codes to the pool."))
+            return
+        if not options['csv_path']:
+            raise CommandError("Give a CSV file, or --refill-pool.")
+
+        with open(options['csv_path'], newline='') as handle:
+            reader = csv.DictReader(handle)
+            missing = {'email', 'full_name'} - set(reader.fieldnames or ())
+            if missing:
+                raise CommandError(f"CSV is missing columns: {', '.join(sorted(missing))}")
+            created, skipped = provision_creators(reader, batch_size=options['batch_size'])
+
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(created, handle, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Created {len(created)} creators, skipped {len(skipped)} existing emails."))
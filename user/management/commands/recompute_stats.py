@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from user import stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the admin dashboard counters from the source tables. "
+        "Run once after deploying the counters, or whenever they drift."
+    )
+
+    def handle(self, *args, **options):
+        counters = stats.recompute()
+        for key in sorted(counters):
+            self.stdout.write(f"{key}: {counters[key]}")
+        self.stdout.write(self.style.SUCCESS(f"Recomputed {len(counters)} counters."))
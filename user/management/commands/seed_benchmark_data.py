@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from user.benchmarks.seed import SEED_DOMAIN, seed
+
+
+class Command(BaseCommand):
+    # hosts that can only be a developer's own database server
+    LOCAL_HOSTS = ('', 'localhost', '127.0.0.1', '::1')
+
+    help = (
+        "Fill the configured database with benchmark data: creators with posts, "
+        f"likes, comments and cards, plus customer accounts (all @{SEED_DOMAIN}). "
+        "For local load testing; `manage.py benchmark` seeds its own scratch database. "
+        "Only runs against SQLite, a database on this machine or a test_ database, and "
+        "outside DEBUG only with --yes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--creators', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=50, help="Posts per creator.")
+        parser.add_argument('--likes', type=int, default=5, help="Likes per post.")
+        parser.add_argument('--comments', type=int, default=3, help="Comments per post.")
+        parser.add_argument('--cards', type=int, default=2, help="Credit cards per creator.")
+        parser.add_argument('--users', type=int, default=500, help="Customer accounts.")
+        parser.add_argument('--batch-size', type=int, default=2000, help="Rows per bulk_create batch.")
+        parser.add_argument('--yes', action='store_true', help="Seed even though DEBUG is off.")
+
+    def handle(self, *args, **options):
+        counts = {name: options[name] for name in ('creators', 'posts', 'likes', 'comments', 'cards', 'users')}
+        if any(value < 0 for value in counts.values()):
+            raise CommandError("Counts can't be negative.")
+        if not self.is_local(connection.settings_dict):
+            raise CommandError(
+                f"Refusing to seed {connection.settings_dict['NAME']!r} on "
+                f"{connection.settings_dict.get('HOST')!r}: not a local or test database."
+            )
+        if not (settings.DEBUG or options['yes']):
+            raise CommandError("DEBUG is off; pass --yes to seed anyway.")
+        created = seed(batch_size=options['batch_size'], **counts)
+        self.stdout.write(self.style.SUCCESS(
+            "Created " + ", ".join(f"{count} {name.replace('_', ' ')}" for name, count in created.items()) + "."
+        ))
+
+    def is_local(self, settings_dict):
+        if settings_dict['ENGINE'] == 'django.db.backends.sqlite3':
+            return True
+        name = str(settings_dict.get('NAME') or '')
+        return settings_dict.get('HOST') in self.LOCAL_HOSTS or name.startswith('test_')
@@ -1,4 +1,5 @@
 from django.contrib.auth.models import BaseUserManager
+from django.db import models
 from django.utils.crypto import get_random_string
 
 class AppUserManager(BaseUserManager):
@@ -32,3 +33,34 @@ class AppUserManager(BaseUserManager):
             raise ValueError("Superuser must have is_superuser=True.")
 
         return self.create_user(email, username, password, **extra_fields)
+
+
+class CreatorPostQuerySet(models.QuerySet):
+    # Columns CreatorPostSerializer actually reads when rendering a feed.
+    FEED_COLUMNS = (
+        'id', 'creator', 'title', 'description', 'video', 'image', 'image_variants',
+        'duration', 'width', 'height', 'bitrate', 'likes_count', 'comments_count', 'created_at',
+    )
+    # The same as values() keys; CreatorPostListSerializer renders these rows
+    FEED_VALUES = tuple(name for name in FEED_COLUMNS if name != 'creator')
+
+    def feed_for(self, user):
+        """
+        Posts by ``user`` newest first, in the exact order of the
+        (creator, -created_at, id) index so the database never sorts.
+        """
+        return (
+            self.filter(creator=user)
+            .order_by('-created_at', 'id')
+            .only(*self.FEED_COLUMNS)
+        )
+
+    def after(self, created_at, pk):
+        """Keyset filter: rows that follow (created_at, pk) in feed order."""
+        return self.filter(
+            models.Q(created_at__lt=created_at) | models.Q(created_at=created_at, id__gt=pk)
+        )
+
+    def as_feed_rows(self):
+        """``values()`` rows with just the feed columns, for CreatorPostListSerializer."""
+        return self.values(*self.FEED_VALUES)
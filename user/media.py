@@ -0,0 +1,201 @@
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.http import FileResponse, Http404, HttpResponse
+from django.urls import reverse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.encoding import filepath_to_uri, iri_to_uri
+from django.utils.http import RFC3986_SUBDELIMS, http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_safe
+
+from .storage import is_blob
+
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+# What serve_media will hand out: content-addressed blobs (not blobs/tmp/
+# staging files) and the upload_to/variant directories of older names.
+# Everything else under MEDIA_ROOT is a 404.
+SERVED_BLOB_RE = re.compile(r"^blobs/[0-9a-f]{2}/[^/]+$")
+SERVED_DIRS = ('profile_pics/', 'creator_images/', 'creator_videos/', 'derivatives/')
+# what reverse() leaves unquoted in a path argument
+REVERSE_SAFE = RFC3986_SUBDELIMS + "/~:@"
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+class RangeFile:
+    """File wrapper that stops after ``length`` bytes (for 206 bodies)."""
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    Parse a ``Range`` header into an inclusive ``(start, end)`` pair.
+
+    Returns ``None`` when the whole file should be sent: no header,
+    syntax we don't understand, or several ranges (which RFC 9110 lets us
+    ignore). Raises ``RangeNotSatisfiable`` for ranges past the end.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+
+    if first == '':
+        # suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    end = int(last) if last else size - 1
+    return start, min(end, size - 1)
+
+
+def _if_range_matches(request, etag, last_modified):
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serve a media file from MEDIA_ROOT with the headers video players need.
+    Only blobs and the SERVED_DIRS are served.
+
+    Handles ``Range`` (single ranges, ``206``/``416``), ``If-Range``,
+    ``ETag``/``If-None-Match`` and ``Last-Modified``/``If-Modified-Since``.
+    Content-addressed blobs (see user.storage) never change, so they are
+    marked ``immutable`` and cached for MEDIA_BLOB_MAX_AGE.
+    Full-file bodies go out as a ``FileResponse`` so the WSGI server can
+    use sendfile. With MEDIA_ACCEL_REDIRECT_PREFIX set, the body (and range
+    handling) is handed to nginx through ``X-Accel-Redirect`` instead.
+    """
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+        file_stat = os.stat(fullpath)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404("File not found")
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404("File not found")
+    name = os.path.relpath(fullpath, settings.MEDIA_ROOT).replace(os.sep, '/')
+    if not (name.startswith(SERVED_DIRS) or SERVED_BLOB_RE.match(name)):
+        raise Http404("File not found")
+
+    size = file_stat.st_size
+    etag = quote_etag(f"{file_stat.st_mtime_ns:x}-{size:x}")
+    last_modified = int(file_stat.st_mtime)
+    content_type = mimetypes.guess_type(fullpath)[0] or 'application/octet-stream'
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = _file_response(request, path, fullpath, size, content_type, etag, last_modified)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Accept-Ranges'] = 'bytes'
+    if is_blob(path):
+        patch_cache_control(response, public=True, max_age=settings.MEDIA_BLOB_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=settings.MEDIA_CACHE_MAX_AGE)
+    return response
+
+
+def _file_response(request, path, fullpath, size, content_type, etag, last_modified):
+    if settings.MEDIA_ACCEL_REDIRECT_PREFIX:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(path)
+        return response
+
+    byte_range = None
+    if _if_range_matches(request, etag, last_modified):
+        try:
+            byte_range = parse_range(request.headers.get('Range'), size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    file = open(fullpath, 'rb')
+    if byte_range is None:
+        return FileResponse(file, content_type=content_type)
+
+    start, end = byte_range
+    file.seek(start)
+    response = FileResponse(RangeFile(file, end - start + 1), status=206, content_type=content_type)
+    response['Content-Length'] = end - start + 1
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
+
+
+# ---------------------------
+# URL BUILDING
+# ---------------------------
+class MediaURLBuilder:
+    """
+    Absolute media URLs for one request, for serializing long lists.
+
+    Produces exactly what ``request.build_absolute_uri(storage.url(name))``
+    and ``reverse('media', ...)`` would, but works out the scheme/host,
+    storage base URL and route prefix once instead of per file.
+    """
+
+    def __init__(self, request, storage=None):
+        self.request = request
+        self.storage = storage or default_storage
+        self.origin = request.build_absolute_uri('/')[:-1]
+        self.route_prefix = reverse('media', kwargs={'path': '_'})[:-1]
+        base_url = getattr(self.storage, 'base_url', None)
+        # FileSystemStorage.url() is urljoin(base_url, name); skip the urljoin
+        self.storage_prefix = (
+            base_url if isinstance(self.storage, FileSystemStorage) and base_url and base_url.endswith('/') else None
+        )
+
+    def absolute(self, location):
+        if location.startswith('/') and not location.startswith('//') and '/./' not in location and '/../' not in location:
+            return iri_to_uri(self.origin + location)
+        return self.request.build_absolute_uri(location)
+
+    def file_url(self, name):
+        """``build_absolute_uri(storage.url(name))``"""
+        if self.storage_prefix is not None and '..' not in name and ':' not in name:
+            return self.absolute(self.storage_prefix + filepath_to_uri(name).lstrip('/'))
+        return self.request.build_absolute_uri(self.storage.url(name))
+
+    def served_url(self, name):
+        """``build_absolute_uri(reverse('media', kwargs={'path': name}))``"""
+        if name.startswith('/') or '..' in name or '/./' in name:
+            return self.request.build_absolute_uri(reverse('media', kwargs={'path': name}))
+        return self.absolute(self.route_prefix + quote(name, safe=REVERSE_SAFE))
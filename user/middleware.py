@@ -0,0 +1,224 @@
+import cProfile
+import logging
+import os
+import random
+import tempfile
+import time
+import uuid
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from rest_framework import exceptions
+
+from . import db_router
+from .models import User
+from .tokens import StatelessJWTAuthentication
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """Per-request totals: ``spans[name] = [count, seconds]``, the total and any profiler."""
+
+    def __init__(self):
+        self.spans = {}
+        self.profiler = None
+        self.total = 0.0
+
+    def add(self, name, seconds):
+        span = self.spans.setdefault(name, [0, 0.0])
+        span[0] += 1
+        span[1] += seconds
+
+
+@contextmanager
+def span(name):
+    """Add the time spent in the block to the current request's ``name`` total."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+# ---------------------------
+# HOOKS
+# ---------------------------
+def _db_wrapper(execute, sql, params, many, context):
+    with span('db'):
+        return execute(sql, params, many, context)
+
+
+# ---------------------------
+# MIDDLEWARE
+# ---------------------------
+class RequestTimingMiddleware:
+    """
+    Times a sample of requests and reports where the time went.
+
+    Sampled requests get one ``user.middleware`` log line with the ``db``
+    (time and query count), ``serialize`` and ``total`` timings in
+    ``extra['timing']``; when the request carries an admin JWT, the same
+    numbers go back in a ``Server-Timing`` header. REQUEST_TIMING
+    ['SAMPLE_RATE'] is the fraction of requests sampled (none by default).
+
+    ``serialize`` is whatever runs inside span('serialize'): list
+    serializers built on user.serializers.TimedListSerializer and the
+    admin list row builders. Other serializers are not timed.
+
+    ``db`` comes from execute_wrapper() on this thread's connections, so
+    it misses queries made on other threads (an async view's ORM calls go
+    through sync_to_async worker threads) and queries made while a
+    streaming body (NDJSON exports) is iterated, which happens after this
+    middleware has returned and the header has been set.
+
+    Sync and async capable, like Django's own middleware, so async views
+    don't pay for a thread hop on every request.
+
+    An admin (JWT) sending REQUEST_TIMING['PROFILE_HEADER'] gets the
+    request run under cProfile; the stats are dumped to PROFILE_DIR and
+    the file name returned in ``X-Profile-Dump``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        config = settings.REQUEST_TIMING
+        profile = self._wants_profile(request, config) and self._is_admin(request)
+        if not profile and random.random() >= config['SAMPLE_RATE']:
+            return self.get_response(request)
+        with self._measure(profile) as timings:
+            response = self.get_response(request)
+        return self._report(request, response, timings, config, profile or self._is_admin(request))
+
+    async def __acall__(self, request):
+        config = settings.REQUEST_TIMING
+        # the admin check may query the database, so it runs off the event loop
+        profile = self._wants_profile(request, config) and await sync_to_async(self._is_admin)(request)
+        if not profile and random.random() >= config['SAMPLE_RATE']:
+            return await self.get_response(request)
+        with self._measure(profile) as timings:
+            response = await self.get_response(request)
+        admin = profile or await sync_to_async(self._is_admin)(request)
+        return self._report(request, response, timings, config, admin)
+
+    @contextmanager
+    def _measure(self, profile):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        timings.profiler = cProfile.Profile() if profile else None
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_db_wrapper))
+                if timings.profiler is not None:
+                    timings.profiler.enable()
+                    stack.callback(timings.profiler.disable)
+                yield timings
+        finally:
+            _current.reset(token)
+            timings.total = time.perf_counter() - started
+
+    def _report(self, request, response, timings, config, admin):
+        queries, db_time = timings.spans.get('db', (0, 0.0))
+        serialize_time = timings.spans.get('serialize', (0, 0.0))[1]
+        # query counts and timings are for staff, not every client
+        if admin:
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={db_time * 1000:.1f};desc="{queries} queries"',
+                f'serialize;dur={serialize_time * 1000:.1f}',
+                f'total;dur={timings.total * 1000:.1f}',
+            ])
+        if timings.profiler is not None:
+            response['X-Profile-Dump'] = self._dump(timings.profiler, config)
+
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': queries,
+            'db_ms': round(db_time * 1000, 1),
+            'serialize_ms': round(serialize_time * 1000, 1),
+            'total_ms': round(timings.total * 1000, 1),
+        }
+        logger.info(' '.join(f'{key}={value}' for key, value in fields.items()), extra={'timing': fields})
+        return response
+
+    def _wants_profile(self, request, config):
+        return bool(request.headers.get(config['PROFILE_HEADER']))
+
+    def _is_admin(self, request):
+        # DRF authenticates inside the view; check the bearer token here
+        try:
+            result = StatelessJWTAuthentication().authenticate(request)
+        except exceptions.APIException:
+            return False
+        return result is not None and str(result[0].role).upper() == User.ROLE.ADMIN
+
+    def _dump(self, profiler, config):
+        directory = config['PROFILE_DIR'] or os.path.join(tempfile.gettempdir(), 'request-profiles')
+        os.makedirs(directory, exist_ok=True)
+        name = f'{time.strftime("%Y%m%d-%H%M%S")}-{uuid.uuid4().hex[:8]}.prof'
+        profiler.dump_stats(os.path.join(directory, name))
+        logger.info("Profile written to %s", os.path.join(directory, name))
+        return name
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Lets views that declare the request method in ``replica_safe_methods``
+    read from the replica (see user.db_router). The first write pins the
+    rest of the request to the primary.
+
+    Sync and async capable; in an async stack process_view is a coroutine
+    too, so Django doesn't run it through sync_to_async.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+            self.process_view = self._aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = db_router.begin_request()
+        try:
+            return self.get_response(request)
+        finally:
+            db_router.end_request(token)
+
+    async def __acall__(self, request):
+        token = db_router.begin_request()
+        try:
+            return await self.get_response(request)
+        finally:
+            db_router.end_request(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = getattr(view_func, 'view_class', view_func)
+        if request.method in getattr(view, 'replica_safe_methods', ()):
+            db_router.allow_replica_reads()
+
+    async def _aprocess_view(self, request, view_func, view_args, view_kwargs):
+        return ReplicaRoutingMiddleware.process_view(self, request, view_func, view_args, view_kwargs)
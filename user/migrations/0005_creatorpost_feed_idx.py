@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 06:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0004_user_date_joined'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='creatorpost',
+            index=models.Index(fields=['creator', '-created_at', 'id'], name='creatorpost_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2 on 2026-10-18 06:10
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+
+def seed_counters(apps, schema_editor):
+    # Same counters as user.stats.recompute(), written against the models as
+    # they are at this migration so later changes to user.stats can't alter it
+    db = schema_editor.connection.alias
+    User = apps.get_model('user', 'User')
+    CreatorPost = apps.get_model('user', 'CreatorPost')
+    CreditCard = apps.get_model('bwt', 'CreditCard')
+    StatCounter = apps.get_model('user', 'StatCounter')
+
+    creators = User.objects.using(db).filter(role='CREATOR', creator_profile__isnull=False)
+    counters = {
+        'creators.total': creators.count(),
+        'creators.active': creators.filter(is_active=True).count(),
+        'posts.total': CreatorPost.objects.using(db).count(),
+        'credit_cards.total': CreditCard.objects.using(db).count(),
+    }
+    monthly = [
+        ('creators.month', User.objects.using(db).filter(role='CREATOR'), 'date_joined'),
+        ('credit_cards.month', CreditCard.objects.using(db).all(), 'created_at'),
+    ]
+    for prefix, queryset, field in monthly:
+        rows = queryset.order_by().annotate(month=TruncMonth(field)).values('month').annotate(total=Count('pk'))
+        for row in rows:
+            counters[f"{prefix}.{timezone.localtime(row['month']):%Y-%m}"] = row['total']
+
+    StatCounter.objects.using(db).bulk_create(
+        StatCounter(key=key, value=value) for key, value in counters.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0006_user_token_version'),
+        ('bwt', '0004_alter_creditcard_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatCounter',
+            fields=[
+                ('key', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
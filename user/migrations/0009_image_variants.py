@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 06:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0008_upload_sessions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='creatorpost',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='creatorprofile',
+            name='picture_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-18 06:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0009_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='creatorpost',
+            name='bitrate',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='creatorpost',
+            name='duration',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='creatorpost',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='creatorpost',
+            name='video_metadata_source',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='creatorpost',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2 on 2026-10-18 06:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0010_video_metadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='creatorpost',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='creatorpost',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='PostComment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fan_email', models.EmailField(max_length=254)),
+                ('body', models.TextField(max_length=2000)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='user.creatorpost')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['post', '-id'], name='postcomment_post_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PostLike',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fan_email', models.EmailField(max_length=254)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='likes', to='user.creatorpost')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('post', 'fan_email'), name='unique_post_like')],
+            },
+        ),
+    ]
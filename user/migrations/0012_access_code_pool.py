@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-18 06:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0011_likes_and_comments'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccessCodePool',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('suffix', models.CharField(max_length=12, unique=True)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('claimed_at__isnull', True)), fields=['id'], name='accesscodepool_free_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,121 @@
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class RunSQLOn(migrations.RunSQL):
+    """RunSQL that only runs on databases of one ``vendor``."""
+
+    def __init__(self, vendor, *args, **kwargs):
+        self.vendor = vendor
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, args, kwargs = super().deconstruct()
+        return name, [self.vendor, *args], kwargs
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == self.vendor:
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == self.vendor:
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+# Postgres keeps <table>.search_vector current with a BEFORE INSERT/UPDATE
+# trigger and indexes it with GIN. The UPDATEs fire the triggers once for
+# existing rows.
+POSTGRES_INSTALL = [
+    """CREATE OR REPLACE FUNCTION user_creatorpost_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END $$ LANGUAGE plpgsql""",
+    """CREATE TRIGGER user_creatorpost_search_vector BEFORE INSERT OR UPDATE OF title, description
+    ON user_creatorpost FOR EACH ROW EXECUTE FUNCTION user_creatorpost_search_vector()""",
+    "UPDATE user_creatorpost SET title = title",
+    "CREATE INDEX IF NOT EXISTS user_creatorpost_search_idx ON user_creatorpost USING gin (search_vector)",
+    """CREATE OR REPLACE FUNCTION user_user_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := setweight(to_tsvector('simple', coalesce(NEW.full_name, '')), 'A') ||
+            setweight(to_tsvector('simple', translate(coalesce(NEW.email, ''), '@.', '  ')), 'B');
+        RETURN NEW;
+    END $$ LANGUAGE plpgsql""",
+    """CREATE TRIGGER user_user_search_vector BEFORE INSERT OR UPDATE OF full_name, email
+    ON user_user FOR EACH ROW EXECUTE FUNCTION user_user_search_vector()""",
+    "UPDATE user_user SET full_name = full_name",
+    "CREATE INDEX IF NOT EXISTS user_user_search_idx ON user_user USING gin (search_vector)",
+]
+
+POSTGRES_UNINSTALL = [
+    "DROP INDEX IF EXISTS user_user_search_idx",
+    "DROP TRIGGER IF EXISTS user_user_search_vector ON user_user",
+    "DROP FUNCTION IF EXISTS user_user_search_vector()",
+    "DROP INDEX IF EXISTS user_creatorpost_search_idx",
+    "DROP TRIGGER IF EXISTS user_creatorpost_search_vector ON user_creatorpost",
+    "DROP FUNCTION IF EXISTS user_creatorpost_search_vector()",
+]
+
+# SQLite mirrors the columns into external-content FTS5 tables, <table>_fts,
+# via triggers; 'rebuild' indexes the existing rows. user.search.
+# ensure_sqlite_fts() puts these back after later migrations copy the tables.
+SQLITE_INSTALL = [
+    "CREATE VIRTUAL TABLE user_creatorpost_fts USING fts5(title, description, "
+    "content='user_creatorpost', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER user_creatorpost_fts_ai AFTER INSERT ON user_creatorpost BEGIN "
+    "INSERT INTO user_creatorpost_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER user_creatorpost_fts_ad AFTER DELETE ON user_creatorpost BEGIN "
+    "INSERT INTO user_creatorpost_fts(user_creatorpost_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER user_creatorpost_fts_au AFTER UPDATE OF title, description ON user_creatorpost BEGIN "
+    "INSERT INTO user_creatorpost_fts(user_creatorpost_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO user_creatorpost_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "INSERT INTO user_creatorpost_fts(user_creatorpost_fts) VALUES ('rebuild')",
+    "CREATE VIRTUAL TABLE user_user_fts USING fts5(full_name, email, "
+    "content='user_user', content_rowid='id', tokenize='unicode61')",
+    "CREATE TRIGGER user_user_fts_ai AFTER INSERT ON user_user BEGIN "
+    "INSERT INTO user_user_fts(rowid, full_name, email) VALUES (new.id, new.full_name, new.email); END",
+    "CREATE TRIGGER user_user_fts_ad AFTER DELETE ON user_user BEGIN "
+    "INSERT INTO user_user_fts(user_user_fts, rowid, full_name, email) "
+    "VALUES ('delete', old.id, old.full_name, old.email); END",
+    "CREATE TRIGGER user_user_fts_au AFTER UPDATE OF full_name, email ON user_user BEGIN "
+    "INSERT INTO user_user_fts(user_user_fts, rowid, full_name, email) "
+    "VALUES ('delete', old.id, old.full_name, old.email); "
+    "INSERT INTO user_user_fts(rowid, full_name, email) VALUES (new.id, new.full_name, new.email); END",
+    "INSERT INTO user_user_fts(user_user_fts) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS user_user_fts_au",
+    "DROP TRIGGER IF EXISTS user_user_fts_ad",
+    "DROP TRIGGER IF EXISTS user_user_fts_ai",
+    "DROP TABLE IF EXISTS user_user_fts",
+    "DROP TRIGGER IF EXISTS user_creatorpost_fts_au",
+    "DROP TRIGGER IF EXISTS user_creatorpost_fts_ad",
+    "DROP TRIGGER IF EXISTS user_creatorpost_fts_ai",
+    "DROP TABLE IF EXISTS user_creatorpost_fts",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0012_access_code_pool'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='creatorpost',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        RunSQLOn('postgresql', POSTGRES_INSTALL, POSTGRES_UNINSTALL),
+        RunSQLOn('sqlite', SQLITE_INSTALL, SQLITE_UNINSTALL),
+    ]
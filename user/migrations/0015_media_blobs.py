@@ -0,0 +1,44 @@
+# Generated by Django 5.2 on 2026-10-18 06:58
+
+import django.utils.timezone
+import user.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0014_creatorprofile_content_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='creatorpost',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=user.storage.blob_storage, upload_to='creator_images/'),
+        ),
+        migrations.AlterField(
+            model_name='creatorpost',
+            name='video',
+            field=models.FileField(blank=True, null=True, storage=user.storage.blob_storage, upload_to='creator_videos/'),
+        ),
+        migrations.AlterField(
+            model_name='creatorprofile',
+            name='profile_picture',
+            field=models.ImageField(blank=True, null=True, storage=user.storage.blob_storage, upload_to='profile_pics/'),
+        ),
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('size', models.PositiveBigIntegerField()),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('ref_count', 0)), fields=['updated_at'], name='mediablob_unreferenced_idx')],
+            },
+        ),
+    ]
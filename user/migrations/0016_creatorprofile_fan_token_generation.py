@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 07:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0015_media_blobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='creatorprofile',
+            name='fan_token_generation',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
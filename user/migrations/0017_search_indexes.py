@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-18 08:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0016_creatorprofile_fan_token_generation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CreatorPostSearchIndex',
+            fields=[
+                ('post', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='user.creatorpost')),
+            ],
+            options={
+                'db_table': 'user_creatorpost_fts',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='UserSearchIndex',
+            fields=[
+                ('user', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'user_user_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -1,12 +1,22 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
+import math
 import uuid
 from django.utils import timezone
+from .managers import CreatorPostQuerySet
+from .storage import blob_storage
 
 
 # --- ACCESS CODE GENERATOR ---
 def generate_unique_access_code(full_name):
     base = ''.join(full_name.split()).upper()[:4]  # e.g., "JOHN"
+    from .provisioning import claim_suffixes
+    suffixes = claim_suffixes(1)                     # pre-reserved, no uniqueness check needed
+    if suffixes:
+        return f"{base}{suffixes[0]}"                # => "JOHN9ABF01C2"
+
+    # pool is empty (fresh install): fall back to guess-and-check
     while True:
         random_suffix = uuid.uuid4().hex[:4].upper()  # e.g., "9ABF"
         code = f"{base}{random_suffix}"              # => "JOHN9ABF"
@@ -17,6 +27,11 @@ def generate_unique_access_code(full_name):
 
 # --- USER MANAGER ---
 class CustomUserManager(BaseUserManager):
+    def get_queryset(self):
+        # search_vector is only read inside SQL (user.search); auth and JWT
+        # lookups shouldn't fetch it with every user
+        return super().get_queryset().defer('search_vector')
+
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError('The Email field must be set')
@@ -77,10 +92,51 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     date_joined = models.DateTimeField(default=timezone.now)
 
+    # Bumped whenever a claim baked into issued JWTs (role, is_active)
+    # changes, which invalidates every token carrying the old value.
+    token_version = models.PositiveIntegerField(default=0)
+    TOKEN_CLAIM_FIELDS = ('role', 'is_active')
+
+    # full_name/email tsvector, kept current by a Postgres trigger (see
+    # user.search); unused on SQLite, which searches an FTS5 table instead.
+    # Deferred by CustomUserManager.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember what was loaded so save() can tell what changed
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def token_claims_changed(self):
+        loaded = getattr(self, '_loaded_values', None) or {}
+        return any(
+            name in loaded and loaded[name] != getattr(self, name)
+            for name in self.TOKEN_CLAIM_FIELDS
+        )
+
     def save(self, *args, **kwargs):
         if self.access_code:
             self.access_code = self.access_code.strip()  # Clean whitespace
+        self._tokens_revoked = self.token_claims_changed()
+        update_fields = kwargs.get('update_fields')
+        existing = not self._state.adding and not kwargs.get('force_insert')
+        written = existing and (update_fields is None or self._tokens_revoked)
+        if written:
+            # computed in the UPDATE, so a stale instance can't write an older
+            # version back and un-revoke tokens
+            self.token_version = models.F('token_version') + int(self._tokens_revoked)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'token_version'}
         super().save(*args, **kwargs)
+        if written:
+            # deferred: reloaded if read again
+            del self.token_version
+        self._loaded_values = {
+            **getattr(self, '_loaded_values', {}),
+            **{name: getattr(self, name) for name in self.TOKEN_CLAIM_FIELDS},
+        }
 
     def __str__(self):
         return self.email
@@ -91,7 +147,46 @@ class CreatorProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='creator_profile')
     access_code = models.CharField(max_length=20, unique=True)
     bio = models.TextField(blank=True)
-    profile_picture = models.ImageField(upload_to="profile_pics/", null=True, blank=True)
+    profile_picture = models.ImageField(upload_to="profile_pics/", storage=blob_storage, null=True, blank=True)
+    # Resized WebP/JPEG copies of profile_picture (see user.images)
+    picture_variants = models.JSONField(default=dict, blank=True)
+    # Bumped whenever the profile or any of its posts change; drives the
+    # ETag/Last-Modified of creator content (see user.feed.touch_creator_content)
+    content_version = models.PositiveBigIntegerField(default=0, editable=False)
+    content_updated_at = models.DateTimeField(default=timezone.now, editable=False)
+    # Signed fan tokens carry this; bumping it revokes them (see user.fan_tokens)
+    fan_token_generation = models.PositiveIntegerField(default=0, editable=False)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember what was loaded so signals can tell what changed
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        existing = not self._state.adding and not kwargs.get('force_insert')
+        if existing:
+            # computed in the UPDATE, so a stale instance can't write an older
+            # stamp back or undo a fan token revocation
+            self.content_version = models.F('content_version') + 1
+            self.content_updated_at = timezone.now()
+            self.fan_token_generation = models.F('fan_token_generation')
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'content_version', 'content_updated_at'}
+        super().save(*args, **kwargs)
+        if existing:
+            # deferred: reloaded if read again
+            del self.content_version
+            del self.fan_token_generation
+        # what the row now holds, for the next save's signals
+        loaded = dict(getattr(self, '_loaded_values', {}))
+        deferred = self.get_deferred_fields()
+        if 'access_code' not in deferred:
+            loaded['access_code'] = self.access_code
+        if 'profile_picture' not in deferred:
+            loaded['profile_picture'] = self.profile_picture.name
+        self._loaded_values = loaded
 
     def __str__(self):
         return f"{self.user.full_name}'s Profile"
@@ -101,9 +196,221 @@ class CreatorPost(models.Model):
     creator = models.ForeignKey(User, on_delete=models.CASCADE, limit_choices_to={'role': 'CREATOR'})
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True)
-    video = models.FileField(upload_to='creator_videos/', blank=True, null=True)
-    image = models.ImageField(upload_to='creator_images/', blank=True, null=True)
+    video = models.FileField(upload_to='creator_videos/', storage=blob_storage, blank=True, null=True)
+    image = models.ImageField(upload_to='creator_images/', storage=blob_storage, blank=True, null=True)
+    # Resized WebP/JPEG copies of image (see user.images)
+    image_variants = models.JSONField(default=dict, blank=True)
+    # Filled in by user.video.probe_post_video after the video is saved
+    duration = models.FloatField(null=True, blank=True)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    bitrate = models.PositiveBigIntegerField(null=True, blank=True)
+    video_metadata_source = models.CharField(max_length=255, blank=True, editable=False)
+    # Denormalised from PostLike/PostComment by user.counters (write-behind)
+    likes_count = models.PositiveIntegerField(default=0, editable=False)
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # title/description tsvector, kept current by a Postgres trigger (see user.search)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = CreatorPostQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Serves CreatorPost.objects.feed_for(): filter on creator, walk in feed order
+            models.Index(fields=['creator', '-created_at', 'id'], name='creatorpost_feed_idx'),
+        ]
+
+    MEDIA_FIELDS = ('image', 'video')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember what was loaded so signals can tell what changed
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # what the row now holds, for the next save's signals
+        loaded = dict(getattr(self, '_loaded_values', {}))
+        deferred = self.get_deferred_fields()
+        for name in self.MEDIA_FIELDS:
+            if name not in deferred:
+                loaded[name] = getattr(self, name).name
+        self._loaded_values = loaded
 
     def __str__(self):
       return f"{self.title} by {self.creator.full_name}"
+
+
+# ---------------------------
+# SQLITE SEARCH INDEXES
+# ---------------------------
+class CreatorPostSearchIndex(models.Model):
+    """
+    The SQLite FTS5 table over CreatorPost (created by migration 0013),
+    mapped so user.search can join it instead of using extra().
+    """
+    post = models.OneToOneField(
+        CreatorPost, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid', related_name='search_index'
+    )
+
+    class Meta:
+        managed = False
+        db_table = 'user_creatorpost_fts'
+
+
+class UserSearchIndex(models.Model):
+    """The SQLite FTS5 table over User; see CreatorPostSearchIndex."""
+    user = models.OneToOneField(
+        User, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid', related_name='search_index'
+    )
+
+    class Meta:
+        managed = False
+        db_table = 'user_user_fts'
+
+
+class PostLike(models.Model):
+    post = models.ForeignKey(CreatorPost, on_delete=models.CASCADE, related_name='likes')
+    fan_email = models.EmailField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'fan_email'], name='unique_post_like'),
+        ]
+
+    def __str__(self):
+        return f"{self.fan_email} likes post {self.post_id}"
+
+
+class PostComment(models.Model):
+    post = models.ForeignKey(CreatorPost, on_delete=models.CASCADE, related_name='comments')
+    fan_email = models.EmailField()
+    body = models.TextField(max_length=2000)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['post', '-id'], name='postcomment_post_idx'),
+        ]
+
+    def __str__(self):
+        return f"Comment by {self.fan_email} on post {self.post_id}"
+
+
+class UploadSession(models.Model):
+    """
+    A resumable, chunked video upload (see user.uploads).
+
+    Parts are stored individually and stitched together on completion,
+    which is also when the CreatorPost is created.
+    """
+    class STATUS:
+        PENDING = 'PENDING'
+        ASSEMBLING = 'ASSEMBLING'
+        COMPLETE = 'COMPLETE'
+        FAILED = 'FAILED'
+
+        CHOICES = [
+            (PENDING, 'Pending'),
+            (ASSEMBLING, 'Assembling'),
+            (COMPLETE, 'Complete'),
+            (FAILED, 'Failed'),
+        ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    filename = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField()
+    part_size = models.PositiveIntegerField()
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+    status = models.CharField(max_length=12, choices=STATUS.CHOICES, default=STATUS.PENDING)
+    error = models.TextField(blank=True)
+    post = models.OneToOneField(CreatorPost, on_delete=models.SET_NULL, null=True, blank=True, related_name='upload_session')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @property
+    def part_count(self):
+        return max(1, math.ceil(self.total_size / self.part_size))
+
+    def expected_part_size(self, number):
+        if number < self.part_count:
+            return self.part_size
+        return self.total_size - self.part_size * (self.part_count - 1)
+
+    def __str__(self):
+        return f"{self.filename} ({self.status})"
+
+
+class UploadPart(models.Model):
+    session = models.ForeignKey(UploadSession, on_delete=models.CASCADE, related_name='parts')
+    number = models.PositiveIntegerField()
+    size = models.PositiveIntegerField()
+    sha256 = models.CharField(max_length=64)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['session', 'number'], name='uploadpart_unique_number'),
+        ]
+
+
+class AccessCodePool(models.Model):
+    """
+    Pre-generated access-code suffixes (see user.provisioning).
+
+    Suffixes are unique across the table, so ``base + suffix`` never
+    collides with another pooled code. Claimed rows are kept so a suffix is
+    never handed out twice.
+    """
+    suffix = models.CharField(max_length=12, unique=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # claims scan unclaimed rows in id order
+            models.Index(fields=['id'], condition=models.Q(claimed_at__isnull=True), name='accesscodepool_free_idx'),
+        ]
+
+    def __str__(self):
+        return self.suffix
+
+
+class MediaBlob(models.Model):
+    """
+    One file in user.storage.ContentAddressedStorage, named by its SHA-256.
+
+    ``ref_count`` is how many saved references point at it. Blobs at zero
+    are removed by ``manage.py gc_media`` once they have been unreferenced
+    for MEDIA_BLOB_GC_GRACE.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # gc_media scans unreferenced blobs by age
+            models.Index(fields=['updated_at'], condition=models.Q(ref_count=0), name='mediablob_unreferenced_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
+
+class StatCounter(models.Model):
+    """
+    One named running total for the admin dashboard (see user.stats).
+
+    Keys look like ``posts.total`` or ``credit_cards.month.2025-09``.
+    """
+    key = models.CharField(max_length=64, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.key} = {self.value}"
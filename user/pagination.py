@@ -0,0 +1,37 @@
+import base64
+
+from django.utils.dateparse import parse_datetime
+from rest_framework.pagination import CursorPagination
+
+
+# ---------------------------
+# FEED CURSORS
+# ---------------------------
+def encode_cursor(created_at, pk):
+    """Opaque cursor pointing just past post (created_at, pk) in (-created_at, id) order."""
+    raw = f"{created_at.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Inverse of ``encode_cursor``; raises ``ValueError`` on garbage."""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    created_at, pk = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+    created_at = parse_datetime(created_at)
+    if created_at is None:
+        raise ValueError("Invalid cursor timestamp")
+    return created_at, int(pk)
+
+
+# ---------------------------
+# ADMIN LISTS
+# ---------------------------
+class NewestFirstCursorPagination(CursorPagination):
+    """
+    Cursor pagination on ``-id`` using ``PAGE_SIZE`` from REST_FRAMEWORK.
+
+    Works on ``values()`` querysets as well as model instances.
+    """
+    ordering = '-id'
+    page_size_query_param = 'page_size'
+    max_page_size = 500
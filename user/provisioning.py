@@ -0,0 +1,170 @@
+import secrets
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from . import stats, tasks
+from .models import AccessCodePool, CreatorProfile, User
+
+
+REFILL_LOCK_KEY = "access_code_pool:refilling"
+
+
+# ---------------------------
+# ACCESS CODE POOL
+# ---------------------------
+def _new_suffix():
+    return secrets.token_hex(settings.ACCESS_CODE_POOL['SUFFIX_BYTES']).upper()
+
+
+def refill_pool(size=None):
+    """Top the pool up to ``size`` unclaimed suffixes; returns how many were added."""
+    size = size or settings.ACCESS_CODE_POOL['SIZE']
+    unclaimed = AccessCodePool.objects.filter(claimed_at__isnull=True)
+    before = free = unclaimed.count()
+    while free < size:
+        batch = [AccessCodePool(suffix=_new_suffix()) for _ in range(size - free)]
+        # random suffixes can repeat; ignore_conflicts drops those and we go again
+        AccessCodePool.objects.bulk_create(batch, batch_size=settings.PROVISION_BATCH_SIZE, ignore_conflicts=True)
+        free = unclaimed.count()
+    return free - before
+
+
+def _refill_in_background():
+    try:
+        refill_pool()
+    finally:
+        cache.delete(REFILL_LOCK_KEY)
+
+
+def _maybe_refill():
+    low_water = settings.ACCESS_CODE_POOL['LOW_WATER']
+    free = AccessCodePool.objects.filter(claimed_at__isnull=True).order_by('id')
+    if free[low_water:low_water + 1].exists():
+        return
+    # one refill at a time, whichever worker notices first
+    if cache.add(REFILL_LOCK_KEY, True, 300):
+        tasks.submit(_refill_in_background)
+
+
+def claim_suffixes(count):
+    """
+    Atomically take up to ``count`` unclaimed suffixes from the pool.
+
+    Rows are locked with ``FOR UPDATE SKIP LOCKED``, so concurrent signups
+    each get different rows without waiting on one another. Databases
+    without row locks (SQLite) serialise writes instead; the conditional
+    UPDATE below catches the rare overlap and we retry.
+    Returns fewer than ``count`` (possibly none) if the pool runs dry.
+    """
+    for _ in range(3):
+        with transaction.atomic():
+            rows = list(
+                AccessCodePool.objects.select_for_update(skip_locked=True)
+                .filter(claimed_at__isnull=True)
+                .order_by('id')
+                .values_list('id', 'suffix')[:count]
+            )
+            ids = [pk for pk, _ in rows]
+            claimed = AccessCodePool.objects.filter(id__in=ids, claimed_at__isnull=True).update(
+                claimed_at=timezone.now()
+            )
+            if claimed == len(rows):
+                break
+            transaction.set_rollback(True)
+    else:
+        rows = []
+
+    _maybe_refill()
+    return [suffix for _, suffix in rows]
+
+
+def access_code_for(full_name, suffix):
+    return f"{''.join(full_name.split()).upper()[:4]}{suffix}"
+
+
+# ---------------------------
+# BULK PROVISIONING
+# ---------------------------
+def provision_creators(rows, batch_size=None):
+    """
+    Create creators and their profiles in batches with ``bulk_create``.
+
+    ``rows`` is an iterable of dicts with ``email``, ``full_name`` and
+    optionally ``password`` and ``bio``. Rows without a password get an
+    unusable one (hashing thousands of passwords would dominate the run).
+    Emails that already exist, or repeat, are skipped.
+
+    bulk_create doesn't send signals, so dashboard counters are bumped
+    here directly. Returns ``(created, skipped)`` where ``created`` is a
+    list of ``{"id", "email", "access_code"}``.
+    """
+    batch_size = batch_size or settings.PROVISION_BATCH_SIZE
+    created, skipped, seen = [], [], set()
+
+    batch = []
+    for row in rows:
+        email = User.objects.normalize_email(row['email'])
+        if email in seen:
+            skipped.append(email)
+            continue
+        seen.add(email)
+        batch.append({**row, 'email': email})
+        if len(batch) == batch_size:
+            _provision_batch(batch, created, skipped)
+            batch = []
+    if batch:
+        _provision_batch(batch, created, skipped)
+    return created, skipped
+
+
+def _claim_exactly(count):
+    suffixes = claim_suffixes(count)
+    if len(suffixes) < count:
+        refill_pool(max(settings.ACCESS_CODE_POOL['SIZE'], count))
+        suffixes += claim_suffixes(count - len(suffixes))
+    return suffixes
+
+
+def _provision_batch(batch, created, skipped):
+    existing = set(User.objects.filter(email__in=[row['email'] for row in batch]).values_list('email', flat=True))
+    skipped.extend(row['email'] for row in batch if row['email'] in existing)
+    batch = [row for row in batch if row['email'] not in existing]
+    if not batch:
+        return
+
+    unusable = make_password(None)
+    now = timezone.now()
+    with transaction.atomic():
+        suffixes = _claim_exactly(len(batch))
+        users = User.objects.bulk_create([
+            User(
+                email=row['email'],
+                full_name=row['full_name'],
+                password=make_password(row['password']) if row.get('password') else unusable,
+                role=User.ROLE.CREATOR,
+                is_active=True,
+                date_joined=now,
+            )
+            for row in batch
+        ])
+        profiles = CreatorProfile.objects.bulk_create([
+            CreatorProfile(
+                user=user,
+                access_code=access_code_for(user.full_name, suffix),
+                bio=row.get('bio', ''),
+            )
+            for user, row, suffix in zip(users, batch, suffixes)
+        ])
+
+        stats.bump(stats.TOTAL_CREATORS, len(users))
+        stats.bump(stats.ACTIVE_CREATORS, len(users))
+        stats.bump(stats.monthly_key(stats.MONTHLY_CREATORS, now), len(users))
+
+    created.extend(
+        {'id': user.pk, 'email': user.email, 'access_code': profile.access_code}
+        for user, profile in zip(users, profiles)
+    )
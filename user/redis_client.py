@@ -0,0 +1,27 @@
+import threading
+
+import redis
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_redis():
+    """Process-wide client for REDIS_URL (redis-py pools connections itself)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = redis.Redis.from_url(settings.REDIS_URL)
+    return _client
+
+
+@receiver(setting_changed)
+def _reset_client(setting, **kwargs):
+    global _client
+    if setting == 'REDIS_URL':
+        _client = None
@@ -0,0 +1,67 @@
+import msgpack
+import orjson
+from rest_framework.utils import encoders
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+# DRF's encoder knows datetimes, Decimals, UUIDs, lazy strings, querysets...
+_default = encoders.JSONEncoder().default
+
+
+# ---------------------------
+# JSON
+# ---------------------------
+class FastJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` that encodes with orjson.
+
+    Datetimes and anything else orjson doesn't know go through DRF's
+    encoder, and U+2028/U+2029 are escaped the same way, so output matches
+    ``JSONRenderer`` except for floats: very large or small ones are
+    written as e.g. ``1e16``/``1e-7`` (same values, no ``+`` or leading
+    zero), and NaN/Infinity become ``null`` where the stock renderer
+    raises. Indented output (browsable API, ``; indent=``) and non-default
+    COMPACT/UNICODE settings use the stock path.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            data is None or not self.compact or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except TypeError:  # e.g. integers wider than 64 bits
+            return super().render(data, accepted_media_type, renderer_context)
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+# ---------------------------
+# MSGPACK
+# ---------------------------
+class MsgPackRenderer(BaseRenderer):
+    """Renders ``Accept: application/msgpack`` requests (same values as the JSON body)."""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_default, use_bin_type=True)
+
+
+class MsgPackParser(BaseParser):
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except ValueError as exc:  # ExtraData, FormatError, StackError all subclass it
+            raise ParseError(f'MessagePack parse error - {exc}')
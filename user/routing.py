@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .consumers import CreatorFeedConsumer
+
+
+websocket_urlpatterns = [
+    path('ws/creator/feed/', CreatorFeedConsumer.as_asgi()),
+]
@@ -0,0 +1,127 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import BooleanField, F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .models import CreatorPost, User
+
+
+MAX_TERMS = 10
+TERM_RE = re.compile(r'\w+')
+
+# Searchable tables. Postgres keeps <table>.search_vector current with a
+# BEFORE INSERT/UPDATE trigger and indexes it with GIN; SQLite mirrors the
+# columns into an external-content FTS5 table, <table>_fts, via triggers.
+# Migration 0013 creates both; keep it in step with this.
+SEARCH_TABLES = {
+    'user_creatorpost': {
+        'columns': ('title', 'description'),
+        'config': 'english',
+        'tokenize': 'porter unicode61',
+        'bm25_weights': (4.0, 1.0),
+    },
+    'user_user': {
+        'columns': ('full_name', 'email'),
+        'config': 'simple',
+        'tokenize': 'unicode61',
+        'bm25_weights': (4.0, 1.0),
+    },
+}
+
+
+# ---------------------------
+# SQLITE FTS TRIGGERS
+# ---------------------------
+def _sqlite_objects(table, spec):
+    """``{name: CREATE statement}`` for the FTS5 table and the triggers feeding it."""
+    fts = f'{table}_fts'
+    columns = ', '.join(spec['columns'])
+    new = ', '.join(f'new.{column}' for column in spec['columns'])
+    old = ', '.join(f'old.{column}' for column in spec['columns'])
+    delete = f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old});"
+    insert = f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new});"
+    return {
+        fts: f"CREATE VIRTUAL TABLE {fts} USING fts5({columns}, content='{table}', content_rowid='id', "
+             f"tokenize='{spec['tokenize']}')",
+        f'{fts}_ai': f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END",
+        f'{fts}_ad': f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN {delete} END",
+        f'{fts}_au': f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {columns} ON {table} BEGIN {delete} {insert} END",
+    }
+
+
+def ensure_sqlite_fts(connection):
+    """
+    Create any missing FTS5 table or trigger and rebuild that index.
+
+    SQLite migrations that alter a table copy it and drop the original,
+    taking its triggers along; this runs after every migrate to put them
+    back (see user.signals).
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existing = {name for (name,) in cursor.fetchall()}
+        for table, spec in SEARCH_TABLES.items():
+            if table not in existing:
+                continue
+            missing = {name: sql for name, sql in _sqlite_objects(table, spec).items() if name not in existing}
+            for sql in missing.values():
+                cursor.execute(sql)
+            if missing:
+                cursor.execute(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')")
+
+
+# ---------------------------
+# QUERIES
+# ---------------------------
+def terms(query):
+    return TERM_RE.findall((query or '').lower())[:MAX_TERMS]
+
+
+def _search(queryset, query, fallback_fields):
+    """``queryset`` narrowed to rows matching every term (as a prefix), best match first, with ``rank``."""
+    words = terms(query)
+    if not words:
+        return queryset.none()
+    table = queryset.model._meta.db_table
+    spec = SEARCH_TABLES[table]
+    vendor = connections[queryset.db].vendor
+
+    if vendor == 'postgresql':
+        tsquery = SearchQuery(' & '.join(f'{word}:*' for word in words), config=spec['config'], search_type='raw')
+        return (
+            queryset.filter(search_vector=tsquery)
+            .annotate(rank=SearchRank(F('search_vector'), tsquery))
+            .order_by('-rank', '-pk')
+        )
+
+    if vendor == 'sqlite':
+        fts = f'{table}_fts'
+        weights = ', '.join(str(weight) for weight in spec['bm25_weights'])
+        match = ' '.join(f'"{word}"*' for word in words)
+        # join the FTS5 table (see CreatorPostSearchIndex), so it produces the matches and scores each once
+        return (
+            queryset.filter(search_index__isnull=False)
+            .filter(RawSQL(f'{fts} MATCH %s', (match,), output_field=BooleanField()))
+            .annotate(rank=RawSQL(f'-bm25({fts}, {weights})', (), output_field=FloatField()))  # lower-is-better
+            .order_by('-rank', '-pk')
+        )
+
+    # no full-text support: unranked substring match
+    condition = Q()
+    for word in words:
+        condition &= Q(*(Q(**{f'{field}__icontains': word}) for field in fallback_fields), _connector=Q.OR)
+    return queryset.filter(condition).annotate(rank=Value(0.0)).order_by('-pk')
+
+
+def search_posts(query, queryset=None):
+    if queryset is None:
+        queryset = CreatorPost.objects.all()
+    return _search(queryset, query, SEARCH_TABLES['user_creatorpost']['columns'])
+
+
+def search_creators(query, queryset=None):
+    if queryset is None:
+        queryset = User.objects.filter(role=User.ROLE.CREATOR, creator_profile__isnull=False)
+    return _search(queryset, query, SEARCH_TABLES['user_user']['columns'])
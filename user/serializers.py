@@ -1,9 +1,13 @@
-from rest_framework import serializers
+from rest_framework import exceptions, serializers
 from django.contrib.auth import authenticate
 from .models import User, CreatorProfile
 import uuid
 from rest_framework import serializers
+from django.conf import settings
 from .models import User, CreatorProfile, generate_unique_access_code
+from .pagination import decode_cursor
+from . import fan_tokens
+from .access_codes import resolve_access_code, resolve_profile_id
 
 class CreatorSignupSerializer(serializers.ModelSerializer):
     profile_picture = serializers.ImageField(write_only=True, required=False)  # ← NEW
@@ -36,6 +40,20 @@ class CreatorSignupSerializer(serializers.ModelSerializer):
 
 
 
+# ----------------------
+# BULK CREATOR PROVISIONING (Admin)
+# ----------------------
+class ProvisionCreatorSerializer(serializers.Serializer):
+    email = serializers.EmailField()
+    full_name = serializers.CharField(max_length=255)
+    password = serializers.CharField(required=False, write_only=True)
+    bio = serializers.CharField(required=False, allow_blank=True)
+
+
+class BulkProvisionSerializer(serializers.Serializer):
+    creators = ProvisionCreatorSerializer(many=True, allow_empty=False, max_length=settings.PROVISION_MAX_PER_REQUEST)
+
+
 # ----------------------
 # ADMIN SIGNUP SERIALIZER
 # ----------------------
@@ -57,20 +75,51 @@ class AdminSignupSerializer(serializers.ModelSerializer):
 # ----------------------
 # FAN ACCESS SERIALIZER
 # ----------------------
-class FanAccessSerializer(serializers.Serializer):
+class FanIdentitySerializer(serializers.Serializer):
+    """
+    The fan's email and the creator's access code, or instead a signed fan
+    token (user.fan_tokens) passed in as ``context['fan_token']``.
+    """
     email = serializers.EmailField()
     access_code = serializers.CharField()
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.context.get('fan_token'):
+            self.fields['email'].required = False
+            self.fields['access_code'].required = False
+
     def validate(self, data):
-        access_code = data.get("access_code")
-        try:
-            profile = CreatorProfile.objects.select_related('user').get(access_code=access_code)
-        except CreatorProfile.DoesNotExist:
+        token = self.context.get('fan_token')
+        if token:
+            try:
+                claims = fan_tokens.read(token)
+            except fan_tokens.InvalidFanToken as exc:
+                raise exceptions.AuthenticationFailed(str(exc), code='invalid_fan_token')
+            profile = resolve_profile_id(claims['profile_id'])
+            if profile is None:
+                raise exceptions.AuthenticationFailed("Invalid fan token.", code='invalid_fan_token')
+            data.update(email=claims['email'], fan_token=token, creator_profile=profile)
+            return data
+
+        profile = resolve_access_code(data.get("access_code"))
+        if profile is None:
             raise serializers.ValidationError("Invalid access code.")
         data['creator_profile'] = profile
         return data
 
 
+class FanAccessSerializer(FanIdentitySerializer):
+    cursor = serializers.CharField(required=False)
+    page_size = serializers.IntegerField(required=False, min_value=1, max_value=settings.FEED_MAX_PAGE_SIZE)
+
+    def validate_cursor(self, value):
+        try:
+            return decode_cursor(value)
+        except ValueError:
+            raise serializers.ValidationError("Invalid cursor.")
+
+
 # ----------------------
 # CREATOR PROFILE SERIALIZER (OPTIONAL)
 # ----------------------
@@ -111,15 +160,86 @@ class GoogleAuthSerializer(serializers.Serializer):
 
 
 from rest_framework import serializers
-from .models import CreatorPost
+from .models import CreatorPost, PostComment, UploadSession
+from .uploads import clean_filename
+from . import images
+from .managers import CreatorPostQuerySet
+from .media import MediaURLBuilder
+from django.db import models
 from rest_framework.exceptions import PermissionDenied
+from django.urls import reverse
+from .middleware import span
+
+
+class TimedListSerializer(serializers.ListSerializer):
+    """Counts ``many=True`` serialization as the request's ``serialize`` span."""
+
+    @property
+    def data(self):
+        with span('serialize'):
+            return super().data
+
+
+class CreatorPostListSerializer(TimedListSerializer):
+    """
+    ``many=True`` read path for feeds.
+
+    Builds each post dict directly from ``values()`` rows (model instances
+    work too) instead of running every field's get_attribute /
+    to_representation per post, and resolves URL prefixes once per list
+    via MediaURLBuilder. The output is identical to CreatorPostSerializer's
+    per-item representation; tests compare the two.
+    """
+
+    def to_representation(self, data):
+        request = self.context.get('request')
+        if request is None:
+            return super().to_representation(data)
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+
+        image_urls = MediaURLBuilder(request, CreatorPost._meta.get_field('image').storage)
+        video_urls = MediaURLBuilder(request, CreatorPost._meta.get_field('video').storage)
+        created_at = self.child.fields['created_at'].to_representation
+        return [
+            self._post(item if isinstance(item, dict) else _post_row(item), image_urls, video_urls, created_at)
+            for item in iterable
+        ]
+
+    @staticmethod
+    def _post(row, image_urls, video_urls, created_at):
+        video, image = row['video'], row['image']
+        image_url = image_urls.file_url(image) if image else None
+        return {
+            'id': row['id'],
+            'title': row['title'],
+            'description': row['description'],
+            'video': video_urls.file_url(video) if video else None,
+            'image': image_url,
+            'created_at': created_at(row['created_at']) if row['created_at'] else None,
+            'image_url': image_url,
+            'video_url': video_urls.served_url(video) if video else None,
+            'likes_count': row['likes_count'],
+            'comments_count': row['comments_count'],
+            'duration': None if row['duration'] is None else float(row['duration']),
+            'width': row['width'],
+            'height': row['height'],
+            'bitrate': row['bitrate'],
+            'image_srcset': images.srcset_for_name(image, row['image_variants'], image_urls.file_url),
+        }
+
+
+def _post_row(post):
+    return {
+        **{name: getattr(post, name) for name in CreatorPostQuerySet.FEED_VALUES},
+        'video': post.video.name,
+        'image': post.image.name,
+    }
+
 
 class CreatorPostSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
     video_url = serializers.SerializerMethodField()
-    likes_count = serializers.SerializerMethodField()
-    comments_count = serializers.SerializerMethodField()
-    duration = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = CreatorPost
@@ -127,9 +247,14 @@ class CreatorPostSerializer(serializers.ModelSerializer):
             'id', 'title', 'description',
             'video', 'image', 'created_at',
             'image_url', 'video_url', 'likes_count', 
-            'comments_count', 'duration'
+            'comments_count', 'duration', 'width', 'height',
+            'bitrate', 'image_srcset'
+        ]
+        list_serializer_class = CreatorPostListSerializer
+        read_only_fields = [
+            'id', 'created_at', 'creator', 'likes_count', 'comments_count',
+            'duration', 'width', 'height', 'bitrate'
         ]
-        read_only_fields = ['id', 'created_at', 'creator']
 
     def validate(self, data):
         request = self.context.get('request')
@@ -148,19 +273,64 @@ class CreatorPostSerializer(serializers.ModelSerializer):
         return None
 
     def get_video_url(self, obj):
+        # served by user.media.serve_media, which supports Range for seeking
         request = self.context.get('request')
-        if obj.video and hasattr(obj.video, 'url'):
-            return request.build_absolute_uri(obj.video.url)
+        if obj.video:
+            return request.build_absolute_uri(reverse('media', kwargs={'path': obj.video.name}))
         return None
     
-    def get_likes_count(self, obj):
-        # Add your logic here or return 0 for now
-        return getattr(obj, 'likes_count', 0)
-    
-    def get_comments_count(self, obj):
-        # Add your logic here or return 0 for now  
-        return getattr(obj, 'comments_count', 0)
-    
-    def get_duration(self, obj):
-        # Add your logic for video duration or return None
-        return getattr(obj, 'duration', None)
\ No newline at end of file
+    def get_image_srcset(self, obj):
+        request = self.context.get('request')
+        return images.srcset(obj.image, obj.image_variants, request.build_absolute_uri)
+
+
+
+# ----------------------
+# CHUNKED UPLOAD SERIALIZER
+# ----------------------
+class UploadSessionSerializer(serializers.ModelSerializer):
+    part_count = serializers.IntegerField(read_only=True)
+    received_parts = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = [
+            'id', 'filename', 'total_size', 'title', 'description',
+            'status', 'part_size', 'part_count', 'received_parts',
+            'post', 'error', 'created_at'
+        ]
+        read_only_fields = ['id', 'status', 'part_size', 'post', 'error', 'created_at']
+
+    def validate_filename(self, value):
+        return clean_filename(value)
+
+    def validate_total_size(self, value):
+        if not 1 <= value <= settings.UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f"Uploads must be between 1 and {settings.UPLOAD_MAX_SIZE} bytes.")
+        return value
+
+    def get_received_parts(self, obj):
+        return list(obj.parts.order_by('number').values_list('number', flat=True))
+
+
+# ----------------------
+# COMMENT SERIALIZER
+# ----------------------
+class PostCommentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PostComment
+        fields = ['id', 'fan_email', 'body', 'created_at']
+        read_only_fields = ['id', 'fan_email', 'created_at']
+        list_serializer_class = TimedListSerializer
+
+
+# ----------------------
+# SEARCH RESULTS
+# ----------------------
+class CreatorSearchSerializer(serializers.ModelSerializer):
+    access_code = serializers.CharField(source='creator_profile.access_code', read_only=True)
+
+    class Meta:
+        model = User
+        fields = ['id', 'email', 'full_name', 'is_active', 'access_code']
+        list_serializer_class = TimedListSerializer
@@ -0,0 +1,250 @@
+from functools import partial
+
+from django.db import connections, transaction
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
+from django.dispatch import receiver
+
+from bwt.models import CreditCard
+from . import counters, fan_tokens, images, search, stats, storage, tasks, video
+from .access_codes import invalidate_access_code
+from .consumers import broadcast_new_post, post_payload
+from .feed import touch_creator_content
+from .models import CreatorPost, CreatorProfile, PostComment, PostLike, User
+from .tokens import forget_token_version
+
+
+# User fields that are copied into cached access-code lookups
+ACCESS_CODE_USER_FIELDS = {'is_active', 'full_name', 'email', 'role'}
+# User fields shown alongside a creator's posts (see touch_creator_content)
+CONTENT_USER_FIELDS = ('full_name', 'email')
+
+
+@receiver([post_save, post_delete], sender=CreatorPost)
+def creator_post_changed(sender, instance, **kwargs):
+    touch_creator_content(instance.creator_id)
+
+
+@receiver(post_save, sender=CreatorPost)
+def push_new_post(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(partial(broadcast_new_post, instance.creator_id, post_payload(instance)))
+
+
+@receiver(pre_save, sender=CreatorProfile)
+def remember_previous_profile(sender, instance, **kwargs):
+    if not instance.pk:
+        return
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    if 'access_code' in loaded and 'profile_picture' in loaded:
+        previous = loaded['access_code'], loaded['profile_picture']
+    else:
+        # built by hand or loaded without these fields: ask the database
+        previous = CreatorProfile.objects.filter(pk=instance.pk).values_list('access_code', 'profile_picture').first()
+    instance._previous_access_code, instance._previous_picture = previous or (None, None)
+
+
+@receiver(pre_save, sender=CreatorPost)
+def remember_previous_post_media(sender, instance, **kwargs):
+    if not instance.pk:
+        return
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    if all(name in loaded for name in CreatorPost.MEDIA_FIELDS):
+        previous = tuple(loaded[name] for name in CreatorPost.MEDIA_FIELDS)
+    else:
+        previous = CreatorPost.objects.filter(pk=instance.pk).values_list(*CreatorPost.MEDIA_FIELDS).first()
+    instance._previous_media = dict(zip(CreatorPost.MEDIA_FIELDS, previous or ()))
+
+
+@receiver([post_save, post_delete], sender=CreatorProfile)
+def creator_profile_changed(sender, instance, **kwargs):
+    previous_code = getattr(instance, '_previous_access_code', None)
+    transaction.on_commit(
+        partial(invalidate_access_code, instance.access_code, previous_code, profile_ids=[instance.pk])
+    )
+
+
+@receiver(post_save, sender=CreatorProfile)
+def revoke_fan_tokens_on_new_access_code(sender, instance, created, **kwargs):
+    # tokens were handed out against the old code
+    previous_code = getattr(instance, '_previous_access_code', None)
+    if not created and previous_code and previous_code != instance.access_code:
+        fan_tokens.revoke(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def creator_user_content_changed(sender, instance, created, update_fields=None, **kwargs):
+    if created or instance.role != User.ROLE.CREATOR:
+        return
+    fields = CONTENT_USER_FIELDS if update_fields is None else set(CONTENT_USER_FIELDS) & set(update_fields)
+    # unless the instance was loaded with the field, assume it changed
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    if any(name not in loaded or loaded[name] != getattr(instance, name) for name in fields):
+        touch_creator_content(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def creator_user_changed(sender, instance, created, update_fields=None, **kwargs):
+    if created or instance.role != User.ROLE.CREATOR:
+        return
+    if update_fields is not None and not ACCESS_CODE_USER_FIELDS & set(update_fields):
+        return
+    profiles = dict(CreatorProfile.objects.filter(user_id=instance.pk).values_list('pk', 'access_code'))
+    transaction.on_commit(partial(invalidate_access_code, *profiles.values(), profile_ids=list(profiles)))
+
+
+@receiver(post_save, sender=User)
+def user_tokens_revoked(sender, instance, **kwargs):
+    if getattr(instance, '_tokens_revoked', False):
+        transaction.on_commit(partial(forget_token_version, instance.pk))
+
+
+# ---------------------------
+# MEDIA POST-PROCESSING (user.images, user.video)
+# ---------------------------
+@receiver(post_save, sender=CreatorPost)
+def queue_post_image_variants(sender, instance, **kwargs):
+    if instance.image and not images.variants_are_current(instance.image, instance.image_variants):
+        tasks.submit(images.generate_post_variants, instance.pk)
+
+
+@receiver(post_save, sender=CreatorPost)
+def queue_post_video_probe(sender, instance, **kwargs):
+    if instance.video and not video.metadata_is_current(instance):
+        tasks.submit(video.probe_post_video, instance.pk)
+
+
+@receiver(post_save, sender=CreatorProfile)
+def queue_profile_picture_variants(sender, instance, **kwargs):
+    if instance.profile_picture and not images.variants_are_current(instance.profile_picture, instance.picture_variants):
+        tasks.submit(images.generate_profile_variants, instance.pk)
+
+
+# ---------------------------
+# MEDIA BLOB REFERENCES (user.storage)
+# ---------------------------
+@receiver(post_save, sender=CreatorProfile)
+def release_replaced_profile_picture(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_picture', None)
+    if previous and previous != instance.profile_picture.name:
+        transaction.on_commit(partial(storage.release, previous))
+
+
+@receiver(post_save, sender=CreatorPost)
+def release_replaced_post_media(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_media', None) or {}
+    replaced = [name for field, name in previous.items() if name and name != getattr(instance, field).name]
+    if replaced:
+        transaction.on_commit(partial(storage.release, *replaced))
+
+
+@receiver(post_delete, sender=CreatorProfile)
+def release_profile_media(sender, instance, **kwargs):
+    names = [instance.profile_picture.name, *images.variant_names(instance.picture_variants)]
+    transaction.on_commit(partial(storage.release, *names))
+
+
+@receiver(post_delete, sender=CreatorPost)
+def release_post_media(sender, instance, **kwargs):
+    names = [instance.image.name, instance.video.name, *images.variant_names(instance.image_variants)]
+    transaction.on_commit(partial(storage.release, *names))
+
+
+# ---------------------------
+# DASHBOARD COUNTERS (user.stats)
+# ---------------------------
+@receiver(post_save, sender=CreatorPost)
+def count_post_created(sender, instance, created, **kwargs):
+    if created:
+        stats.bump(stats.TOTAL_POSTS)
+
+
+@receiver(post_delete, sender=CreatorPost)
+def count_post_deleted(sender, instance, **kwargs):
+    stats.bump(stats.TOTAL_POSTS, -1)
+
+
+@receiver(post_save, sender=CreditCard)
+def count_credit_card_created(sender, instance, created, **kwargs):
+    if created:
+        stats.bump(stats.TOTAL_CREDIT_CARDS)
+        stats.bump(stats.monthly_key(stats.MONTHLY_CREDIT_CARDS, instance.created_at))
+
+
+@receiver(post_delete, sender=CreditCard)
+def count_credit_card_deleted(sender, instance, **kwargs):
+    stats.bump(stats.TOTAL_CREDIT_CARDS, -1)
+    stats.bump(stats.monthly_key(stats.MONTHLY_CREDIT_CARDS, instance.created_at), -1)
+
+
+@receiver(post_save, sender=CreatorProfile)
+def count_creator_profile_created(sender, instance, created, **kwargs):
+    if created and instance.user.role == User.ROLE.CREATOR:
+        stats.bump(stats.TOTAL_CREATORS)
+        stats.bump(stats.ACTIVE_CREATORS, int(bool(instance.user.is_active)))
+
+
+@receiver(post_delete, sender=CreatorProfile)
+def count_creator_profile_deleted(sender, instance, **kwargs):
+    # may be a cascade from deleting the user, so don't rely on instance.user
+    user = User.objects.filter(pk=instance.user_id).values('role', 'is_active').first()
+    if user and user['role'] == User.ROLE.CREATOR:
+        stats.bump(stats.TOTAL_CREATORS, -1)
+        stats.bump(stats.ACTIVE_CREATORS, -int(user['is_active']))
+
+
+@receiver(post_save, sender=User)
+def count_creator_user_saved(sender, instance, created, **kwargs):
+    is_creator = instance.role == User.ROLE.CREATOR
+    if created:
+        if is_creator:
+            stats.bump(stats.monthly_key(stats.MONTHLY_CREATORS, instance.date_joined))
+        return
+
+    # views assign raw request data, so normalise before comparing
+    as_bool = User._meta.get_field('is_active').to_python
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    was_creator = loaded.get('role', instance.role) == User.ROLE.CREATOR
+    was_active = as_bool(loaded.get('is_active', instance.is_active))
+    is_active = as_bool(instance.is_active)
+    if was_creator == is_creator and was_active == is_active:
+        return
+
+    if was_creator != is_creator:
+        stats.bump(stats.monthly_key(stats.MONTHLY_CREATORS, instance.date_joined), is_creator - was_creator)
+    if CreatorProfile.objects.filter(user_id=instance.pk).exists():
+        stats.bump(stats.TOTAL_CREATORS, is_creator - was_creator)
+        stats.bump(stats.ACTIVE_CREATORS, (is_creator and is_active) - (was_creator and was_active))
+
+
+@receiver(post_delete, sender=User)
+def count_creator_user_deleted(sender, instance, **kwargs):
+    if instance.role == User.ROLE.CREATOR:
+        stats.bump(stats.monthly_key(stats.MONTHLY_CREATORS, instance.date_joined), -1)
+
+
+# ---------------------------
+# LIKE / COMMENT COUNTERS (user.counters)
+# ---------------------------
+@receiver(post_save, sender=PostLike)
+@receiver(post_save, sender=PostComment)
+def count_reaction_created(sender, instance, created, **kwargs):
+    if created:
+        field = counters.LIKES if sender is PostLike else counters.COMMENTS
+        transaction.on_commit(partial(counters.record, instance.post_id, field, 1))
+
+
+# Unlikes are counted by PostLikeView from the DELETE's row count; a
+# post_delete receiver would fire even when a racing request removed the row.
+@receiver(post_delete, sender=PostComment)
+def count_comment_deleted(sender, instance, **kwargs):
+    transaction.on_commit(partial(counters.record, instance.post_id, counters.COMMENTS, -1))
+
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using, **kwargs):
+    connection = connections[using]
+    if sender.name != 'user' or connection.vendor != 'sqlite':
+        return
+    if ('user', '0013_search') in MigrationRecorder(connection).applied_migrations():
+        search.ensure_sqlite_fts(connection)
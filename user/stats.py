@@ -0,0 +1,96 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from bwt.models import CreditCard
+from .models import CreatorPost, StatCounter, User
+
+
+TOTAL_CREATORS = 'creators.total'
+ACTIVE_CREATORS = 'creators.active'
+TOTAL_POSTS = 'posts.total'
+TOTAL_CREDIT_CARDS = 'credit_cards.total'
+MONTHLY_CREATORS = 'creators.month'
+MONTHLY_CREDIT_CARDS = 'credit_cards.month'
+
+
+def monthly_key(prefix, when):
+    return f"{prefix}.{timezone.localtime(when):%Y-%m}"
+
+
+def bump(key, delta=1):
+    """Atomically add ``delta`` to counter ``key``, creating it on first use."""
+    if not delta:
+        return
+    if StatCounter.objects.filter(key=key).update(value=F('value') + delta):
+        return
+    try:
+        with transaction.atomic():
+            StatCounter.objects.create(key=key, value=delta)
+    except IntegrityError:
+        # someone else created it between our update and insert
+        StatCounter.objects.filter(key=key).update(value=F('value') + delta)
+
+
+def _snapshot_keys(now):
+    return {
+        'totalCreators': TOTAL_CREATORS,
+        'activeCreators': ACTIVE_CREATORS,
+        'totalCreditCards': TOTAL_CREDIT_CARDS,
+        'totalPosts': TOTAL_POSTS,
+        'monthlyCards': monthly_key(MONTHLY_CREDIT_CARDS, now),
+        'monthlyCreators': monthly_key(MONTHLY_CREATORS, now),
+    }
+
+
+def snapshot(now=None):
+    """Dashboard numbers for AdminStatsView, read with a single PK lookup."""
+    keys = _snapshot_keys(now or timezone.now())
+    values = dict(StatCounter.objects.filter(key__in=keys.values()).values_list('key', 'value'))
+    return {name: values.get(key, 0) for name, key in keys.items()}
+
+
+async def asnapshot(now=None):
+    keys = _snapshot_keys(now or timezone.now())
+    rows = StatCounter.objects.filter(key__in=keys.values()).values_list('key', 'value')
+    values = {key: value async for key, value in rows}
+    return {name: values.get(key, 0) for name, key in keys.items()}
+
+
+def recompute():
+    """
+    Rebuild every counter from the source tables.
+
+    Used by ``manage.py recompute_stats`` to seed counters on an existing
+    database or repair drift (e.g. after bulk_create, which skips signals).
+    Writes that land while it runs can be lost, so run it when quiet.
+    """
+    creators = User.objects.filter(role=User.ROLE.CREATOR, creator_profile__isnull=False)
+    counters = {
+        TOTAL_CREATORS: creators.count(),
+        ACTIVE_CREATORS: creators.filter(is_active=True).count(),
+        TOTAL_POSTS: CreatorPost.objects.count(),
+        TOTAL_CREDIT_CARDS: CreditCard.objects.count(),
+    }
+
+    monthly = [
+        (MONTHLY_CREATORS, User.objects.filter(role=User.ROLE.CREATOR), 'date_joined'),
+        (MONTHLY_CREDIT_CARDS, CreditCard.objects.all(), 'created_at'),
+    ]
+    for prefix, queryset, field in monthly:
+        rows = (
+            queryset.order_by()
+            .annotate(month=TruncMonth(field))
+            .values('month')
+            .annotate(total=Count('pk'))
+        )
+        for row in rows:
+            counters[monthly_key(prefix, row['month'])] = row['total']
+
+    with transaction.atomic():
+        StatCounter.objects.all().delete()
+        StatCounter.objects.bulk_create(
+            StatCounter(key=key, value=value) for key, value in counters.items()
+        )
+    return counters
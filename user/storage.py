@@ -0,0 +1,233 @@
+import hashlib
+import os
+import re
+import tempfile
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, storages
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+
+BLOB_DIR = 'blobs'
+EXTENSION_RE = re.compile(r'^\.[a-z0-9]{1,10}$')
+
+
+def blob_storage():
+    """Storage for CreatorProfile.profile_picture and CreatorPost.image/video (STORAGES['blobs'])."""
+    return storages['blobs']
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(BLOB_DIR + '/')
+
+
+def blob_name(digest, original_name):
+    """``blobs/<first two hex digits>/<sha256><ext>``; the extension keeps content types guessable."""
+    extension = os.path.splitext(original_name or '')[1].lower()
+    if not EXTENSION_RE.match(extension):
+        extension = ''
+    return f"{BLOB_DIR}/{digest[:2]}/{digest}{extension}"
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores each distinct file once, named by the SHA-256 of its bytes.
+
+    Only the extension of the name passed to ``save()`` is kept. The upload
+    is hashed while it streams to a temporary file next to the blobs, then
+    renamed into place, or dropped if that content is already stored. A
+    blob never changes once written, so its URL can be cached forever.
+
+    Every ``save()`` adds a reference to the blob's MediaBlob row and every
+    ``delete()`` removes one; files are only unlinked by ``gc_media``.
+    Names from before this storage (no ``blobs/`` prefix) are still
+    served, and deleting one removes the file as before.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # the real name depends on the content; _save works it out
+        return name
+
+    def _save(self, name, content):
+        temp_dir = self.path(f"{BLOB_DIR}/tmp")
+        os.makedirs(temp_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=temp_dir)
+        try:
+            digest = hashlib.sha256()
+            size = 0
+            with os.fdopen(fd, 'wb') as temp:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp.write(chunk)
+                    size += len(chunk)
+
+            name = blob_name(digest.hexdigest(), name)
+            full_path = self.path(name)
+            if _retain(name, size) or not os.path.exists(full_path):
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                os.chmod(temp_path, self.file_permissions_mode or 0o644)
+                os.replace(temp_path, full_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return name
+
+    def delete(self, name):
+        if is_blob(name):
+            _release(name)
+        else:
+            super().delete(name)
+
+    def purge(self, name):
+        """Unlink ``name`` whatever references it has (for gc_media)."""
+        super().delete(name)
+
+
+class UploadPartStorage(FileSystemStorage):
+    """
+    ``FileSystemStorage`` rooted at UPLOAD_PARTS_ROOT instead of MEDIA_ROOT,
+    so chunked-upload parts (see user.uploads) are never served.
+    """
+
+    @cached_property
+    def base_location(self):
+        return self._value_or_setting(self._location, settings.UPLOAD_PARTS_ROOT)
+
+    def _clear_cached_properties(self, setting, **kwargs):
+        super()._clear_cached_properties(setting, **kwargs)
+        if setting == 'UPLOAD_PARTS_ROOT':
+            self.__dict__.pop('base_location', None)
+            self.__dict__.pop('location', None)
+
+
+# ---------------------------
+# REFERENCE COUNTS
+# ---------------------------
+def _retain(name, size):
+    """Add a reference to blob ``name``; True if that created its row."""
+    from .models import MediaBlob
+
+    now = timezone.now()
+    if MediaBlob.objects.filter(name=name).update(ref_count=F('ref_count') + 1, updated_at=now):
+        return False
+    try:
+        with transaction.atomic():
+            MediaBlob.objects.create(name=name, size=size, ref_count=1, updated_at=now)
+        return True
+    except IntegrityError:
+        # a concurrent save stored the same content first
+        MediaBlob.objects.filter(name=name).update(ref_count=F('ref_count') + 1, updated_at=now)
+        return False
+
+
+def _release(name):
+    from .models import MediaBlob
+
+    MediaBlob.objects.filter(name=name, ref_count__gt=0).update(
+        ref_count=F('ref_count') - 1, updated_at=timezone.now()
+    )
+
+
+def release(*names):
+    """Drop one reference to each blob in ``names``; other names are left alone."""
+    storage = blob_storage()
+    for name in names:
+        if is_blob(name):
+            storage.delete(name)
+
+
+def referenced_names():
+    """Counter of blob names stored in model file fields and variant records."""
+    from .images import variant_names
+    from .models import CreatorPost, CreatorProfile
+
+    counts = Counter()
+    for image, video, variants in CreatorPost.objects.values_list('image', 'video', 'image_variants').iterator():
+        counts.update([image, video, *variant_names(variants)])
+    for picture, variants in CreatorProfile.objects.values_list('profile_picture', 'picture_variants').iterator():
+        counts.update([picture, *variant_names(variants)])
+    return Counter({name: count for name, count in counts.items() if is_blob(name)})
+
+
+def recount():
+    """
+    Rebuild every MediaBlob.ref_count from ``referenced_names()``; returns
+    the rows changed. Picks up references dropped without a delete (a
+    replaced post image, rows removed with a queryset delete).
+    """
+    from .models import MediaBlob
+
+    counts = referenced_names()
+    storage = blob_storage()
+    now = timezone.now()
+    changed = 0
+    for blob in MediaBlob.objects.only('pk', 'name', 'ref_count').iterator():
+        count = counts.pop(blob.name, 0)
+        if blob.ref_count != count:
+            MediaBlob.objects.filter(pk=blob.pk).update(ref_count=count, updated_at=now)
+            changed += 1
+    # referenced files without a row, e.g. saved in a transaction that rolled back
+    for name, count in counts.items():
+        if storage.exists(name):
+            _, created = MediaBlob.objects.get_or_create(
+                name=name, defaults={'size': storage.size(name), 'ref_count': count, 'updated_at': now}
+            )
+            changed += created
+    return changed
+
+
+def collect_garbage(grace=None, dry_run=False):
+    """
+    Remove blobs nothing has referenced for ``grace`` seconds (default
+    MEDIA_BLOB_GC_GRACE), plus stray files with no MediaBlob row that are
+    at least that old. Returns ``(files, bytes)`` removed.
+
+    The grace period keeps a just-released blob around for pages and
+    caches that still link to it, and covers saves still in flight.
+    """
+    from .models import MediaBlob
+
+    grace = settings.MEDIA_BLOB_GC_GRACE if grace is None else grace
+    cutoff = timezone.now() - timedelta(seconds=grace)
+    storage = blob_storage()
+    # counts can lag behind the data; never remove something still in use
+    in_use = referenced_names()
+    removed = freed = 0
+
+    for blob in MediaBlob.objects.filter(ref_count=0, updated_at__lt=cutoff).iterator():
+        if blob.name in in_use:
+            continue
+        if not dry_run:
+            with transaction.atomic():
+                # re-checked under the delete, in case a save just reused it
+                deleted, _ = MediaBlob.objects.filter(pk=blob.pk, ref_count=0, updated_at__lt=cutoff).delete()
+                if not deleted:
+                    continue
+                storage.purge(blob.name)
+        removed += 1
+        freed += blob.size
+
+    known = set(MediaBlob.objects.values_list('name', flat=True).iterator())
+    root = storage.path(BLOB_DIR)
+    for directory, _, files in os.walk(root):
+        for filename in files:
+            path = os.path.join(directory, filename)
+            name = f"{BLOB_DIR}/{os.path.relpath(path, root).replace(os.sep, '/')}"
+            if name in known or name in in_use:
+                continue
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if stat.st_mtime >= cutoff.timestamp():
+                continue
+            if not dry_run:
+                storage.purge(name)
+            removed += 1
+            freed += stat.st_size
+    return removed, freed
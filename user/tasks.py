@@ -0,0 +1,61 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.TASK_WORKERS, thread_name_prefix='user-tasks'
+                )
+    return _executor
+
+
+def _run(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception("Background task %s failed", getattr(func, '__name__', func))
+    finally:
+        # worker threads hold their own connections; don't leak them
+        connections.close_all()
+
+
+def submit(func, *args, **kwargs):
+    """
+    Run ``func(*args, **kwargs)`` off the request thread once the current
+    transaction commits, so the task always sees the rows that queued it.
+
+    With TASKS_EAGER (tests, one-off scripts) it runs inline instead.
+    """
+    if settings.TASKS_EAGER:
+        transaction.on_commit(partial(func, *args, **kwargs))
+    else:
+        transaction.on_commit(partial(get_executor().submit, _run, func, args, kwargs))
+
+
+def run_later(delay, func, *args, **kwargs):
+    """
+    Run ``func`` on the worker pool after ``delay`` seconds.
+
+    Unlike ``submit`` this isn't tied to a transaction; with TASKS_EAGER
+    it runs inline straight away.
+    """
+    if settings.TASKS_EAGER:
+        func(*args, **kwargs)
+        return
+    timer = threading.Timer(delay, get_executor().submit, args=(_run, func, args, kwargs))
+    timer.daemon = True
+    timer.start()
@@ -1,3 +1,1520 @@
-from django.test import TestCase
+import base64
+import contextlib
+import copy
+import datetime
+import importlib
+import io
+import json
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+import unittest
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
 
-# Create your tests here.
+import msgpack
+from asgiref.sync import iscoroutinefunction
+from asgiref.testing import ApplicationCommunicator
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from google.auth import crypt
+from google.auth import jwt as google_jwt
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from bwt.models import CreditCard
+from server.asgi import application
+from . import fan_tokens, images, search, stats
+from .access_codes import AccessCodeResolver, resolve_access_code
+from .benchmarks.endpoints import CARD, endpoint_cases, measure, routes
+from .benchmarks.seed import seed
+from .consumers import feed_group, post_payload
+from .db_router import replica_reads
+from .models import (
+    AccessCodePool, User, CreatorProfile, CreatorPost, MediaBlob, PostLike, StatCounter, UploadSession,
+    generate_unique_access_code,
+)
+from .google_verifier import GoogleTokenError, GoogleTokenVerifier
+from .management.commands.benchmark import compare
+from .management.commands.seed_benchmark_data import Command as SeedCommand
+from .media import RangeNotSatisfiable, parse_range
+from .middleware import ReplicaRoutingMiddleware, RequestTimingMiddleware, RequestTimings, _current
+from .pagination import decode_cursor
+from .provisioning import claim_suffixes, refill_pool
+from .renderers import FastJSONRenderer
+from .serializers import CreatorPostSerializer, CreatorSearchSerializer
+from .storage import blob_storage
+from .tokens import VERSION_CLAIM, StatelessJWTAuthentication, UserRefreshToken
+
+
+BASELINE = Path(__file__).parent / 'benchmarks' / 'baselines' / 'endpoints.json'
+
+
+def make_creator(email='creator@example.com', access_code='CREA1234', **extra):
+    user = User.objects.create_user(
+        email=email, password='pass', full_name='Creator', role=User.ROLE.CREATOR, **extra
+    )
+    CreatorProfile.objects.create(user=user, access_code=access_code)
+    return user
+
+
+def make_image(width=800, height=600, image_format='PNG', color=(200, 80, 40)):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), color).save(buffer, image_format)
+    return buffer.getvalue()
+
+
+def auth_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {UserRefreshToken.for_user(user).access_token}')
+    return client
+
+
+class FanFeedPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.creator = make_creator()
+        CreatorPost.objects.bulk_create(CreatorPost(creator=self.creator, title=f'post {i}') for i in range(7))
+        # later ids get later hours, three posts to an hour; ties go by id
+        noon = timezone.make_aware(datetime.datetime(2025, 1, 1, 12))
+        ids = list(CreatorPost.objects.order_by('id').values_list('id', flat=True))
+        for n, pk in enumerate(ids):
+            CreatorPost.objects.filter(pk=pk).update(created_at=noon + datetime.timedelta(hours=n // 3))
+        self.expected = [ids[6], *ids[3:6], *ids[0:3]]
+
+    def page(self, **params):
+        return self.client.post(reverse('fan_access'), {'email': 'fan@example.com', 'access_code': 'CREA1234', **params})
+
+    def test_cursors_walk_every_post_once_in_feed_order(self):
+        seen, cursor = [], None
+        while True:
+            response = self.page(page_size=3, **({'cursor': cursor} if cursor else {}))
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            seen += [post['id'] for post in body['posts']]
+            cursor = body['next_cursor']
+            if cursor is None:
+                break
+            self.assertEqual(decode_cursor(cursor)[1], seen[-1])
+        self.assertEqual(seen, self.expected)
+
+    def test_page_size_bounds(self):
+        self.assertEqual(len(self.page().json()['posts']), 7)
+        self.assertEqual(len(self.page(page_size=settings.FEED_MAX_PAGE_SIZE).json()['posts']), 7)
+        self.assertEqual(self.page(page_size=0).status_code, 400)
+        self.assertEqual(self.page(page_size=settings.FEED_MAX_PAGE_SIZE + 1).status_code, 400)
+
+    def test_invalid_cursors_are_rejected(self):
+        not_a_date = base64.urlsafe_b64encode(b'yesterday|1').decode()
+        for cursor in ('garbage', not_a_date, '%%%'):
+            with self.subTest(cursor):
+                response = self.page(cursor=cursor)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('cursor', response.json())
+
+    def test_first_page_cache_follows_post_saves_and_deletes(self):
+        self.page()  # cached
+        # updates that bypass signals aren't seen until the page is invalidated
+        CreatorPost.objects.filter(pk=self.expected[0]).update(title='Quietly renamed')
+        self.assertEqual(self.page().json()['posts'][0]['title'], 'post 6')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post = CreatorPost.objects.create(creator=self.creator, title='Newest')
+        titles = [post['title'] for post in self.page().json()['posts']]
+        self.assertEqual(titles[:2], ['Newest', 'Quietly renamed'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post.delete()
+        self.assertNotIn('Newest', [post['title'] for post in self.page().json()['posts']])
+
+
+class CreatorPostFeedQueryPlanTests(TestCase):
+    """Guards against feed queries silently falling back to a sort."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.creator = User.objects.create_user(
+            email='creator@example.com', password='pass', full_name='Creator', role=User.ROLE.CREATOR
+        )
+        CreatorPost.objects.bulk_create(
+            CreatorPost(creator=cls.creator, title=f'post {i}') for i in range(50)
+        )
+
+    def explain(self, queryset):
+        if connection.vendor == 'postgresql':
+            # tiny test tables would otherwise make a seq scan look cheaper
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def assertUsesFeedIndex(self, plan):
+        self.assertIn('creatorpost_feed_idx', plan)
+        if connection.vendor == 'sqlite':
+            self.assertNotIn('TEMP B-TREE', plan)
+        elif connection.vendor == 'postgresql':
+            self.assertNotIn('Sort', plan)
+
+    def test_feed_for_uses_composite_index(self):
+        self.assertUsesFeedIndex(self.explain(CreatorPost.objects.feed_for(self.creator)[:21]))
+
+    def test_keyset_page_uses_composite_index(self):
+        last = CreatorPost.objects.feed_for(self.creator)[19]
+        page = CreatorPost.objects.feed_for(self.creator).after(last.created_at, last.pk)
+        self.assertUsesFeedIndex(self.explain(page[:21]))
+
+
+class AccessCodeResolverTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.creator = make_creator()
+
+    def resolver(self):
+        return AccessCodeResolver(maxsize=10, ttl=60, negative_ttl=60, shared=cache, shared_ttl=60)
+
+    def test_local_then_shared_tier(self):
+        resolver = self.resolver()
+        with self.assertNumQueries(1):
+            self.assertEqual(resolver.resolve(' CREA1234 ').user.full_name, 'Creator')
+        with self.assertNumQueries(0):
+            profile = resolver.resolve('CREA1234')
+            self.assertEqual(resolver.resolve_id(profile.pk).access_code, 'CREA1234')
+        # another process: empty local tier, same shared one
+        with self.assertNumQueries(0):
+            self.assertEqual(self.resolver().resolve('CREA1234').pk, profile.pk)
+
+        profile.user.full_name = 'Changed by a view'
+        self.assertEqual(resolver.resolve('CREA1234').user.full_name, 'Creator')
+
+    def test_local_tier_never_serves_stale_profiles(self):
+        # another process edits the row; this one gets no signal
+        resolver = AccessCodeResolver(maxsize=10, ttl=60, negative_ttl=60)
+        profile = resolver.resolve('CREA1234')
+        CreatorProfile.objects.filter(pk=profile.pk).update(bio='Edited elsewhere')
+        with self.assertNumQueries(1):
+            self.assertEqual(resolver.resolve('CREA1234').bio, 'Edited elsewhere')
+
+        CreatorProfile.objects.filter(pk=profile.pk).update(access_code='CREA5678')
+        self.assertIsNone(resolver.resolve('CREA1234'))
+        self.assertEqual(resolver.resolve('CREA5678').pk, profile.pk)
+
+    def test_unknown_codes_are_negatively_cached(self):
+        resolver = self.resolver()
+        with self.assertNumQueries(1):
+            self.assertIsNone(resolver.resolve('NOPE0000'))
+        with self.assertNumQueries(0):
+            self.assertIsNone(resolver.resolve('NOPE0000'))
+            self.assertIsNone(self.resolver().resolve('NOPE0000'))
+            self.assertIsNone(resolver.resolve(''))
+
+    def test_changes_invalidate_cached_profiles(self):
+        profile = resolve_access_code('CREA1234')
+        profile.access_code = 'CREA5678'
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+        self.assertIsNone(resolve_access_code('CREA1234'))
+        self.assertEqual(resolve_access_code('CREA5678').pk, profile.pk)
+
+        self.creator.full_name = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.creator.save()
+        self.assertEqual(resolve_access_code('CREA5678').user.full_name, 'Renamed')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CreatorProfile.objects.get(pk=profile.pk).delete()
+        self.assertIsNone(resolve_access_code('CREA5678'))
+
+    def test_loaded_profile_saves_without_reading_itself_back(self):
+        profile = CreatorProfile.objects.get(user=self.creator)
+        profile.bio = 'Hello'
+        with self.assertNumQueries(1):
+            profile.save(update_fields=['bio'])
+        profile.access_code = 'CREA5678'
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+        self.assertIsNone(resolve_access_code('CREA1234'))
+
+    def test_new_picture_variants_invalidate_cached_profiles(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        with override_settings(MEDIA_ROOT=media_root):
+            # no signals, so the variants task isn't queued yet
+            name = blob_storage().save('me.png', ContentFile(make_image()))
+            CreatorProfile.objects.filter(user=self.creator).update(profile_picture=name)
+            profile = resolve_access_code('CREA1234')
+            self.assertEqual(profile.picture_variants, {})
+
+            images.generate_profile_variants(profile.pk)
+            self.assertTrue(resolve_access_code('CREA1234').picture_variants)
+
+
+class StatCounterTests(TestCase):
+    """The incrementally kept counters always agree with a full recompute."""
+
+    def assertMatchesRecompute(self, now=None):
+        kept = {key: value for key, value in StatCounter.objects.values_list('key', 'value') if value}
+        shown = stats.snapshot(now)
+        recomputed = stats.recompute()
+        self.assertEqual(kept, {key: value for key, value in recomputed.items() if value})
+        self.assertEqual(shown, stats.snapshot(now))
+        return shown
+
+    def test_creator_role_and_active_transitions(self):
+        creator = make_creator()
+        self.assertEqual(self.assertMatchesRecompute()['activeCreators'], 1)
+
+        creator.is_active = 'False'  # views assign raw request data
+        creator.save()
+        self.assertEqual(self.assertMatchesRecompute()['activeCreators'], 0)
+
+        creator = User.objects.get(pk=creator.pk)
+        creator.role = User.ROLE.CUSTOMER
+        creator.save()
+        self.assertEqual(self.assertMatchesRecompute()['totalCreators'], 0)
+
+        creator.role, creator.is_active = User.ROLE.CREATOR, True
+        creator.save()
+        counts = self.assertMatchesRecompute()
+        self.assertEqual((counts['totalCreators'], counts['activeCreators'], counts['monthlyCreators']), (1, 1, 1))
+
+        # a creator account without a profile isn't counted as a creator yet
+        User.objects.create_user(email='new@example.com', password='pass', full_name='New', role=User.ROLE.CREATOR)
+        self.assertEqual(self.assertMatchesRecompute()['monthlyCreators'], 2)
+
+    def test_cascade_deletes(self):
+        creator = make_creator()
+        make_creator(email='other@example.com', access_code='OTHE1234')
+        CreatorPost.objects.create(creator=creator, title='Hello')
+        CreditCard.objects.create(user=creator, **CARD)
+        self.assertEqual(self.assertMatchesRecompute()['totalCreditCards'], 1)
+
+        creator.delete()
+        counts = self.assertMatchesRecompute()
+        self.assertEqual(
+            (counts['totalCreators'], counts['totalPosts'], counts['totalCreditCards']), (1, 0, 0)
+        )
+
+        User.objects.get(email='other@example.com').creator_profile.delete()
+        self.assertEqual(self.assertMatchesRecompute()['totalCreators'], 0)
+
+    def test_monthly_buckets(self):
+        january = timezone.make_aware(datetime.datetime(2024, 1, 15))
+        make_creator(date_joined=january)
+        make_creator(email='other@example.com', access_code='OTHE1234')
+        counts = self.assertMatchesRecompute(now=january)
+        self.assertEqual((counts['monthlyCreators'], counts['totalCreators']), (1, 2))
+        self.assertEqual(StatCounter.objects.get(key=stats.monthly_key(stats.MONTHLY_CREATORS, january)).value, 1)
+
+    def test_recompute_stats_repairs_drift(self):
+        make_creator()
+        StatCounter.objects.update(value=99)
+        out = io.StringIO()
+        call_command('recompute_stats', stdout=out)
+        self.assertIn('Recomputed', out.getvalue())
+        self.assertEqual(stats.snapshot()['totalCreators'], 1)
+
+
+    def test_migration_seeds_the_same_counters_as_recompute(self):
+        january = timezone.make_aware(datetime.datetime(2024, 1, 15))
+        creator = make_creator(date_joined=january)
+        make_creator(email='other@example.com', access_code='OTHE1234', is_active=False)
+        CreatorPost.objects.create(creator=creator, title='Hello')
+        CreditCard.objects.create(user=creator, **CARD)
+        expected = stats.recompute()
+
+        StatCounter.objects.all().delete()
+        migration = importlib.import_module('user.migrations.0007_statcounter')
+        migration.seed_counters(django_apps, connection.schema_editor())
+        self.assertEqual(dict(StatCounter.objects.values_list('key', 'value')), expected)
+
+class AdminListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='admin@example.com', password='pass', full_name='Admin', role=User.ROLE.ADMIN
+        )
+        for n in range(5):
+            make_creator(email=f'creator{n}@example.com', access_code=f'CREA000{n}')
+        for n in range(3):
+            User.objects.create_user(email=f'fan{n}@example.com', password='pass', full_name=f'Fan {n}')
+
+    def setUp(self):
+        self.client = auth_client(self.admin)
+
+    def walk(self, url):
+        pages, previous = [], []
+        while url:
+            body = self.client.get(url).json()
+            pages.append([row['id'] for row in body['results']])
+            previous.append(body['previous'])
+            url = body['next']
+        return pages, previous
+
+    def test_cursor_pages_are_newest_first_and_stable(self):
+        pages, previous = self.walk(reverse('admin_users') + '?page_size=3')
+        self.assertEqual([len(page) for page in pages], [3, 3, 3])
+        self.assertEqual(sum(pages, []), list(User.objects.order_by('-id').values_list('id', flat=True)))
+        self.assertIsNone(previous[0])
+
+        # rows added at the top don't shift the pages behind a cursor
+        User.objects.create_user(email='late@example.com', password='pass', full_name='Late')
+        back = self.client.get(previous[2]).json()
+        self.assertEqual([row['id'] for row in back['results']], pages[1])
+
+    def test_ndjson_export_streams_every_row(self):
+        pages, _ = self.walk(reverse('admin_creators') + '?page_size=2')
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+
+        response = self.client.get(reverse('admin_creators'), {'export': 'ndjson'})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="creators.ndjson"')
+        body = b''.join(response.streaming_content).decode()
+        self.assertTrue(body.endswith('\n'))
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row['id'] for row in rows], sum(pages, []))
+        first = self.client.get(reverse('admin_creators'), {'page_size': 1}).json()['results'][0]
+        self.assertEqual(rows[0], first)
+
+        response = self.client.get(reverse('admin_users'), {'export': 'ndjson'})
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 9)
+
+
+class ChunkedVideoUploadTests(TestCase):
+    """Upload flow against throwaway MEDIA_ROOT and part directories with inline tasks."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        self.parts_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.parts_root)
+        overrides = override_settings(
+            MEDIA_ROOT=self.media_root, UPLOAD_PARTS_ROOT=self.parts_root, TASKS_EAGER=True, UPLOAD_PART_SIZE=4,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.creator = make_creator()
+        self.client = auth_client(self.creator)
+
+    def start(self, data=b'0123456789'):
+        response = self.client.post(
+            reverse('video_upload_init', args=[self.creator.creator_profile.id]),
+            {'filename': '../clip.mp4', 'total_size': len(data), 'title': 'Clip'},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.data
+
+    def put_part(self, upload_id, number, body):
+        return self.client.generic(
+            'PUT', reverse('video_upload_part', args=[upload_id, number]), body,
+            content_type='application/octet-stream',
+        )
+
+    def test_parts_resume_and_assemble_into_post(self):
+        upload = self.start()
+        self.assertEqual(upload['part_count'], 3)
+
+        self.assertEqual(self.put_part(upload['id'], 3, b'89').status_code, 200)
+        self.assertEqual(self.put_part(upload['id'], 1, b'0123').status_code, 200)
+        detail = self.client.get(reverse('video_upload_detail', args=[upload['id']]))
+        self.assertEqual(detail.data['received_parts'], [1, 3])
+
+        response = self.client.post(reverse('video_upload_complete', args=[upload['id']]))
+        self.assertEqual(response.status_code, 400)
+
+        self.put_part(upload['id'], 2, b'4567')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('video_upload_complete', args=[upload['id']]))
+        self.assertEqual(response.status_code, 202)
+
+        session = UploadSession.objects.get(pk=upload['id'])
+        self.assertEqual(session.status, UploadSession.STATUS.COMPLETE)
+        self.assertTrue(session.post.video.name.startswith('blobs/'))
+        self.assertTrue(session.post.video.name.endswith('.mp4'))
+        with session.post.video.open('rb') as video:
+            self.assertEqual(video.read(), b'0123456789')
+        self.assertEqual(os.listdir(self.parts_root), [])
+
+    def test_parts_are_kept_outside_media_root(self):
+        upload = self.start()
+        self.put_part(upload['id'], 1, b'0123')
+        self.assertTrue(os.path.isfile(os.path.join(self.parts_root, upload['id'], '00001.part')))
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, 'uploads')))
+
+        # nor served from a MEDIA_ROOT/uploads/ left over from before
+        os.makedirs(os.path.join(self.media_root, 'uploads'))
+        with open(os.path.join(self.media_root, 'uploads', 'old.part'), 'wb') as part:
+            part.write(b'0123')
+        self.assertEqual(self.client.get(reverse('media', kwargs={'path': 'uploads/old.part'})).status_code, 404)
+
+    def test_abandoned_uploads_are_cleaned_up(self):
+        stale, fresh = self.start(), self.start()
+        for upload in (stale, fresh):
+            self.put_part(upload['id'], 1, b'0123')
+        UploadSession.objects.filter(pk=stale['id']).update(
+            created_at=timezone.now() - datetime.timedelta(days=30)
+        )
+        os.makedirs(os.path.join(self.parts_root, str(uuid.uuid4())))  # session already deleted
+
+        out = io.StringIO()
+        call_command('clean_uploads', stdout=out)
+        self.assertIn('Removed 1 abandoned uploads and 1 orphaned', out.getvalue())
+        self.assertFalse(UploadSession.objects.filter(pk=stale['id']).exists())
+        self.assertEqual(os.listdir(self.parts_root), [fresh['id']])
+
+    def test_wrong_part_size_is_rejected(self):
+        upload = self.start()
+        self.assertEqual(self.put_part(upload['id'], 1, b'01').status_code, 400)
+        self.assertEqual(self.put_part(upload['id'], 4, b'0123').status_code, 400)
+
+    def test_other_creators_cannot_touch_upload(self):
+        upload = self.start()
+        other = auth_client(make_creator(email='other@example.com', access_code='OTHE1234'))
+        response = other.generic('PUT', reverse('video_upload_part', args=[upload['id'], 1]), b'0123')
+        self.assertEqual(response.status_code, 404)
+
+
+class MediaServingTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        overrides = override_settings(MEDIA_ROOT=media_root)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.media_root = media_root
+        self.data = bytes(range(100))
+        self.write('creator_videos/clip.mp4')
+
+    def write(self, name):
+        os.makedirs(os.path.dirname(os.path.join(self.media_root, name)), exist_ok=True)
+        with open(os.path.join(self.media_root, name), 'wb') as handle:
+            handle.write(self.data)
+
+    def get(self, path='creator_videos/clip.mp4', **headers):
+        response = self.client.get(reverse('media', kwargs={'path': path}), headers=headers)
+        self.addCleanup(response.close)
+        return response
+
+    def body(self, response):
+        return b''.join(response.streaming_content) if response.streaming else response.content
+
+    def test_parse_range(self):
+        for header, expected in [
+            ('bytes=0-9', (0, 9)),
+            ('bytes=-10', (90, 99)),  # suffix
+            ('bytes=90-', (90, 99)),  # open-ended
+            ('bytes=95-200', (95, 99)),
+            ('bytes=-500', (0, 99)),
+            (None, None),
+            ('bytes=0-1,5-6', None),  # several ranges: whole file
+            ('bytes=5-2', None),
+            ('items=0-1', None),
+        ]:
+            with self.subTest(header):
+                self.assertEqual(parse_range(header, 100), expected)
+        for header in ('bytes=100-', 'bytes=-0'):
+            with self.subTest(header), self.assertRaises(RangeNotSatisfiable):
+                parse_range(header, 100)
+
+    def test_only_media_directories_are_served(self):
+        for name in ('blobs/ab/' + 'ab' * 32 + '.jpg', 'profile_pics/me.jpg', 'derivatives/a_320w.webp'):
+            self.write(name)
+            with self.subTest(name):
+                self.assertEqual(self.get(name).status_code, 200)
+        for name in ('blobs/tmp/upload.part', 'clip.mp4', 'uploads/1/00001.part', 'private/notes.txt'):
+            self.write(name)
+            with self.subTest(name):
+                self.assertEqual(self.get(name).status_code, 404)
+
+    def test_range_requests(self):
+        response = self.get(range='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/100')
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(self.body(response), self.data[10:20])
+
+        self.assertEqual(self.body(self.get(range='bytes=-5')), self.data[-5:])
+        self.assertEqual(self.body(self.get(range='bytes=95-')), self.data[95:])
+
+        response = self.get(range='bytes=200-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */100')
+
+    def test_validators(self):
+        full = self.get()
+        self.assertEqual((full.status_code, self.body(full)), (200, self.data))
+        etag = full['ETag']
+
+        self.assertEqual(self.get(if_none_match=etag).status_code, 304)
+        self.assertEqual(self.get(range='bytes=0-9', if_range=etag).status_code, 206)
+        stale = self.get(range='bytes=0-9', if_range='"stale"')
+        self.assertEqual((stale.status_code, self.body(stale)), (200, self.data))
+
+    @override_settings(MEDIA_ACCEL_REDIRECT_PREFIX='/protected-media/')
+    def test_accel_redirect_hands_body_to_nginx(self):
+        response = self.get(range='bytes=0-9')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/creator_videos/clip.mp4')
+        self.assertEqual(response.content, b'')
+        self.assertIn('ETag', response)
+
+
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        overrides = override_settings(MEDIA_ROOT=media_root, TASKS_EAGER=True)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.creator = make_creator()
+
+    def create_post(self, width=800, height=600):
+        post = CreatorPost(creator=self.creator, title='Photo')
+        post.image.save('photo.png', ContentFile(make_image(width, height)), save=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            post.save()
+        post.refresh_from_db()
+        return post
+
+    def test_variants_at_each_width_and_format(self):
+        record = self.create_post().image_variants
+        self.assertEqual(record['source'], CreatorPost.objects.get().image.name)
+        for key, pil_format in (('webp', 'WEBP'), ('jpeg', 'JPEG')):
+            self.assertEqual(sorted(record[key], key=int), ['320', '640', '800'])
+            with blob_storage().open(record[key]['320']) as handle:
+                image = Image.open(handle)
+                self.assertEqual((image.format, image.size), (pil_format, (320, 240)))
+
+        # nothing wider than the largest configured width
+        wide = images.build_variants(self.create_post(width=2000, height=100).image)
+        self.assertEqual(sorted(wide['webp'], key=int), ['320', '640', '1280'])
+
+    def test_srcset(self):
+        post = self.create_post()
+        srcset = images.srcset(post.image, post.image_variants, lambda url: 'https://cdn.example' + url)
+        self.assertEqual(set(srcset), {'webp', 'jpeg'})
+        candidates = srcset['webp'].split(', ')
+        self.assertEqual([candidate.rsplit(' ', 1)[1] for candidate in candidates], ['320w', '640w', '800w'])
+        self.assertTrue(all(candidate.startswith('https://cdn.example/') for candidate in candidates))
+
+        self.assertIsNone(images.srcset(post.image, {'source': 'something/else.png'}, str))
+        self.assertIsNone(images.srcset(CreatorPost().image, post.image_variants, str))
+
+    def test_replacing_the_image_discards_old_variants(self):
+        post = self.create_post()
+        old = images.variant_names(post.image_variants)
+        post.image.save('new.png', ContentFile(make_image(640, 480, color=(20, 90, 200))), save=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            post.save()
+        post.refresh_from_db()
+
+        self.assertEqual(post.image_variants['source'], post.image.name)
+        self.assertEqual(sorted(post.image_variants['jpeg'], key=int), ['320', '640'])
+        self.assertEqual(set(MediaBlob.objects.filter(name__in=old).values_list('ref_count', flat=True)), {0})
+
+    def test_command_fills_in_missing_variants(self):
+        name = blob_storage().save('photo.png', ContentFile(make_image()))
+        post = CreatorPost.objects.create(creator=self.creator, title='Imported')
+        CreatorPost.objects.filter(pk=post.pk).update(image=name)  # e.g. bulk imported, no signals
+        CreatorProfile.objects.filter(user=self.creator).update(profile_picture=name)
+
+        call_command('generate_image_variants', stdout=io.StringIO())
+        post.refresh_from_db()
+        profile = CreatorProfile.objects.get(user=self.creator)
+        self.assertTrue(images.variants_are_current(post.image, post.image_variants))
+        self.assertTrue(images.variants_are_current(profile.profile_picture, profile.picture_variants))
+
+
+def mp4_box(box_type, payload=b''):
+    return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+
+
+def make_mp4(seconds=12.5, width=1280, height=720):
+    """Smallest file user.video can read: ftyp, some mdat, then moov."""
+    mvhd = mp4_box(b'mvhd', struct.pack('>4sIIII', b'\0' * 4, 0, 0, 1000, int(seconds * 1000)) + b'\0' * 80)
+    tkhd = mp4_box(b'tkhd', b'\0' * 24 + b'\0' * 52 + struct.pack('>II', width << 16, height << 16))
+    hdlr = mp4_box(b'hdlr', b'\0' * 8 + b'vide' + b'\0' * 13)
+    moov = mp4_box(b'moov', mvhd + mp4_box(b'trak', tkhd + mp4_box(b'mdia', hdlr)))
+    return mp4_box(b'ftyp', b'isom\0\0\0\0') + mp4_box(b'mdat', b'\0' * 50000) + moov
+
+
+class VideoMetadataTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        overrides = override_settings(MEDIA_ROOT=media_root, TASKS_EAGER=True)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def test_saving_a_video_stores_its_metadata(self):
+        data = make_mp4()
+        with self.captureOnCommitCallbacks(execute=True):
+            post = CreatorPost.objects.create(
+                creator=make_creator(), title='Clip', video=SimpleUploadedFile('clip.mp4', data),
+            )
+
+        post.refresh_from_db()
+        self.assertEqual(post.duration, 12.5)
+        self.assertEqual((post.width, post.height), (1280, 720))
+        self.assertEqual(post.bitrate, int(len(data) * 8 / 12.5))
+        self.assertEqual(post.video_metadata_source, post.video.name)
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        overrides = override_settings(MEDIA_ROOT=self.media_root, TASKS_EAGER=True)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.creator = make_creator()
+
+    def create_post(self, filename, data):
+        with self.captureOnCommitCallbacks(execute=True):
+            return CreatorPost.objects.create(
+                creator=self.creator, title='Clip', video=SimpleUploadedFile(filename, data),
+            )
+
+    def test_same_bytes_are_stored_once_and_served_immutable(self):
+        data = make_mp4()
+        first, second = self.create_post('a.mp4', data), self.create_post('b.MP4', data)
+        self.assertEqual(first.video.name, second.video.name)
+        self.assertTrue(first.video.name.startswith('blobs/'))
+        self.assertEqual(MediaBlob.objects.get(name=first.video.name).ref_count, 2)
+        self.assertEqual(os.listdir(os.path.dirname(first.video.path)), [os.path.basename(first.video.path)])
+
+        response = self.client.get(first.video.url)
+        self.assertEqual(b''.join(response.streaming_content), data)
+        self.assertIn('immutable', response['Cache-Control'])
+
+    def test_gc_removes_blobs_only_once_unreferenced(self):
+        kept = self.create_post('kept.mp4', make_mp4(seconds=1))
+        dropped = self.create_post('dropped.mp4', make_mp4(seconds=2))
+        dropped_path = dropped.video.path
+        with self.captureOnCommitCallbacks(execute=True):
+            dropped.delete()
+        # a count that drifted to zero must not cost a referenced file
+        MediaBlob.objects.filter(name=kept.video.name).update(ref_count=0)
+
+        call_command('gc_media', grace=0, stdout=io.StringIO())
+        self.assertFalse(os.path.exists(dropped_path))
+        self.assertFalse(MediaBlob.objects.filter(name=dropped.video.name).exists())
+        self.assertTrue(os.path.exists(kept.video.path))
+
+        call_command('gc_media', recount=True, grace=0, stdout=io.StringIO())
+        self.assertEqual(MediaBlob.objects.get(name=kept.video.name).ref_count, 1)
+
+    def test_replacing_post_media_releases_the_old_blob(self):
+        post = self.create_post('old.mp4', make_mp4(seconds=1))
+        old_name = post.video.name
+        post = CreatorPost.objects.get(pk=post.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            post.title = 'Renamed'
+            post.save()
+        self.assertEqual(MediaBlob.objects.get(name=old_name).ref_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post.video = SimpleUploadedFile('new.mp4', make_mp4(seconds=2))
+            post.save()
+        self.assertEqual(MediaBlob.objects.get(name=old_name).ref_count, 0)
+        self.assertEqual(MediaBlob.objects.get(name=post.video.name).ref_count, 1)
+
+        # an instance that wasn't loaded from the database looks the old name up
+        new_name = post.video.name
+        with self.captureOnCommitCallbacks(execute=True):
+            CreatorPost(pk=post.pk, creator=self.creator, title='Bare', created_at=post.created_at).save()
+        self.assertEqual(MediaBlob.objects.get(name=new_name).ref_count, 0)
+
+
+@override_settings(TASKS_EAGER=True)
+class PostReactionTests(TestCase):
+    def setUp(self):
+        self.creator = make_creator()
+        self.post = CreatorPost.objects.create(creator=self.creator, title='Hello')
+        self.fan = {'email': 'fan@example.com', 'access_code': 'CREA1234'}
+        self.client = APIClient()
+
+    def test_likes_and_comments_are_counted_on_the_post(self):
+        url = reverse('post_like', args=[self.post.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.post(url, self.fan, format='json').status_code, 201)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.post(url, self.fan, format='json').status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('post_comments', args=[self.post.pk]), {**self.fan, 'body': 'Nice'}, format='json',
+            )
+        self.assertEqual(response.status_code, 201)
+
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.likes_count, self.post.comments_count), (1, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(url, self.fan, format='json')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 0)
+
+        comments = self.client.get(reverse('post_comments', args=[self.post.pk]), self.fan)
+        self.assertEqual([c['body'] for c in comments.data['results']], ['Nice'])
+
+    def test_repeated_unlike_decrements_once(self):
+        url = reverse('post_like', args=[self.post.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, self.fan, format='json')
+        for _ in range(2):
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                self.assertEqual(self.client.delete(url, self.fan, format='json').status_code, 200)
+        self.assertEqual(callbacks, [])  # nothing left to delete, nothing recorded
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 0)
+        self.assertFalse(PostLike.objects.filter(post=self.post).exists())
+
+    def test_access_code_must_belong_to_the_posts_creator(self):
+        make_creator(email='other@example.com', access_code='OTHE1234')
+        response = self.client.post(
+            reverse('post_like', args=[self.post.pk]),
+            {'email': 'fan@example.com', 'access_code': 'OTHE1234'}, format='json',
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class CreatorFeedSocketTests(TestCase):
+    def setUp(self):
+        self.creator = make_creator()
+
+    async def connect(self, access_code):
+        # channels.testing needs daphne, so speak the ASGI websocket protocol directly
+        communicator = ApplicationCommunicator(application, {
+            'type': 'websocket', 'path': '/ws/creator/feed/',
+            'query_string': f'access_code={access_code}'.encode(),
+            'headers': [(b'host', b'localhost'), (b'origin', b'http://localhost')], 'subprotocols': [],
+        })
+        await communicator.send_input({'type': 'websocket.connect'})
+        reply = await communicator.receive_output()
+        return communicator, reply['type'] == 'websocket.accept'
+
+    async def receive_json(self, communicator):
+        message = await communicator.receive_output()
+        return json.loads(message['text'])
+
+    def create_post(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return CreatorPost.objects.create(creator=self.creator, title='Fresh')
+
+    async def test_new_posts_are_pushed_to_connected_fans(self):
+        communicator, connected = await self.connect('CREA1234')
+        self.assertTrue(connected)
+
+        post = await database_sync_to_async(self.create_post)()
+        message = await self.receive_json(communicator)
+        self.assertEqual(message['type'], 'post.created')
+        self.assertEqual(message['post']['id'], post.pk)
+        self.assertEqual(message['post']['title'], 'Fresh')
+        await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await communicator.wait()
+
+    async def test_media_urls_match_the_rest_feed(self):
+        communicator, connected = await self.connect('CREA1234')
+        self.assertTrue(connected)
+        post = CreatorPost(
+            pk=7, creator=self.creator, title='Fresh', created_at=timezone.now(),
+            image='creator_images/a b.jpg', video='creator_videos/clip.mp4',
+        )
+        await get_channel_layer().group_send(
+            feed_group(self.creator.pk), {'type': 'post.created', 'post': post_payload(post)}
+        )
+        message = await self.receive_json(communicator)
+
+        request = RequestFactory().get('/', HTTP_HOST='localhost')
+        expected = CreatorPostSerializer([post], many=True, context={'request': request}).data[0]
+        for field in ('image', 'video', 'image_url', 'video_url'):
+            self.assertEqual(message['post'][field], expected[field], field)
+        self.assertTrue(message['post']['video_url'].startswith('http://localhost/'))
+        await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await communicator.wait()
+
+    async def test_unknown_access_code_is_rejected(self):
+        communicator, connected = await self.connect('NOPE0000')
+        self.assertFalse(connected)
+
+
+class ConditionalContentTests(TestCase):
+    def setUp(self):
+        self.creator = make_creator()
+        self.profile = self.creator.creator_profile
+        self.post = CreatorPost.objects.create(creator=self.creator, title='Hello')
+        self.fan = {'email': 'fan@example.com', 'access_code': 'CREA1234'}
+        self.client = APIClient()
+
+    def test_unchanged_content_is_a_304_until_a_post_changes(self):
+        url = reverse('fan_access')
+        first = self.client.get(url, self.fan)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()['posts'][0]['title'], 'Hello')
+        self.assertEqual(first.json(), self.client.post(url, self.fan, format='json').json())
+
+        with self.assertNumQueries(1):
+            again = self.client.get(url, self.fan, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again['ETag'], first['ETag'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.title = 'Edited'
+            self.post.save()
+        changed = self.client.get(url, self.fan, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()['posts'][0]['title'], 'Edited')
+
+    def test_creator_content_revalidates_on_profile_and_name_changes(self):
+        client = auth_client(self.creator)
+        url = reverse('creator_content', args=[self.profile.pk])
+        etag = client.get(url)['ETag']
+        self.assertEqual(client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # each representation has its own tag
+        self.assertNotEqual(client.get(url, HTTP_ACCEPT='application/msgpack')['ETag'], etag)
+
+        self.profile.bio = 'New bio'
+        self.profile.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        self.creator.full_name = 'Renamed'
+        self.creator.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['creator']['full_name'], 'Renamed')
+
+
+@override_settings(TASKS_EAGER=True)
+class FanTokenTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # runs the profile signals, dropping resolver entries left by earlier tests
+        with self.captureOnCommitCallbacks(execute=True):
+            self.creator = make_creator()
+        self.profile = self.creator.creator_profile
+        self.post = CreatorPost.objects.create(creator=self.creator, title='Hello')
+        self.client = APIClient()
+
+    def get_token(self):
+        response = self.client.post(
+            reverse('fan_access'), {'email': 'fan@example.com', 'access_code': 'CREA1234'}, format='json',
+        )
+        return response['X-Fan-Token']
+
+    def test_token_stands_in_for_email_and_access_code(self):
+        token = self.get_token()
+        response = self.client.get(reverse('fan_access'), HTTP_X_FAN_TOKEN=token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['posts'][0]['title'], 'Hello')
+        self.assertNotIn('X-Fan-Token', response)  # no re-issue for token holders
+
+        with self.captureOnCommitCallbacks(execute=True):
+            like = self.client.post(reverse('post_like', args=[self.post.pk]), HTTP_X_FAN_TOKEN=token)
+        self.assertEqual(like.status_code, 201)
+        self.assertTrue(PostLike.objects.filter(post=self.post, fan_email='fan@example.com').exists())
+
+        response = self.client.get(reverse('fan_access'), HTTP_X_FAN_TOKEN=token + 'x')
+        self.assertEqual(response.status_code, 401)
+        with override_settings(FAN_TOKEN_MAX_AGE=-1):
+            self.assertEqual(self.client.get(reverse('fan_access'), HTTP_X_FAN_TOKEN=token).status_code, 401)
+
+    def test_revoking_and_new_access_codes_invalidate_tokens(self):
+        token = self.get_token()
+        url = reverse('fan_tokens_revoke', args=[self.profile.pk])
+        other = make_creator(email='other@example.com', access_code='OTHE1234')
+        self.assertEqual(auth_client(other).post(url).status_code, 403)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(auth_client(self.creator).post(url).status_code, 204)
+        self.assertEqual(self.client.get(reverse('fan_access'), HTTP_X_FAN_TOKEN=token).status_code, 401)
+
+        token = self.get_token()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.access_code = 'NEWC1234'
+            self.profile.save()
+        self.assertEqual(self.client.get(reverse('fan_access'), HTTP_X_FAN_TOKEN=token).status_code, 401)
+
+
+class AsyncReadPathTests(TestCase):
+    def setUp(self):
+        self.creator = make_creator()
+        CreatorPost.objects.create(creator=self.creator, title='Hello')
+
+    async def test_async_fan_access_matches_sync_view(self):
+        body = {'email': 'fan@example.com', 'access_code': 'CREA1234'}
+        sync_response = await self.async_client.post(reverse('fan_access'), body, content_type='application/json')
+        async_response = await self.async_client.post(reverse('async_fan_access'), body, content_type='application/json')
+        self.assertEqual(async_response.status_code, 200)
+        self.assertEqual(async_response.json(), sync_response.json())
+
+    async def test_async_creator_content_honours_if_none_match(self):
+        profile = await CreatorProfile.objects.aget(user=self.creator)
+        token = await database_sync_to_async(lambda: UserRefreshToken.for_user(self.creator).access_token)()
+        headers = {'Authorization': f'Bearer {token}'}
+        url = reverse('async_creator_content', args=[profile.pk])
+        first = await self.async_client.get(url, headers=headers)
+        self.assertEqual(first.status_code, 200)
+        sync_response = await self.async_client.get(reverse('creator_content', args=[profile.pk]), headers=headers)
+        self.assertEqual(first['ETag'], sync_response['ETag'])
+
+        again = await self.async_client.get(url, headers={**headers, 'If-None-Match': first['ETag']})
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again['ETag'], first['ETag'])
+
+        await CreatorPost.objects.acreate(creator=self.creator, title='New')
+        changed = await self.async_client.get(url, headers={**headers, 'If-None-Match': first['ETag']})
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(len(changed.json()['posts']), 2)
+
+    async def test_async_admin_stats_requires_admin_token(self):
+        token = await database_sync_to_async(lambda: UserRefreshToken.for_user(self.creator).access_token)()
+        response = await self.async_client.get(reverse('async_admin_stats'), headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 403)
+        response = await self.async_client.get(reverse('async_admin_stats'))
+        self.assertEqual(response.status_code, 401)
+
+
+class JWTRevocationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            email='admin@example.com', password='pass', full_name='Admin', role=User.ROLE.ADMIN
+        )
+        self.refresh = UserRefreshToken.for_user(self.admin)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.refresh.access_token}')
+
+    def change(self, **fields):
+        user = User.objects.get(pk=self.admin.pk)
+        for name, value in fields.items():
+            setattr(user, name, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+
+    def test_deactivating_revokes_issued_tokens(self):
+        self.assertEqual(self.client.get(reverse('admin_stats')).status_code, 200)
+        self.change(is_active=False)
+        self.assertEqual(self.client.get(reverse('admin_stats')).status_code, 401)
+
+    def test_role_change_revokes_access_and_refresh_tokens(self):
+        self.change(role=User.ROLE.CUSTOMER)
+        self.assertEqual(self.client.get(reverse('admin_stats')).status_code, 401)
+        response = APIClient().post(reverse('token_refresh'), {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_stale_instance_cannot_unrevoke(self):
+        stale = User.objects.get(pk=self.admin.pk)
+        self.change(is_active=False)
+        stale.full_name = 'Renamed'
+        stale.save()
+        self.assertEqual(User.objects.get(pk=self.admin.pk).token_version, 1)
+        self.assertEqual(self.client.get(reverse('admin_stats')).status_code, 401)
+
+    def test_tokens_without_version_claim_still_work(self):
+        token = RefreshToken.for_user(self.admin).access_token
+        self.assertNotIn(VERSION_CLAIM, token)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(client.get(reverse('admin_stats')).status_code, 200)
+
+    def test_claims_user_costs_no_queries(self):
+        auth = StatelessJWTAuthentication()
+        token = auth.get_validated_token(str(self.refresh.access_token))
+        auth.get_user(token)  # warm the cached token_version
+        with self.assertNumQueries(0):
+            user = auth.get_user(token)
+            self.assertEqual((user.pk, user.role, user.is_active), (self.admin.pk, User.ROLE.ADMIN, True))
+
+
+class EmailBackendTests(TestCase):
+    def setUp(self):
+        self.creator = make_creator()
+
+    def test_email_password_and_access_code(self):
+        self.assertEqual(authenticate(email='creator@example.com', password='pass'), self.creator)
+        self.assertEqual(authenticate(username='creator@example.com', password='pass'), self.creator)
+        self.assertEqual(authenticate(access_code='CREA1234'), self.creator)
+        self.assertIsNone(authenticate(access_code='NOPE0000'))
+
+    def test_failed_login_costs_one_query(self):
+        with self.assertNumQueries(1):
+            self.assertIsNone(authenticate(email='creator@example.com', password='wrong'))
+        with self.assertNumQueries(1):
+            self.assertIsNone(authenticate(email='nobody@example.com', password='wrong'))
+
+    def test_inactive_users_are_refused(self):
+        User.objects.filter(pk=self.creator.pk).update(is_active=False)
+        self.assertIsNone(authenticate(email='creator@example.com', password='pass'))
+
+    def test_logins_do_not_load_the_search_vector(self):
+        with CaptureQueriesContext(connection) as queries:
+            user = authenticate(email='creator@example.com', password='pass')
+        self.assertNotIn('search_vector', queries[0]['sql'])
+        self.assertEqual(user.get_deferred_fields(), {'search_vector'})
+        user.full_name = 'Renamed'
+        user.save()
+        self.assertEqual(User.objects.get(pk=user.pk).full_name, 'Renamed')
+
+
+@override_settings(TASKS_EAGER=True, ACCESS_CODE_POOL={'SIZE': 20, 'LOW_WATER': 5, 'SUFFIX_BYTES': 4})
+class AccessCodePoolTests(TestCase):
+    def test_signup_codes_come_from_the_pool(self):
+        refill_pool()
+        code = generate_unique_access_code('Jane Doe')
+        suffix = code[len('JANE'):]
+        self.assertTrue(code.startswith('JANE'))
+        self.assertTrue(AccessCodePool.objects.get(suffix=suffix).claimed_at)
+        self.assertEqual(len(claim_suffixes(100)), 19)
+
+    def test_admin_bulk_provisioning(self):
+        admin = User.objects.create_user(email='admin@example.com', password='pass', full_name='Admin', role=User.ROLE.ADMIN)
+        make_creator(email='taken@example.com')
+        creators = [{'email': f'c{n}@example.com', 'full_name': f'Creator {n}'} for n in range(30)]
+        creators.append({'email': 'taken@example.com', 'full_name': 'Taken'})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = auth_client(admin).post(reverse('admin_creators_bulk'), {'creators': creators}, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['created']), 30)
+        self.assertEqual(response.data['skipped'], ['taken@example.com'])
+        codes = {row['access_code'] for row in response.data['created']}
+        self.assertEqual(len(codes), 30)
+        self.assertEqual(CreatorProfile.objects.filter(access_code__in=codes).count(), 30)
+        self.assertEqual(stats.snapshot()['totalCreators'], 31)
+
+
+def make_google_signer(key_id='test-key'):
+    """RSA signer plus the matching self-signed cert, as Google publishes them."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'test')])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+        .serial_number(1).not_valid_before(now).not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    signer = crypt.RSASigner.from_string(private_pem, key_id=key_id)
+    return signer, {key_id: cert.public_bytes(serialization.Encoding.PEM).decode()}
+
+
+class FakeGoogleCerts(BaseHTTPRequestHandler):
+    certs = {}
+    hits = 0
+    status = 200
+
+    def do_GET(self):
+        type(self).hits += 1
+        body = json.dumps(self.certs).encode()
+        self.send_response(self.status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Cache-Control', 'public, max-age=3600')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(GOOGLE_CLIENT_ID='test-client')
+class GoogleVerifierTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.signer, FakeGoogleCerts.certs = make_google_signer()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeGoogleCerts)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.certs_url = f'http://127.0.0.1:{cls.server.server_address[1]}/certs'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        FakeGoogleCerts.hits = 0
+        FakeGoogleCerts.status = 200
+        self.addCleanup(setattr, FakeGoogleCerts, 'status', 200)
+
+    def token(self, email='creator@example.com', audience='test-client'):
+        now = int(time.time())
+        return google_jwt.encode(self.signer, {
+            'iss': 'https://accounts.google.com', 'aud': audience, 'email': email,
+            'name': 'Creator', 'iat': now, 'exp': now + 600,
+        }).decode()
+
+    def test_certs_are_fetched_once_and_reused(self):
+        verifier = GoogleTokenVerifier(self.certs_url, 'test-client')
+        self.assertEqual(verifier.verify(self.token())['email'], 'creator@example.com')
+        verifier.verify(self.token())
+        self.assertEqual(FakeGoogleCerts.hits, 1)
+
+        with self.assertRaises(GoogleTokenError):
+            verifier.verify(self.token(audience='someone-else'))
+
+    def test_failed_refresh_keeps_old_certs_and_backs_off(self):
+        verifier = GoogleTokenVerifier(self.certs_url, 'test-client', retry_after=30)
+        verifier.verify(self.token())
+        verifier._expires_at = 0  # certs went stale
+        FakeGoogleCerts.status = 503
+
+        self.assertEqual(verifier.verify(self.token())['email'], 'creator@example.com')
+        verifier.verify(self.token())
+        self.assertEqual(FakeGoogleCerts.hits, 2)
+        self.assertGreater(verifier._expires_at, time.monotonic() + 20)
+
+        FakeGoogleCerts.status = 200
+        verifier._expires_at = 0  # backoff over
+        verifier.verify(self.token())
+        self.assertEqual(FakeGoogleCerts.hits, 3)
+
+    def test_google_login_view_uses_the_verifier(self):
+        make_creator()
+        with self.settings(GOOGLE_CERTS_URL=self.certs_url):
+            response = self.client.post(reverse('google_login'), {'token': self.token()}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['email'], 'creator@example.com')
+
+
+class RendererNegotiationTests(TestCase):
+    def setUp(self):
+        self.creator = make_creator()
+        for n in range(3):
+            CreatorPost.objects.create(creator=self.creator, title=f'Post {n}  ')
+        self.body = {'email': 'fan@example.com', 'access_code': 'CREA1234'}
+
+    def test_msgpack_and_json_carry_the_same_data(self):
+        url = reverse('fan_access')
+        as_json = self.client.post(url, self.body, content_type='application/json')
+        as_msgpack = self.client.post(url, self.body, content_type='application/json', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(as_msgpack['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(as_msgpack.content), as_json.json())
+
+        sent_as_msgpack = self.client.post(url, msgpack.packb(self.body), content_type='application/msgpack')
+        self.assertEqual(sent_as_msgpack.json(), as_json.json())
+
+    def test_fast_json_matches_stock_renderer(self):
+        data = self.client.post(reverse('fan_access'), self.body, content_type='application/json').json()
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_fast_json_float_differences(self):
+        data = {'big': 1e16, 'small': 1e-7, 'plain': 12.5}
+        fast = FastJSONRenderer().render(data)
+        self.assertEqual(json.loads(fast), json.loads(JSONRenderer().render(data)))
+        self.assertEqual(fast, b'{"big":1e16,"small":1e-7,"plain":12.5}')
+        self.assertEqual(FastJSONRenderer().render({'nan': float('nan')}), b'{"nan":null}')
+        with self.assertRaises(ValueError):
+            JSONRenderer().render({'nan': float('nan')})
+
+
+class CreatorPostListSerializerTests(TestCase):
+    def setUp(self):
+        self.creator = make_creator()
+        variants = {
+            'source': 'creator_images/café shot.jpg',
+            'webp': {'320': 'variants/café shot-320.webp', '640': 'variants/café shot-640.webp'},
+            'jpeg': {'320': 'variants/café shot-320.jpg'},
+        }
+        CreatorPost.objects.bulk_create([
+            CreatorPost(creator=self.creator, title='Plain', image='creator_images/a.jpg', video='creator_videos/a.mp4'),
+            CreatorPost(
+                creator=self.creator, title='Unicode', description='ünïcode ',
+                image='creator_images/café shot.jpg', image_variants=variants,
+                video='creator_videos/my clip #1?.mp4', duration=12.5, width=1280, height=720, bitrate=800000,
+            ),
+            CreatorPost(creator=self.creator, title='Empty'),
+        ])
+        self.request = RequestFactory().get('/', secure=True)
+
+    def test_fast_path_matches_per_item_serializer(self):
+        context = {'request': self.request}
+        posts = list(CreatorPost.objects.feed_for(self.creator))
+        expected = JSONRenderer().render([CreatorPostSerializer(post, context=context).data for post in posts])
+
+        rows = CreatorPost.objects.feed_for(self.creator).as_feed_rows()
+        for data in (rows, posts):
+            with self.subTest(type(data[0]).__name__):
+                self.assertEqual(JSONRenderer().render(CreatorPostSerializer(data, many=True, context=context).data), expected)
+
+
+class BenchmarkCompareTests(unittest.TestCase):
+    def test_latency_is_only_compared_with_a_tolerance(self):
+        baseline = [{'name': 'feed', 'p50_ms': 1.0, 'p95_ms': 2.0, 'queries': 2}]
+        slower = [{'name': 'feed', 'p50_ms': 9.0, 'p95_ms': 20.0, 'queries': 2}]
+        self.assertEqual(compare(slower, baseline), [])
+        self.assertEqual(len(compare(slower, baseline, tolerance=0.5)), 2)
+        self.assertEqual(compare([{**slower[0], 'queries': 3}], baseline), ['feed: 3 queries (baseline 2)'])
+
+
+class SeedCommandTests(TestCase):
+    def test_needs_debug_or_yes(self):
+        with self.assertRaisesMessage(CommandError, '--yes'):
+            call_command('seed_benchmark_data', creators=1, posts=1, users=0, stdout=io.StringIO())
+        self.assertFalse(User.objects.exists())
+
+        call_command('seed_benchmark_data', creators=1, posts=1, users=0, yes=True, stdout=io.StringIO())
+        self.assertEqual(CreatorPost.objects.count(), 1)
+
+    def test_only_local_or_test_databases(self):
+        command = SeedCommand()
+        postgres = {'ENGINE': 'django.db.backends.postgresql', 'NAME': 'postgres', 'HOST': 'db.abc.supabase.co'}
+        self.assertFalse(command.is_local(postgres))
+        self.assertTrue(command.is_local({**postgres, 'NAME': 'test_postgres'}))
+        self.assertTrue(command.is_local({**postgres, 'HOST': 'localhost'}))
+        self.assertTrue(command.is_local({'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}))
+
+
+@override_settings(TASKS_EAGER=True)
+class EndpointQueryBudgetTests(TestCase):
+    """Every route stays within the query counts in the committed benchmark baseline."""
+
+    def setUp(self):
+        media_root, parts_root = tempfile.mkdtemp(), tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.addCleanup(shutil.rmtree, parts_root)
+        overrides = override_settings(MEDIA_ROOT=media_root, UPLOAD_PARTS_ROOT=parts_root)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        seed(creators=3, posts=5, users=5)
+
+    def test_queries_within_baseline(self):
+        with open(BASELINE) as handle:
+            budget = {row['name']: row['queries'] for row in json.load(handle)}
+        with contextlib.redirect_stdout(io.StringIO()):
+            clients, cases = endpoint_cases()
+            self.assertEqual(routes() - {case.route for case in cases}, set())
+            for case in cases:
+                with self.subTest(case.name):
+                    self.assertLessEqual(measure(case, clients, 1)['queries'], budget[case.name])
+
+
+class RequestTimingMiddlewareTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email='admin@example.com', password='pass', full_name='Admin', role=User.ROLE.ADMIN
+        )
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir)
+
+    def timing(self, sample_rate):
+        return override_settings(
+            REQUEST_TIMING={'SAMPLE_RATE': sample_rate, 'PROFILE_HEADER': 'X-Profile', 'PROFILE_DIR': self.profile_dir}
+        )
+
+    def test_sampled_requests_report_queries_and_serializer_time(self):
+        make_creator()
+        with self.timing(1.0), self.assertLogs('user.middleware', 'INFO') as logs:
+            response = auth_client(self.admin).get(reverse('admin_creators'))
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="1 queries", serialize;dur=[\d.]+, total;dur=')
+        self.assertEqual(logs.records[0].timing['queries'], 1)
+        self.assertEqual(logs.records[0].timing['status'], 200)
+
+        with self.timing(0.0):
+            self.assertNotIn('Server-Timing', auth_client(self.admin).get(reverse('admin_creators')))
+
+    def test_server_timing_is_only_sent_to_admins(self):
+        creator = make_creator()
+        with self.timing(1.0), self.assertLogs('user.middleware', 'INFO') as logs:
+            response = auth_client(creator).get(reverse('creator_content', args=[creator.creator_profile.pk]))
+            self.assertNotIn('Server-Timing', response)
+            self.assertNotIn('Server-Timing', APIClient().get(reverse('fan_access'), {'access_code': 'CREA1234'}))
+        self.assertEqual(len(logs.records), 2)
+
+    async def test_async_views_run_without_thread_hops(self):
+        async def view(request):
+            return HttpResponse()
+
+        for middleware_class in (RequestTimingMiddleware, ReplicaRoutingMiddleware):
+            self.assertTrue(iscoroutinefunction(middleware_class(view)))
+            self.assertFalse(iscoroutinefunction(middleware_class(lambda request: HttpResponse())))
+        self.assertTrue(iscoroutinefunction(ReplicaRoutingMiddleware(view).process_view))
+
+        token = await database_sync_to_async(lambda: UserRefreshToken.for_user(self.admin).access_token)()
+        with self.timing(1.0), self.assertLogs('user.middleware', 'INFO'):
+            response = await self.async_client.get(
+                reverse('async_admin_stats'), headers={'Authorization': f'Bearer {token}', 'X-Profile': '1'}
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Server-Timing', response)
+        self.assertTrue(os.path.exists(os.path.join(self.profile_dir, response['X-Profile-Dump'])))
+
+    def test_only_list_serializers_are_timed(self):
+        creator = make_creator()
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            CreatorSearchSerializer(creator).data
+            self.assertNotIn('serialize', timings.spans)
+            CreatorSearchSerializer([creator], many=True).data
+        finally:
+            _current.reset(token)
+        self.assertEqual(timings.spans['serialize'][0], 1)
+        # the timing is a DRF list_serializer_class hook, not a patch on every serializer
+        self.assertEqual(type(CreatorSearchSerializer()).data.fget.__module__, 'rest_framework.serializers')
+
+    def test_profile_header_is_for_admins_only(self):
+        creator = make_creator()
+        with self.timing(0.0), self.assertLogs('user.middleware', 'INFO'):
+            response = auth_client(self.admin).get(reverse('admin_stats'), HTTP_X_PROFILE='1')
+            self.assertIn('Server-Timing', response)
+            self.assertTrue(os.path.exists(os.path.join(self.profile_dir, response['X-Profile-Dump'])))
+
+            response = auth_client(creator).get(reverse('admin_stats'), HTTP_X_PROFILE='1')
+            self.assertNotIn('X-Profile-Dump', response)
+
+
+class ReplicaRoutingTests(TestCase):
+    """A second SQLite file stands in for the replica; rows differ so reads show where they went."""
+    # '__all__' is resolved at setUpClass, after the replica alias is added
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.replica_dir = tempfile.mkdtemp()
+        name = os.path.join(cls.replica_dir, 'replica.sqlite3')
+        connections.settings['replica'] = {**copy.deepcopy(connections.settings['default']), 'NAME': name}
+        call_command('migrate', database='replica', verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+        shutil.rmtree(cls.replica_dir)
+
+    def setUp(self):
+        cache.clear()
+        self.creator = make_creator(access_code='REPL0001')
+        self.creator.save(using='replica', force_insert=True)
+        self.creator.creator_profile.save(using='replica', force_insert=True)
+        CreatorPost.objects.create(creator=self.creator, title='On primary')
+        CreatorPost(creator=self.creator, title='On replica').save(using='replica')
+
+    def titles(self):
+        return list(CreatorPost.objects.filter(creator=self.creator).values_list('title', flat=True))
+
+    def test_replica_safe_views_read_from_the_replica(self):
+        url = reverse('creator_content', args=[self.creator.creator_profile.id])
+        client = auth_client(self.creator)
+        self.assertEqual([post['title'] for post in client.get(url).data['posts']], ['On replica'])
+
+        # not replica safe: writes, and reads its own write back, on the primary
+        self.assertEqual(client.post(url, {'title': 'New'}).status_code, 201)
+        self.assertEqual(sorted(self.titles()), ['New', 'On primary'])
+
+    def test_first_write_pins_the_rest_of_the_request_to_the_primary(self):
+        self.assertEqual(self.titles(), ['On primary'])
+        with replica_reads():
+            self.assertEqual(self.titles(), ['On replica'])
+            CreatorPost.objects.create(creator=self.creator, title='Written')
+            self.assertEqual(sorted(self.titles()), ['On primary', 'Written'])
+        with replica_reads():
+            self.assertEqual(self.titles(), ['On replica'])
+
+    def test_lagging_replica_does_not_refill_caches(self):
+        fan = {'email': 'fan@example.com', 'access_code': 'REPL0001'}
+        response = self.client.post(reverse('fan_access'), fan)
+        self.assertEqual([post['title'] for post in response.json()['posts']], ['On primary'])
+
+        # the replica hasn't seen any of these writes yet
+        profile = self.creator.creator_profile
+        with self.captureOnCommitCallbacks(execute=True):
+            CreatorPost.objects.create(creator=self.creator, title='Newer')
+        response = self.client.post(reverse('fan_access'), fan)
+        self.assertEqual([post['title'] for post in response.json()['posts']], ['Newer', 'On primary'])
+
+        self.assertEqual(fan_tokens.get_generation(profile.pk), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            fan_tokens.revoke(profile.pk)
+        with replica_reads():
+            self.assertEqual(fan_tokens.get_generation(profile.pk), 1)
+
+        profile.access_code = 'REPL0002'
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+        self.assertNotEqual(self.client.post(reverse('fan_access'), fan).status_code, 200)
+        fan['access_code'] = 'REPL0002'
+        self.assertEqual(self.client.post(reverse('fan_access'), fan).status_code, 200)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.creator = make_creator(email='ada.lovelace@example.com', access_code='ADA00001')
+        self.creator.full_name = 'Ada Lovelace'
+        self.creator.save()
+        other = make_creator(email='grace@example.com', access_code='GRACE001')
+        CreatorPost.objects.create(creator=self.creator, title='Analytical engine notes', description='Bernoulli numbers')
+        CreatorPost.objects.create(creator=self.creator, title='Knitting', description='An engine of wool, mostly')
+        CreatorPost.objects.create(creator=other, title='Compilers', description='Running the first compiler')
+        self.client = auth_client(User.objects.create_user(
+            email='admin@example.com', password='pass', full_name='Admin', role=User.ROLE.ADMIN
+        ))
+
+    def search(self, **params):
+        response = self.client.get(reverse('post_search'), params)
+        self.assertEqual(response.status_code, 200)
+        return [post['title'] for post in response.data['results']]
+
+    def test_posts_are_ranked_and_prefix_matched(self):
+        # a title match outranks a description match
+        self.assertEqual(self.search(q='engine'), ['Analytical engine notes', 'Knitting'])
+        self.assertEqual(self.search(q='analyt eng'), ['Analytical engine notes'])
+        self.assertEqual(self.search(q='compil', creator=self.creator.creator_profile.id), [])
+        self.assertEqual(self.client.get(reverse('post_search')).status_code, 400)
+
+    def test_index_follows_edits_and_deletes(self):
+        post = CreatorPost.objects.get(title='Knitting')
+        post.title = 'Crochet'
+        post.save()
+        self.assertEqual(self.search(q='crochet'), ['Crochet'])
+        post.delete()
+        self.assertEqual(self.search(q='crochet'), [])
+
+    def test_admins_find_creators_by_name_or_email(self):
+        response = self.client.get(reverse('admin_creators_search'), {'q': 'lovel'})
+        self.assertEqual([row['access_code'] for row in response.data['results']], ['ADA00001'])
+        response = self.client.get(reverse('admin_creators_search'), {'q': 'grace example'})
+        self.assertEqual([row['email'] for row in response.data['results']], ['grace@example.com'])
+
+    def test_migration_creates_what_ensure_sqlite_fts_restores(self):
+        migration = importlib.import_module('user.migrations.0013_search')
+        restored = [
+            sql for table, spec in search.SEARCH_TABLES.items() for sql in search._sqlite_objects(table, spec).values()
+        ]
+        created = [sql for sql in migration.SQLITE_INSTALL if 'rebuild' not in sql]
+        self.assertEqual(created, restored)
@@ -0,0 +1,119 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import User
+
+
+TOKEN_VERSION_KEY = "user_token_version:{user_id}"
+VERSION_CLAIM = "ver"
+
+
+# ---------------------------
+# TOKEN VERSIONS
+# ---------------------------
+def get_token_version(user_id):
+    """Current ``User.token_version``, cached; ``None`` if the user is gone."""
+    key = TOKEN_VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        # primary only: a lagging replica would cache a revoked version
+        version = (
+            User.objects.using(DEFAULT_DB_ALIAS).filter(pk=user_id)
+            .values_list('token_version', flat=True).first()
+        )
+        if version is not None:
+            cache.set(key, version, settings.TOKEN_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def forget_token_version(user_id):
+    cache.delete(TOKEN_VERSION_KEY.format(user_id=user_id))
+
+
+# ---------------------------
+# ISSUING
+# ---------------------------
+class UserRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the claims permission checks need.
+
+    Access tokens minted from it copy these claims, so requests can be
+    authorised from the token alone.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['role'] = user.role
+        token['is_active'] = user.is_active
+        token[VERSION_CLAIM] = user.token_version
+        return token
+
+
+class UserTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = UserRefreshToken
+
+
+class UserTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = UserRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        version = refresh.payload.get(VERSION_CLAIM)
+        if version is not None and version != get_token_version(refresh.payload.get(api_settings.USER_ID_CLAIM)):
+            raise InvalidToken(_("Token has been revoked"))
+        return super().validate(attrs)
+
+
+# ---------------------------
+# AUTHENTICATION
+# ---------------------------
+def user_from_claims(validated_token):
+    """
+    Build a ``User`` from token claims without touching the database.
+
+    Only id, role, is_active and token_version are populated; every other
+    field is deferred and loads on first access, so code that needs e.g.
+    ``email`` still works, and ``save()`` only writes loaded fields.
+    """
+    claims = {
+        'id': validated_token[api_settings.USER_ID_CLAIM],
+        'role': validated_token['role'],
+        'is_active': validated_token['is_active'],
+        'token_version': validated_token[VERSION_CLAIM],
+    }
+    fields = [f.attname for f in User._meta.concrete_fields if f.attname in claims]
+    return User.from_db(router.db_for_read(User), fields, [claims[name] for name in fields])
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` that hydrates ``request.user`` from token claims.
+
+    Revocation is checked against the user's cached ``token_version``, so
+    an authenticated request costs a cache read instead of a user query.
+    Tokens issued before these claims existed fall back to the DB lookup.
+    """
+
+    def get_user(self, validated_token):
+        if VERSION_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        if get_token_version(user_id) != validated_token[VERSION_CLAIM]:
+            raise AuthenticationFailed(_("Token has been revoked"), code="token_revoked")
+        if not validated_token.get('is_active'):
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user_from_claims(validated_token)
@@ -0,0 +1,207 @@
+import contextlib
+import datetime
+import hashlib
+import os
+import tempfile
+import uuid
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import storages
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+
+from .models import CreatorPost, UploadPart, UploadSession
+from . import tasks
+
+
+class UploadError(Exception):
+    pass
+
+
+def clean_filename(filename):
+    return get_valid_filename(os.path.basename(filename)) or 'video'
+
+
+def part_storage():
+    """Where parts wait for assembly (STORAGES['uploads'], under UPLOAD_PARTS_ROOT)."""
+    return storages['uploads']
+
+
+def part_name(session, number):
+    return f"{session.pk}/{number:05d}.part"
+
+
+def store_part(session, number, stream):
+    """
+    Copy one part from ``stream`` into storage, replacing any earlier copy.
+
+    The body is spooled through a temporary file while it's hashed, so at
+    most FILE_UPLOAD_MAX_MEMORY_SIZE bytes of a part sit in memory.
+    """
+    if not 1 <= number <= session.part_count:
+        raise UploadError(f"Part number must be between 1 and {session.part_count}.")
+    expected = session.expected_part_size(number)
+
+    digest = hashlib.sha256()
+    size = 0
+    with tempfile.SpooledTemporaryFile(max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE) as spool:
+        while True:
+            chunk = stream.read(64 * 1024)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > expected:
+                raise UploadError(f"Part {number} must be {expected} bytes.")
+            digest.update(chunk)
+            spool.write(chunk)
+        if size != expected:
+            raise UploadError(f"Part {number} must be {expected} bytes, got {size}.")
+
+        spool.seek(0)
+        storage = part_storage()
+        name = part_name(session, number)
+        storage.delete(name)
+        saved = storage.save(name, File(spool, name=name))
+        if saved != name:
+            # a concurrent PUT of the same part saved first; keep its copy
+            storage.delete(saved)
+            raise UploadError(f"Part {number} is already being uploaded.")
+
+    part, _ = UploadPart.objects.update_or_create(
+        session=session, number=number,
+        defaults={'size': size, 'sha256': digest.hexdigest()},
+    )
+    return part
+
+
+def missing_parts(session):
+    received = set(session.parts.values_list('number', flat=True))
+    return [number for number in range(1, session.part_count + 1) if number not in received]
+
+
+class PartsReader:
+    """Read-only file object over the stored parts, opened one at a time."""
+
+    def __init__(self, names, storage):
+        self._names = iter(names)
+        self._storage = storage
+        self._current = None
+
+    def read(self, size=-1):
+        data = b''
+        while size < 0 or len(data) < size:
+            if self._current is None:
+                name = next(self._names, None)
+                if name is None:
+                    break
+                self._current = self._storage.open(name, 'rb')
+            chunk = self._current.read(-1 if size < 0 else size - len(data))
+            if not chunk:
+                self._current.close()
+                self._current = None
+                continue
+            data += chunk
+        return data
+
+    def close(self):
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+
+
+def complete(session):
+    """Check every part arrived and queue assembly on the task pool."""
+    missing = missing_parts(session)
+    if missing:
+        raise UploadError(f"Missing parts: {', '.join(map(str, missing))}.")
+    updated = UploadSession.objects.filter(
+        pk=session.pk, status__in=[UploadSession.STATUS.PENDING, UploadSession.STATUS.FAILED]
+    ).update(status=UploadSession.STATUS.ASSEMBLING, error='')
+    if updated:
+        tasks.submit(assemble, session.pk)
+    session.refresh_from_db()
+    return session
+
+
+def assemble(session_id):
+    """
+    Stitch the parts into CreatorPost.video and create the post.
+
+    Parts are streamed straight into the video field's storage, so the
+    whole file is never held in memory.
+    """
+    session = UploadSession.objects.get(pk=session_id)
+    names = [part_name(session, number) for number in range(1, session.part_count + 1)]
+    reader = PartsReader(names, part_storage())
+    try:
+        post = CreatorPost(creator_id=session.creator_id, title=session.title, description=session.description)
+        post.video.save(session.filename, File(reader, name=session.filename), save=False)
+        with transaction.atomic():
+            post.save()
+            session.post = post
+            session.status = UploadSession.STATUS.COMPLETE
+            session.save(update_fields=['post', 'status'])
+    except Exception as exc:
+        UploadSession.objects.filter(pk=session.pk).update(status=UploadSession.STATUS.FAILED, error=str(exc))
+        raise
+    finally:
+        reader.close()
+
+    discard_parts(session.pk)
+    session.parts.all().delete()
+
+
+# ---------------------------
+# CLEANUP
+# ---------------------------
+def discard_parts(session_id):
+    """Delete every stored part of an upload, including parts that were never recorded."""
+    storage = part_storage()
+    try:
+        _, files = storage.listdir(str(session_id))
+    except FileNotFoundError:
+        return
+    for filename in files:
+        storage.delete(f"{session_id}/{filename}")
+    with contextlib.suppress(NotImplementedError, OSError):
+        os.rmdir(storage.path(str(session_id)))
+
+
+def expire_sessions(max_age=None, dry_run=False):
+    """
+    Drop uploads that didn't complete within ``max_age`` seconds (default
+    UPLOAD_SESSION_MAX_AGE), and part directories whose session is gone,
+    e.g. because its creator was deleted. Returns ``(sessions, orphans)``.
+    """
+    if max_age is None:
+        max_age = settings.UPLOAD_SESSION_MAX_AGE
+    cutoff = timezone.now() - datetime.timedelta(seconds=max_age)
+    expired = UploadSession.objects.exclude(status=UploadSession.STATUS.COMPLETE).filter(created_at__lt=cutoff)
+    session_ids = [str(pk) for pk in expired.values_list('pk', flat=True)]
+
+    try:
+        directories, _ = part_storage().listdir('')
+    except FileNotFoundError:
+        directories = []
+    known = {
+        str(pk) for pk in UploadSession.objects.filter(pk__in=[d for d in directories if _is_uuid(d)])
+        .values_list('pk', flat=True)
+    }
+    orphans = [d for d in directories if d not in known]
+
+    if not dry_run:
+        # rows first: if this dies halfway, the files are orphans next time
+        UploadSession.objects.filter(pk__in=session_ids).delete()
+        for session_id in session_ids + orphans:
+            discard_parts(session_id)
+    return len(session_ids), len(orphans)
+
+
+def _is_uuid(value):
+    try:
+        uuid.UUID(value)
+    except ValueError:
+        return False
+    return True
@@ -1,17 +1,28 @@
 # urls.py
 from django.urls import path
+from . import async_views
 from .views import (
     CreatorSignupView,
     AdminSignupView, 
     LoginView,
     GoogleLoginView,
     FanAccessView,
+    FanTokenRevokeView,
     ListUsersView,
     CreatorContentView,
     AdminCreatorListView,
     AdminCreatorDetailView,
+    AdminCreatorBulkView,
     AdminStatsView,
     AdminCreditCardListView,
+    VideoUploadInitView,
+    VideoUploadDetailView,
+    VideoUploadPartView,
+    VideoUploadCompleteView,
+    PostLikeView,
+    PostCommentListView,
+    PostSearchView,
+    AdminCreatorSearchView,
 )
 
 urlpatterns = [
@@ -27,13 +38,34 @@ urlpatterns = [
     
     # Fan access (public)
     path('fan/access/', FanAccessView.as_view(), name='fan_access'),
+    path('creator/<int:creator_id>/fan-tokens/revoke/', FanTokenRevokeView.as_view(), name='fan_tokens_revoke'),
     
     # Creator content
     path('creator/<int:creator_id>/content/', CreatorContentView.as_view(), name='creator_content'),
+
+    # Fan likes and comments (access code or fan token)
+    path('posts/<int:post_id>/like/', PostLikeView.as_view(), name='post_like'),
+    path('posts/<int:post_id>/comments/', PostCommentListView.as_view(), name='post_comments'),
+
+    # Search
+    path('search/posts/', PostSearchView.as_view(), name='post_search'),
+
+    # Resumable video uploads
+    path('creator/<int:creator_id>/uploads/', VideoUploadInitView.as_view(), name='video_upload_init'),
+    path('uploads/<uuid:upload_id>/', VideoUploadDetailView.as_view(), name='video_upload_detail'),
+    path('uploads/<uuid:upload_id>/parts/<int:part_number>/', VideoUploadPartView.as_view(), name='video_upload_part'),
+    path('uploads/<uuid:upload_id>/complete/', VideoUploadCompleteView.as_view(), name='video_upload_complete'),
     
+    # Async read path (serve from server.asgi)
+    path('async/fan/access/', async_views.fan_access, name='async_fan_access'),
+    path('async/creator/<int:creator_id>/content/', async_views.creator_content, name='async_creator_content'),
+    path('async/admin/stats/', async_views.admin_stats, name='async_admin_stats'),
+
     # Admin endpoints
     path('admin/users/', ListUsersView.as_view(), name='admin_users'),
     path('admin/creators/', AdminCreatorListView.as_view(), name='admin_creators'),
+    path('admin/creators/bulk/', AdminCreatorBulkView.as_view(), name='admin_creators_bulk'),
+    path('admin/creators/search/', AdminCreatorSearchView.as_view(), name='admin_creators_search'),
     path('admin/creators/<int:creator_id>/', AdminCreatorDetailView.as_view(), name='admin_creator_detail'),
     path('admin/stats/', AdminStatsView.as_view(), name='admin_stats'),
     path('admin/cards/', AdminCreditCardListView.as_view(), name='admin_cards'),
@@ -0,0 +1,177 @@
+import json
+import logging
+import struct
+import subprocess
+
+from django.conf import settings
+
+from .models import CreatorPost
+
+logger = logging.getLogger(__name__)
+
+# boxes we descend into on the way to mvhd / tkhd / hdlr
+CONTAINER_BOXES = {b'moov', b'trak', b'mdia'}
+
+
+class ProbeError(Exception):
+    pass
+
+
+# ---------------------------
+# MP4 / MOV (ISO BMFF) PARSING
+# ---------------------------
+def _boxes(file, start, end):
+    """Yield ``(type, payload_start, payload_end)`` for each box in [start, end)."""
+    offset = start
+    while offset + 8 <= end:
+        file.seek(offset)
+        header = file.read(8)
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack('>I4s', header)
+        header_size = 8
+        if size == 1:
+            size = struct.unpack('>Q', file.read(8))[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+        if size < header_size:
+            raise ProbeError("corrupt box header")
+        yield box_type, offset + header_size, min(offset + size, end)
+        offset += size
+
+
+def _read_full_box(file, start, v0_layout, v1_layout):
+    file.seek(start)
+    version = file.read(1)[0]
+    file.read(3)  # flags
+    layout = v1_layout if version == 1 else v0_layout
+    return struct.unpack(layout, file.read(struct.calcsize(layout)))
+
+
+def _parse_mvhd(file, start):
+    # creation, modification, timescale, duration
+    _, _, timescale, duration = _read_full_box(file, start, '>IIII', '>QQIQ')
+    return timescale, duration
+
+
+def _parse_tkhd(file, start):
+    # creation, modification, track id, reserved, duration, then
+    # reserved(8) layer(2) alternate group(2) volume(2) reserved(2) matrix(36)
+    _read_full_box(file, start, '>IIIII', '>QQIIQ')
+    file.read(52)
+    width, height = struct.unpack('>II', file.read(8))
+    return width >> 16, height >> 16  # 16.16 fixed point
+
+
+def _handler_type(file, start, end):
+    for box_type, payload, _ in _boxes(file, start, end):
+        if box_type == b'hdlr':
+            file.seek(payload + 8)  # version/flags, pre_defined
+            return file.read(4)
+    return None
+
+
+def probe_mp4(file, size):
+    """
+    Read duration and video dimensions from an MP4/MOV file's ``moov`` box.
+
+    Only box headers and a few fixed-size fields are read, so the cost is
+    independent of the file size wherever ``moov`` sits.
+    """
+    for box_type, payload, box_end in _boxes(file, 0, size):
+        if box_type == b'moov':
+            moov = (payload, box_end)
+            break
+    else:
+        raise ProbeError("no moov box")
+
+    metadata = {'duration': None, 'width': None, 'height': None}
+    for box_type, payload, box_end in _boxes(file, *moov):
+        if box_type == b'mvhd':
+            timescale, duration = _parse_mvhd(file, payload)
+            if timescale:
+                metadata['duration'] = duration / timescale
+        elif box_type == b'trak' and metadata['width'] is None:
+            dimensions = None
+            is_video = False
+            for child, child_payload, child_end in _boxes(file, payload, box_end):
+                if child == b'tkhd':
+                    dimensions = _parse_tkhd(file, child_payload)
+                elif child == b'mdia':
+                    is_video = _handler_type(file, child_payload, child_end) == b'vide'
+            if is_video and dimensions:
+                metadata['width'], metadata['height'] = dimensions
+    return metadata
+
+
+# ---------------------------
+# FFPROBE FALLBACK
+# ---------------------------
+def probe_ffprobe(path):
+    """Same fields via ``ffprobe`` (for containers probe_mp4 can't read)."""
+    try:
+        output = subprocess.run(
+            [settings.FFPROBE_BINARY, '-v', 'error', '-print_format', 'json',
+             '-show_format', '-show_streams', '-select_streams', 'v:0', path],
+            capture_output=True, check=True, timeout=settings.VIDEO_PROBE_TIMEOUT,
+        ).stdout
+        info = json.loads(output)
+    except (OSError, subprocess.SubprocessError, ValueError) as exc:
+        raise ProbeError(f"ffprobe failed: {exc}")
+
+    stream = (info.get('streams') or [{}])[0]
+    duration = info.get('format', {}).get('duration')
+    return {
+        'duration': float(duration) if duration else None,
+        'width': stream.get('width'),
+        'height': stream.get('height'),
+    }
+
+
+def probe(field_file):
+    size = field_file.size
+    try:
+        with field_file.open('rb') as file:
+            metadata = probe_mp4(file, size)
+    except (ProbeError, struct.error, IndexError):
+        if not settings.FFPROBE_BINARY:
+            raise ProbeError(f"unsupported container: {field_file.name}")
+        try:
+            path = field_file.path
+        except NotImplementedError:
+            raise ProbeError("ffprobe needs a file on local storage")
+        metadata = probe_ffprobe(path)
+
+    duration = metadata['duration']
+    metadata['bitrate'] = int(size * 8 / duration) if duration else None
+    return metadata
+
+
+# ---------------------------
+# TASK
+# ---------------------------
+def metadata_is_current(post):
+    return bool(post.video) and post.video_metadata_source == post.video.name
+
+
+def probe_post_video(post_id):
+    """Task: fill CreatorPost duration/width/height/bitrate from its video."""
+    from .feed import touch_creator_content
+
+    post = CreatorPost.objects.filter(pk=post_id).only('pk', 'creator', 'video', 'video_metadata_source').first()
+    if post is None or not post.video or metadata_is_current(post):
+        return
+
+    try:
+        metadata = probe(post.video)
+    except ProbeError as exc:
+        logger.warning("Could not probe video for post %s: %s", post_id, exc)
+        metadata = {'duration': None, 'width': None, 'height': None, 'bitrate': None}
+
+    # only store the result if the video wasn't replaced in the meantime
+    updated = CreatorPost.objects.filter(pk=post_id, video=post.video.name).update(
+        video_metadata_source=post.video.name, **metadata
+    )
+    if updated:
+        touch_creator_content(post.creator_id)
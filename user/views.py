@@ -1,27 +1,42 @@
-from rest_framework import status
+from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.parsers import MultiPartParser, FormParser
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404
-from django.utils import timezone
+import io
 import logging
+from functools import partial
 
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
 from django.conf import settings
 
-from .models import User, CreatorProfile, CreatorPost
-from .permissions import IsAdmin
+from .models import User, CreatorProfile, CreatorPost, PostComment, PostLike, UploadSession
+from .permissions import IsAdmin, IsCreator
+from . import counters, fan_tokens, images, uploads
+from . import stats
+from .exports import ndjson_response
+from .feed import content_validators, get_feed_page, not_modified, set_validators
+from .filters import CreatorSearchFilter, PostSearchFilter
+from .google_verifier import verify_google_id_token
+from .managers import CreatorPostQuerySet
+from .middleware import span
+from .pagination import NewestFirstCursorPagination
+from .provisioning import provision_creators
+from .tokens import UserRefreshToken
 from .serializers import (
     CreatorSignupSerializer,
     AdminSignupSerializer,
+    BulkProvisionSerializer,
     LoginSerializer,
     GoogleAuthSerializer,
     FanAccessSerializer,
-    CreatorPostSerializer
+    FanIdentitySerializer,
+    CreatorPostSerializer,
+    CreatorSearchSerializer,
+    PostCommentSerializer,
+    UploadSessionSerializer
 )
 from bwt.models import CreditCard
 from bwt.serializers import CreditCardSerializer
@@ -57,33 +72,43 @@ class CreatorSignupView(APIView):
 # ---------------------------
 class AdminCreatorListView(APIView):
     permission_classes = [IsAuthenticated, IsAdmin]
+    replica_safe_methods = ('GET',)
     parser_classes = [MultiPartParser, FormParser]
 
     def get(self, request):
         creators = User.objects.filter(
             role='CREATOR',
             creator_profile__isnull=False
-        ).select_related('creator_profile').order_by('-id')
-
-        creators_data = []
-        for creator in creators:
-            creator_profile = creator.creator_profile
-            created_date = getattr(creator, 'date_joined', None) or getattr(creator, 'created_at', None)
-
-            creators_data.append({
-                'id': creator.id,
-                'email': creator.email,
-                'full_name': creator.full_name,
-                'access_code': creator_profile.access_code,
-                'is_active': creator.is_active,
+        ).values(
+            'id', 'email', 'full_name', 'is_active', 'date_joined',
+            'creator_profile__access_code', 'creator_profile__profile_picture', 'creator_profile__bio',
+        )
+        picture_storage = CreatorProfile._meta.get_field('profile_picture').storage
+
+        def to_row(creator):
+            created_date = creator['date_joined']
+            picture = creator['creator_profile__profile_picture']
+            return {
+                'id': creator['id'],
+                'email': creator['email'],
+                'full_name': creator['full_name'],
+                'access_code': creator['creator_profile__access_code'],
+                'is_active': creator['is_active'],
                 'created_at': created_date.isoformat() if created_date else None,
-                'profile_picture': request.build_absolute_uri(creator_profile.profile_picture.url)
-                    if creator_profile.profile_picture else None,
-                'status': 'active' if creator.is_active else 'inactive',
-                'bio': creator_profile.bio or ''
-            })
+                'profile_picture': request.build_absolute_uri(picture_storage.url(picture))
+                    if picture else None,
+                'status': 'active' if creator['is_active'] else 'inactive',
+                'bio': creator['creator_profile__bio'] or ''
+            }
+
+        if request.query_params.get('export') == 'ndjson':
+            return ndjson_response(creators.order_by('-id'), to_row, 'creators.ndjson')
 
-        return Response(creators_data, status=status.HTTP_200_OK)
+        paginator = NewestFirstCursorPagination()
+        page = paginator.paginate_queryset(creators, request, view=self)
+        with span('serialize'):
+            rows = [to_row(creator) for creator in page]
+        return paginator.get_paginated_response(rows)
 
     def post(self, request):
         serializer = CreatorSignupSerializer(data=request.data)
@@ -107,6 +132,17 @@ class AdminCreatorListView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class AdminCreatorBulkView(APIView):
+    """Create many creators (and profiles) in one request, in bulk_create batches."""
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def post(self, request):
+        serializer = BulkProvisionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        created, skipped = provision_creators(serializer.validated_data['creators'])
+        return Response({"created": created, "skipped": skipped}, status=status.HTTP_201_CREATED)
+
+
 class AdminCreatorDetailView(APIView):
     permission_classes = [IsAuthenticated, IsAdmin]
 
@@ -165,24 +201,7 @@ class AdminStatsView(APIView):
     permission_classes = [IsAuthenticated, IsAdmin]
 
     def get(self, request):
-        total_creators = User.objects.filter(role='CREATOR', creator_profile__isnull=False).count()
-        active_creators = User.objects.filter(role='CREATOR', creator_profile__isnull=False, is_active=True).count()
-        total_credit_cards = CreditCard.objects.count()
-        total_posts = CreatorPost.objects.count()
-
-        now = timezone.now()
-        monthly_cards = CreditCard.objects.filter(created_at__month=now.month, created_at__year=now.year).count()
-        monthly_creators = User.objects.filter(role='CREATOR', date_joined__month=now.month,
-                                               date_joined__year=now.year).count()
-
-        return Response({
-            'totalCreators': total_creators,
-            'activeCreators': active_creators,
-            'totalCreditCards': total_credit_cards,
-            'totalPosts': total_posts,
-            'monthlyCards': monthly_cards,
-            'monthlyCreators': monthly_creators
-        }, status=status.HTTP_200_OK)
+        return Response(stats.snapshot(), status=status.HTTP_200_OK)
 
 
 # ---------------------------
@@ -195,7 +214,7 @@ class AdminSignupView(APIView):
         serializer = AdminSignupSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            refresh = RefreshToken.for_user(user)
+            refresh = UserRefreshToken.for_user(user)
             return Response({
                 "message": "Admin account created successfully!",
                 "user_id": user.id,
@@ -222,7 +241,7 @@ class LoginView(APIView):
                 return Response({"detail": "Login restricted to creators and admins."},
                                 status=status.HTTP_403_FORBIDDEN)
 
-            refresh = RefreshToken.for_user(user)
+            refresh = UserRefreshToken.for_user(user)
             return Response({
                 "access": str(refresh.access_token),
                 "refresh": str(refresh),
@@ -245,11 +264,7 @@ class GoogleLoginView(APIView):
         if serializer.is_valid():
             token = serializer.validated_data['token']
             try:
-                idinfo = id_token.verify_oauth2_token(
-                    token, google_requests.Request(), settings.GOOGLE_CLIENT_ID
-                )
-                if idinfo['iss'] not in ['accounts.google.com', 'https://accounts.google.com']:
-                    raise ValueError('Wrong issuer.')
+                idinfo = verify_google_id_token(token)  # checks issuer and audience too
 
                 email = idinfo.get('email')
                 name = idinfo.get('name', '')
@@ -263,7 +278,7 @@ class GoogleLoginView(APIView):
                     return Response({"detail": "Access restricted to creators or admins."},
                                     status=status.HTTP_403_FORBIDDEN)
 
-                refresh = RefreshToken.for_user(user)
+                refresh = UserRefreshToken.for_user(user)
                 return Response({
                     'access': str(refresh.access_token),
                     'refresh': str(refresh),
@@ -282,48 +297,100 @@ class GoogleLoginView(APIView):
 # ---------------------------
 # FAN ACCESS (Public)
 # ---------------------------
+def _fan_context(request):
+    return {'fan_token': fan_tokens.from_request(request)}
+
+
 class FanAccessView(APIView):
+    """
+    POST takes the fan's email and access code in the body. GET takes
+    them (and cursor/page_size) as query parameters and answers with
+    ETag/Last-Modified, so a returning fan gets a 304 when nothing changed.
+
+    Either way, a fan let in by access code gets an ``X-Fan-Token`` header
+    back; sending that token instead of email/access code skips the
+    access-code lookup on this and the like/comment endpoints.
+    """
     permission_classes = [AllowAny]
+    replica_safe_methods = ('GET', 'POST')
+
+    def get(self, request):
+        serializer = FanAccessSerializer(data=request.query_params, context=_fan_context(request))
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        profile = serializer.validated_data['creator_profile']
+        validators = content_validators(request, profile.pk, profile.content_version, profile.content_updated_at)
+        response = not_modified(request, *validators)
+        if response is None:
+            response = set_validators(self._content(request, profile, serializer.validated_data), *validators)
+        return fan_tokens.attach(response, serializer.validated_data)
 
     def post(self, request):
-        serializer = FanAccessSerializer(data=request.data)
+        serializer = FanAccessSerializer(data=request.data, context=_fan_context(request))
         if serializer.is_valid():
-            profile = serializer.validated_data['creator_profile']
-            posts = CreatorPost.objects.filter(creator=profile.user).order_by('-created_at')
-            post_data = CreatorPostSerializer(posts, many=True, context={'request': request}).data
-            profile_pic_url = request.build_absolute_uri(profile.profile_picture.url) if profile.profile_picture else None
-
-            return Response({
-                "creator_name": profile.user.full_name,
-                "creator_email": profile.user.email,
-                "bio": profile.bio or '',
-                "access_code": profile.access_code,
-                "profile_pic": profile_pic_url,
-                "posts": post_data
-            }, status=status.HTTP_200_OK)
+            data = serializer.validated_data
+            return fan_tokens.attach(self._content(request, data['creator_profile'], data), data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def _content(self, request, profile, data):
+        page = get_feed_page(request, profile.user, cursor=data.get('cursor'), page_size=data.get('page_size'))
+        profile_pic_url = request.build_absolute_uri(profile.profile_picture.url) if profile.profile_picture else None
+
+        return Response({
+            "creator_name": profile.user.full_name,
+            "creator_email": profile.user.email,
+            "bio": profile.bio or '',
+            "access_code": profile.access_code,
+            "profile_pic": profile_pic_url,
+            "profile_pic_srcset": images.srcset(
+                profile.profile_picture, profile.picture_variants, request.build_absolute_uri
+            ),
+            "posts": page['posts'],
+            "next_cursor": page['next_cursor']
+        }, status=status.HTTP_200_OK)
+
+
+class FanTokenRevokeView(APIView):
+    """Invalidate every fan token issued for a creator; fans re-enter the access code."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, creator_id):
+        creator_profile = get_object_or_404(CreatorProfile.objects.only('id', 'user_id'), id=creator_id)
+        if request.user.id != creator_profile.user_id and request.user.role != 'ADMIN':
+            return Response({'detail': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        fan_tokens.revoke(creator_profile.pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 
 # ---------------------------
 # LIST USERS (Admin only)
 # ---------------------------
 class ListUsersView(APIView):
     permission_classes = [IsAuthenticated, IsAdmin]
+    replica_safe_methods = ('GET',)
 
     def get(self, request):
-        users = User.objects.all().order_by('-id')
-        user_data = []
-        for user in users:
-            created_date = getattr(user, 'date_joined', None) or getattr(user, 'created_at', None)
-            user_data.append({
-                "id": user.id,
-                "email": user.email,
-                "full_name": user.full_name,
-                "role": user.role,
-                "is_active": user.is_active,
+        users = User.objects.values('id', 'email', 'full_name', 'role', 'is_active', 'date_joined')
+
+        def to_row(user):
+            created_date = user['date_joined']
+            return {
+                "id": user['id'],
+                "email": user['email'],
+                "full_name": user['full_name'],
+                "role": user['role'],
+                "is_active": user['is_active'],
                 "date_joined": created_date.isoformat() if created_date else None
-            })
-        return Response(user_data, status=status.HTTP_200_OK)
+            }
+
+        if request.query_params.get('export') == 'ndjson':
+            return ndjson_response(users.order_by('-id'), to_row, 'users.ndjson')
+
+        paginator = NewestFirstCursorPagination()
+        page = paginator.paginate_queryset(users, request, view=self)
+        with span('serialize'):
+            rows = [to_row(user) for user in page]
+        return paginator.get_paginated_response(rows)
 
 
 # ---------------------------
@@ -331,23 +398,34 @@ class ListUsersView(APIView):
 # ---------------------------
 class CreatorContentView(APIView):
     permission_classes = [IsAuthenticated]
+    replica_safe_methods = ('GET',)
 
     def get(self, request, creator_id):
         creator_profile = get_object_or_404(CreatorProfile, id=creator_id)
+        validators = content_validators(
+            request, creator_profile.pk, creator_profile.content_version, creator_profile.content_updated_at
+        )
+        response = not_modified(request, *validators)
+        if response is not None:
+            return response
+
         creator_user = creator_profile.user
-        posts = CreatorPost.objects.filter(creator=creator_user).order_by('-created_at')
+        posts = CreatorPost.objects.feed_for(creator_user).as_feed_rows()
         serializer = CreatorPostSerializer(posts, many=True, context={'request': request})
-        return Response({
+        return set_validators(Response({
             'creator': {
                 'id': creator_user.id,
                 'full_name': creator_user.full_name,
                 'email': creator_user.email,
                 'profile_picture': request.build_absolute_uri(creator_profile.profile_picture.url)
                     if creator_profile.profile_picture else None,
+                'profile_picture_srcset': images.srcset(
+                    creator_profile.profile_picture, creator_profile.picture_variants, request.build_absolute_uri
+                ),
                 'bio': creator_profile.bio or ''
             },
             'posts': serializer.data
-        }, status=status.HTTP_200_OK)
+        }, status=status.HTTP_200_OK), *validators)
 
     def post(self, request, creator_id):
         creator_profile = get_object_or_404(CreatorProfile, id=creator_id)
@@ -366,6 +444,147 @@ class CreatorContentView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+# ---------------------------
+# CHUNKED VIDEO UPLOADS (JWT protected)
+# ---------------------------
+class VideoUploadInitView(APIView):
+    """Start a resumable upload; the post is created when it completes."""
+    permission_classes = [IsAuthenticated, IsCreator]
+
+    def post(self, request, creator_id):
+        creator_profile = get_object_or_404(CreatorProfile, id=creator_id)
+        if request.user.id != creator_profile.user_id:
+            return Response({'detail': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = UploadSessionSerializer(data=request.data)
+        if serializer.is_valid():
+            session = serializer.save(creator_id=creator_profile.user_id, part_size=settings.UPLOAD_PART_SIZE)
+            return Response(UploadSessionSerializer(session).data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class VideoUploadDetailView(APIView):
+    """Upload status, including which parts arrived (for resuming)."""
+    permission_classes = [IsAuthenticated, IsCreator]
+
+    def get(self, request, upload_id):
+        session = get_object_or_404(UploadSession, pk=upload_id, creator_id=request.user.id)
+        return Response(UploadSessionSerializer(session).data, status=status.HTTP_200_OK)
+
+
+class VideoUploadPartView(APIView):
+    """PUT the raw bytes of one part; re-sending a part replaces it."""
+    permission_classes = [IsAuthenticated, IsCreator]
+
+    def put(self, request, upload_id, part_number):
+        session = get_object_or_404(UploadSession, pk=upload_id, creator_id=request.user.id)
+        if session.status != UploadSession.STATUS.PENDING:
+            return Response({'detail': f'Upload is {session.status.lower()}.'}, status=status.HTTP_409_CONFLICT)
+
+        try:
+            part = uploads.store_part(session, part_number, request.stream or io.BytesIO())
+        except uploads.UploadError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'number': part.number, 'size': part.size, 'sha256': part.sha256},
+                        status=status.HTTP_200_OK)
+
+
+class VideoUploadCompleteView(APIView):
+    permission_classes = [IsAuthenticated, IsCreator]
+
+    def post(self, request, upload_id):
+        session = get_object_or_404(UploadSession, pk=upload_id, creator_id=request.user.id)
+        try:
+            session = uploads.complete(session)
+        except uploads.UploadError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if session.status == UploadSession.STATUS.COMPLETE:
+            return Response({
+                'upload': UploadSessionSerializer(session).data,
+                'post': CreatorPostSerializer(session.post, context={'request': request}).data
+            }, status=status.HTTP_201_CREATED)
+        # assembly runs in the background; poll the upload for the post id
+        return Response({'upload': UploadSessionSerializer(session).data}, status=status.HTTP_202_ACCEPTED)
+
+
+# ---------------------------
+# LIKES & COMMENTS (fans, access code or fan token)
+# ---------------------------
+def _fan_post(request, data, post_id):
+    """Validate the fan's token or email/access code and return ``(email, post)``."""
+    serializer = FanIdentitySerializer(data=data, context=_fan_context(request))
+    serializer.is_valid(raise_exception=True)
+    profile = serializer.validated_data['creator_profile']
+    post = get_object_or_404(CreatorPost.objects.only('id', 'creator'), pk=post_id, creator_id=profile.user_id)
+    return serializer.validated_data['email'], post
+
+
+class PostLikeView(APIView):
+    """
+    POST likes a post, DELETE unlikes it. Counts on the post catch up
+    through user.counters rather than being recomputed here.
+    """
+    permission_classes = [AllowAny]
+
+    def post(self, request, post_id):
+        email, post = _fan_post(request, request.data, post_id)
+        try:
+            with transaction.atomic():
+                _, created = PostLike.objects.get_or_create(post=post, fan_email=email)
+        except IntegrityError:
+            created = False  # a concurrent request liked it first
+        return Response({'liked': True}, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+    def delete(self, request, post_id):
+        email, post = _fan_post(request, request.data, post_id)
+        # count what the DELETE removed, so two racing unlikes decrement once
+        deleted, _ = PostLike.objects.filter(post=post, fan_email=email).delete()
+        if deleted:
+            transaction.on_commit(partial(counters.record, post.pk, counters.LIKES, -deleted))
+        return Response({'liked': False}, status=status.HTTP_200_OK)
+
+
+class PostCommentListView(APIView):
+    """GET lists a post's comments newest first; POST adds one."""
+    permission_classes = [AllowAny]
+
+    def get(self, request, post_id):
+        _, post = _fan_post(request, request.query_params, post_id)
+        comments = PostComment.objects.filter(post=post).only('id', 'fan_email', 'body', 'created_at')
+        paginator = NewestFirstCursorPagination()
+        page = paginator.paginate_queryset(comments, request, view=self)
+        return paginator.get_paginated_response(PostCommentSerializer(page, many=True).data)
+
+    def post(self, request, post_id):
+        email, post = _fan_post(request, request.data, post_id)
+        serializer = PostCommentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(post=post, fan_email=email)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+# ---------------------------
+# SEARCH
+# ---------------------------
+class PostSearchView(generics.ListAPIView):
+    """Ranked full-text search over post titles and descriptions, paginated."""
+    permission_classes = [IsAuthenticated]
+    replica_safe_methods = ('GET',)
+    serializer_class = CreatorPostSerializer
+    filterset_class = PostSearchFilter
+    queryset = CreatorPost.objects.only(*CreatorPostQuerySet.FEED_COLUMNS)
+
+
+class AdminCreatorSearchView(generics.ListAPIView):
+    """Creators by name or e-mail, best match first."""
+    permission_classes = [IsAuthenticated, IsAdmin]
+    replica_safe_methods = ('GET',)
+    serializer_class = CreatorSearchSerializer
+    filterset_class = CreatorSearchFilter
+    queryset = User.objects.filter(role=User.ROLE.CREATOR, creator_profile__isnull=False).select_related('creator_profile')
+
+
 # ---------------------------
 # ADMIN CREDIT CARDS
 # ---------------------------
@@ -374,6 +593,7 @@ class AdminCreditCardListView(APIView):
     Admin endpoint to view all credit cards
     """
     permission_classes = [IsAuthenticated]
+    replica_safe_methods = ('GET',)
 
     def check_admin_permission(self, user):
         """Check if user has admin permissions"""